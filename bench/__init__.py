@@ -0,0 +1 @@
+"""Benchmarks for the OpenWrt integration (run from the repository root)."""
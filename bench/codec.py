@@ -0,0 +1,75 @@
+"""Codec benchmark: cached batch body vs per-poll encoding, orjson vs stdlib decoding.
+
+    python -m bench.codec --interfaces 120 --repeat 2000
+
+encode: 每次轮询重新构造并序列化 JSON-RPC 列表 (原来交给 aiohttp json=) 与
+        OpenWrtApi._batch_body 命中缓存的耗时对比；
+decode: 同一份 interface dump 响应分别用 stdlib json 和 orjson (若已安装) 解码。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from custom_components.openwrt.api import OpenWrtApi
+
+from tests.fake_openwrt import FakeOpenWrt
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def timed_us(func, repeat: int) -> float:
+    """中位数耗时 (微秒)"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return round(statistics.median(samples), 1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interfaces", type=int, default=120, help="interface dump 中的接口数量")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    fake = FakeOpenWrt(interfaces=args.interfaces)
+    token = fake.open_session()
+    api = OpenWrtApi("bench", "", "", session=None)
+    calls = api._poll_calls()
+
+    def encode_each_poll() -> bytes:
+        rpc_calls = [
+            {"jsonrpc": "2.0", "id": call_id, "method": "call",
+             "params": [token, call.object, call.method, call.params]}
+            for call_id, call in enumerate(calls, start=1)
+        ]
+        return json.dumps(rpc_calls).encode()
+
+    api._batch_body(calls, token)
+    encode = {
+        "calls": len(calls),
+        "per_poll_us": timed_us(encode_each_poll, args.repeat),
+        "cached_us": timed_us(lambda: api._batch_body(calls, token), args.repeat),
+    }
+
+    dump = json.dumps([fake.reply({
+        "jsonrpc": "2.0", "id": 1, "method": "call",
+        "params": [token, "network.interface", "dump", {}],
+    })]).encode()
+    decode = {
+        "response_kb": round(len(dump) / 1024, 1),
+        "stdlib_us": timed_us(lambda: json.loads(dump), args.repeat),
+        "orjson_us": timed_us(lambda: orjson.loads(dump), args.repeat) if orjson else None,
+    }
+    print(json.dumps({"encode": encode, "decode": decode}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
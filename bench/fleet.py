@@ -0,0 +1,139 @@
+"""Fleet load benchmark: drive OpenWrtApi.get_data for 1..500 stand-in routers.
+
+模拟路由器在独立进程中运行 (tests/fake_openwrt.py)，本进程只承担与 Home Assistant
+相同的客户端负载: 共享一个 ClientSession，每台路由器按固定间隔、错开相位轮询。
+
+    python -m bench.fleet --routers 1,10,100,500 --interval 5 --duration 30 --interfaces 20
+
+每个规模输出一行: polls/s、轮询耗时百分位、事件循环延迟、内存和错误数。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import resource
+import subprocess
+import sys
+import time
+from typing import Any
+
+import aiohttp
+
+from custom_components.openwrt.api import OpenWrtApi, OpenWrtAuthError, OpenWrtConnectionError
+
+# 事件循环延迟探测间隔 (秒)
+LAG_PROBE_INTERVAL = 0.1
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank 百分位"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def start_fake_fleet(args: argparse.Namespace, routers: int) -> tuple[subprocess.Popen, list[str]]:
+    """在子进程中启动 routers 台模拟路由器，返回 (进程, 基础 URL)"""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "tests.fake_openwrt",
+            "--routers", str(routers),
+            "--interfaces", str(args.interfaces),
+            "--clients", str(args.clients),
+            "--latency", str(args.latency),
+            "--session-timeout", str(args.session_timeout),
+            "--error-rate", str(args.error_rate),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("stand-in routers failed to start")
+    return process, json.loads(line)["urls"]
+
+
+async def run_fleet(urls: list[str], interval: float, duration: float) -> dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    latencies: list[float] = []
+    lags: list[float] = []
+    errors = 0
+    stop = loop.time() + duration
+
+    async def probe() -> None:
+        while loop.time() < stop:
+            expected = loop.time() + LAG_PROBE_INTERVAL
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            lags.append(max(0.0, loop.time() - expected) * 1000)
+
+    async def poll(api: OpenWrtApi, phase: float) -> None:
+        nonlocal errors
+        next_run = loop.time() + phase * interval
+        while next_run < stop:
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+            started = time.perf_counter()
+            try:
+                await api.get_data()
+            except (OpenWrtAuthError, OpenWrtConnectionError, asyncio.TimeoutError):
+                errors += 1
+            else:
+                latencies.append((time.perf_counter() - started) * 1000)
+            next_run += interval
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(
+        connector=connector, cookie_jar=aiohttp.CookieJar(unsafe=True)
+    ) as session:
+        apis = [OpenWrtApi(url, "root", "password", session) for url in urls]
+        started = loop.time()
+        await asyncio.gather(
+            probe(), *(poll(api, index / len(apis)) for index, api in enumerate(apis))
+        )
+        elapsed = loop.time() - started
+
+    return {
+        "routers": len(urls),
+        "polls": len(latencies),
+        "polls_per_second": round(len(latencies) / elapsed, 1),
+        "errors": errors,
+        "poll_ms": {
+            pct: round(value, 2) if (value := percentile(latencies, pct)) is not None else None
+            for pct in (50, 95, 99, 100)
+        },
+        "loop_lag_ms": {
+            pct: round(value, 2) if (value := percentile(lags, pct)) is not None else None
+            for pct in (50, 95, 100)
+        },
+        # 本进程启动以来的内存峰值 (Linux 下 ru_maxrss 单位为 KiB)
+        "maxrss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routers", default="1,10,100,500", help="逗号分隔的车队规模")
+    parser.add_argument("--interval", type=float, default=5.0, help="每台路由器的轮询间隔 (秒)")
+    parser.add_argument("--duration", type=float, default=30.0, help="每个规模的运行时长 (秒)")
+    parser.add_argument("--interfaces", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟路由器的响应延迟 (秒)")
+    parser.add_argument("--session-timeout", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    for routers in (int(n) for n in args.routers.split(",")):
+        process, urls = start_fake_fleet(args, routers)
+        try:
+            result = asyncio.run(run_fleet(urls, args.interval, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
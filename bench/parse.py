@@ -0,0 +1,65 @@
+"""Parse-time micro-benchmark: decode and parse one full poll batch for large interface dumps.
+
+批次内容由模拟路由器 (tests/fake_openwrt.py) 生成，经与轮询相同的回放流程
+(OpenWrtApi.replay_batch: 按 id 匹配、按调用 key 缓存、逐个调用解码) 处理。
+
+    python -m bench.parse --interfaces 20,200,1000 --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from custom_components.openwrt.api import OpenWrtApi, json_loads
+
+from tests.fake_openwrt import FakeOpenWrt
+
+
+def build_batch(interfaces: int) -> tuple[OpenWrtApi, list[str], bytes]:
+    """生成一次完整轮询的 (调用 key, 原始响应)，返回已预热的 API"""
+    fake = FakeOpenWrt(interfaces=interfaces, radios=2, stations=32)
+    token = fake.open_session()
+    api = OpenWrtApi("bench", "", "", session=None)
+    # 第一批的接口信息和射频列表决定后续批次中的设备、射频调用
+    for _ in range(2):
+        calls = api._poll_calls()
+        body = json.loads(api._batch_body(calls, token))
+        raw = json.dumps([fake.reply(call) for call in body]).encode()
+        keys = [call.key for call in calls]
+        api.replay_batch(keys, raw)
+    return api, keys, raw
+
+
+def timed(func, repeat: int) -> float:
+    """中位数耗时 (毫秒)"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interfaces", default="20,200,1000", help="逗号分隔的接口数量")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    for interfaces in (int(n) for n in args.interfaces.split(",")):
+        api, keys, raw = build_batch(interfaces)
+        results = api._last_results
+        print(json.dumps({
+            "interfaces": interfaces,
+            "calls": len(keys),
+            "response_kb": round(len(raw) / 1024, 1),
+            "decode_ms": timed(lambda: json_loads(raw), args.repeat),
+            "parse_ms": timed(lambda: api._parse_ubus_data(results), args.repeat),
+            "replay_ms": timed(lambda: api.replay_batch(keys, raw), args.repeat),
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,38 +5,82 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, CONF_HOST, CONF_USERNAME, CONF_PASSWORD, CONF_UPDATE_INTERVAL
+from .const import (
+    DOMAIN,
+    DATA_FLEET,
+    CONF_HOST,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_UPDATE_INTERVAL,
+    CONF_PUSH_EVENTS,
+    CONNECTION_OPTIONS,
+    SESSION_CLOSE_DELAY,
+    SESSION_STORAGE_VERSION,
+    CAPABILITY_STORAGE_VERSION,
+    CLIENT_STORAGE_VERSION,
+)
 from .api import OpenWrtApi
-from .coordinator import OpenWrtDataUpdateCoordinator
+from .connection import async_get_router_session, ssl_setting
+from .coordinator import (
+    OpenWrtDataUpdateCoordinator,
+    capability_storage_key,
+    client_storage_key,
+    reload_options,
+    session_storage_key,
+)
+from .scheduler import OpenWrtFleetScheduler
 
-PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BUTTON]
+PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BUTTON, Platform.DEVICE_TRACKER]
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up openwrt from a config entry."""
-    session = async_get_clientsession(hass)
+    # 共享 session 或该路由器专用的连接器 (见选项)
+    ssl_param = ssl_setting(entry)
+    session = async_get_router_session(hass, entry, ssl_param)
     
     # 初始化 API (使用 entry.data 中的配置)
     api = OpenWrtApi(
         host=entry.data[CONF_HOST],
         username=entry.data[CONF_USERNAME],
         password=entry.data[CONF_PASSWORD],
-        session=session
+        session=session,
+        ssl=ssl_param,
     )
 
     # 初始化协调器
     coordinator = OpenWrtDataUpdateCoordinator(
         hass, 
         api, 
-        entry.options.get(CONF_UPDATE_INTERVAL, 10)
+        entry.options.get(CONF_UPDATE_INTERVAL, 10),
+        entry,
     )
 
+    # 复用上次保存的 sysauth 会话，避免每次重启都重新登录
+    await coordinator.async_restore_session()
+    # 按固件版本缓存的能力表，避免每次启动都探测
+    await coordinator.async_restore_capabilities()
+
     # 首次立即刷新数据
     await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # 加入共享调度器: 各路由器错峰轮询，并限制同时进行的轮询数
+    if (scheduler := hass.data.get(DATA_FLEET)) is None:
+        scheduler = hass.data[DATA_FLEET] = OpenWrtFleetScheduler(hass)
+    entry.async_on_unload(scheduler.async_add(entry.entry_id, coordinator))
+
+    # 推送模式: 订阅接口事件，轮询作为对账和回退手段
+    if entry.options.get(CONF_PUSH_EVENTS, False):
+        coordinator.async_start_event_stream(entry)
+
+    # 高频采样 (两次轮询之间采样 CPU/内存/连接数)
+    coordinator.async_start_sampler(entry)
+
     # 监听选项更新（例如刷新频率）
     entry.async_on_unload(entry.add_update_listener(update_listener))
     return True
@@ -47,6 +91,41 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored session, capabilities and client history when the entry is deleted."""
+    await Store(hass, SESSION_STORAGE_VERSION, session_storage_key(entry.entry_id)).async_remove()
+    await Store(
+        hass, CAPABILITY_STORAGE_VERSION, capability_storage_key(entry.entry_id)
+    ).async_remove()
+    await Store(hass, CLIENT_STORAGE_VERSION, client_storage_key(entry.entry_id)).async_remove()
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update listener."""
-    await hass.config_entries.async_reload(entry.entry_id)
\ No newline at end of file
+    """Update listener.
+
+    主机或账号变化、或改变实体种类的选项 (RELOAD_OPTIONS) 变化时重新加载条目；
+    其它选项直接应用到运行中的协调器和 API，保留已登录的会话和实体。
+    """
+    coordinator: OpenWrtDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if (
+        dict(entry.data) != coordinator.config_data
+        or reload_options(entry) != coordinator.reload_options
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    connection_options = {key: entry.options.get(key) for key in CONNECTION_OPTIONS}
+    if connection_options != coordinator.connection_options:
+        coordinator.connection_options = connection_options
+        old_session = coordinator.api._session
+        ssl_param = ssl_setting(entry)
+        coordinator.api.set_connection(async_get_router_session(hass, entry, ssl_param), ssl_param)
+        if old_session is not async_get_clientsession(hass):
+            # 旧的专用 session 延迟关闭，让进行中的请求完成 (条目先卸载时由卸载回调关闭)
+            async def _async_close_session(_now) -> None:
+                await old_session.close()
+
+            entry.async_on_unload(
+                async_call_later(hass, SESSION_CLOSE_DELAY, _async_close_session)
+            )
+
+    coordinator.async_apply_options(entry)
\ No newline at end of file
@@ -3,20 +3,83 @@ import logging
 import asyncio
 import json
 import re
+import time
+from itertools import islice
 from urllib.parse import quote
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 
 import aiohttp
 from aiohttp.client_exceptions import ClientError
+from yarl import URL
+
+try:
+    # orjson 随 Home Assistant 安装；单独运行回放 (capture.py) 时可能没有
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+from .metrics import PollMetrics
+from .ubus import (
+    SLOW_TIER_EVERY,
+    TIER_ONCE,
+    TIER_SLOW,
+    UBUS_CALLS,
+    UBUS_STATUS_UNSUPPORTED,
+    InterfaceFilter,
+    UbusCall,
+    decode_system_board,
+    call_group,
+    calls_for_keys,
+    client_calls,
+    conntrack_calls,
+    device_calls,
+    probe_calls,
+    select_calls,
+    wireless_calls,
+    ubus_error,
+    ubus_payload,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# rpcd 默认会话超时 (秒)，登录后以 session list 返回的值为准
+DEFAULT_SESSION_TIMEOUT = 300
+# uhttpd 对无效/过期会话的每个调用都返回 JSON-RPC "Access denied"
+UBUS_ACCESS_DENIED = -32002
+# JSON-RPC "Object not found" (对象不存在，如接口已删除、插件未安装)
+UBUS_OBJECT_NOT_FOUND = -32000
+
+# 轮询中连续多少次返回“不可用”后暂停该调用，以及暂停的初始/最大秒数 (每次重试仍失败时加倍)；
+# 只在内存中生效，不写入持久化的能力表
+CALL_SUSPEND_AFTER = 3
+CALL_RETRY_BASE = 60
+CALL_RETRY_MAX = 3600
+
+# 事件流长时间无数据时断开重连 (秒)，用于发现已失效的连接
+SUBSCRIBE_IDLE_TIMEOUT = 900
+
+# TCP 可达性探测的超时 (秒)
+PROBE_TIMEOUT = 3
+
+# 每个路由器同时执行的动作数 (按钮等)，1 表示串行执行
+ACTION_CONCURRENCY = 1
+
+# 缓存的批量请求体数量 (按到期的调用组合: fast / fast+slow / 含 once 等)
+BODY_CACHE_SIZE = 8
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 class OpenWrtAuthError(Exception):
     """Authentication error."""
 
 class OpenWrtConnectionError(Exception):
     """Connection error."""
 
+class OpenWrtNotSupportedError(Exception):
+    """Feature not supported by the router."""
+
+class OpenWrtActionError(Exception):
+    """Action rejected by the router or not confirmed."""
+
 class OpenWrtApi:
     """Async API Client for OpenWrt."""
 
@@ -25,26 +88,108 @@ class OpenWrtApi:
         host: str, 
         username: str, 
         password: str, 
-        session: aiohttp.ClientSession
+        session: aiohttp.ClientSession,
+        ssl: Any = False,
     ) -> None:
         self._host = host.rstrip("/")
         self._username = username
         self._password = password
         self._session = session
+        # 请求的 ssl 参数: False (不校验)、预先创建的 SSLContext 或证书指纹
+        self._ssl = ssl
         self._sysauth = None
+        self._session_timeout = DEFAULT_SESSION_TIMEOUT
+        # 会话过期时间 (Unix 时间戳)，rpcd 每次使用会话都会顺延
+        self._session_expires: float | None = None
+        self._tick = 0
+        # 各调用最近一次的原始响应 (按调用 key 缓存)，用于合并未到期的分层结果
+        self._last_results: dict[str, dict] = {}
+        # 各调用结果的取得时刻 (time.time())，慢速层的缓存结果按此换算在线时长
+        self._fetched_at: dict[str, float] = {}
+        # 能力表: 调用 key -> 是否可用 (None 表示尚未探测)，按固件版本缓存
+        self._capabilities: dict[str, bool] | None = None
+        self._capabilities_version: str | None = None
+        # 轮询中连续返回“不可用”的调用: 调用 key -> 连续次数，以及暂停到何时 (time.monotonic())
+        self._unsupported_counts: dict[str, int] = {}
+        self._suspended_until: dict[str, float] = {}
+        self._active_calls: tuple[UbusCall, ...] = UBUS_CALLS
+        # 接口允许/排除列表 (None 表示全部接口，使用 interface dump)
+        self._interface_filter: InterfaceFilter | None = None
+        # 按选项开启的调用: 连接跟踪表分析、终端跟踪 (名称 -> 调用)
+        self._optional_calls: dict[str, tuple[UbusCall, ...]] = {}
+        # 按射频生成的 iwinfo 调用 (射频列表来自 iwinfo devices)
+        self._wireless_devices: tuple[str, ...] = ()
+        self._wireless_calls: tuple[UbusCall, ...] = ()
+        # 按接口所用设备生成的 network.device status 调用 (设备来自接口信息)
+        self._interface_devices: tuple[str, ...] = ()
+        self._device_calls: tuple[UbusCall, ...] = ()
+        # 正在进行的登录 (所有调用者共享同一次登录)
+        self._login_task: asyncio.Future | None = None
+        # 动作队列: 正在执行的动作 (相同动作去重) 及并发限制
+        self._pending_actions: dict[tuple, asyncio.Future] = {}
+        self._action_semaphore = asyncio.Semaphore(ACTION_CONCURRENCY)
+        # LuCI CSRF token，按 sysauth 会话缓存: (sysauth, token)
+        self._csrf_token: tuple[str, str] | None = None
+        # 已序列化的批量请求体: 调用 key 列表 -> bytes (只对 _body_token 会话有效)
+        self._body_cache: dict[tuple[str, ...], bytes] = {}
+        self._body_token: str | None = None
+        self.metrics = PollMetrics()
+        # 捕获原始批量响应 (见 capture.py)，None 表示关闭
+        self.recorder = None
         
+    def set_connection(self, session: aiohttp.ClientSession, ssl: Any) -> None:
+        """更换使用的 ClientSession / ssl 参数 (会话 token 不受影响)"""
+        self._session = session
+        self._ssl = ssl
+
     async def login(self) -> bool:
-        """Login to OpenWrt and get sysauth cookie."""
+        """Login to OpenWrt and get sysauth cookie.
+
+        同一时间只进行一次登录: 轮询、按钮、续期等并发调用者等待并共享同一次登录的结果。
+        """
+        if self._login_task is None or self._login_task.done():
+            self._login_task = asyncio.ensure_future(self._async_login())
+        return await asyncio.shield(self._login_task)
+
+    async def _async_ensure_login(self) -> None:
+        """没有会话时登录 (或等待正在进行的登录)"""
+        if not self._sysauth and not await self.login():
+            raise OpenWrtAuthError("Login failed")
+
+    def invalidate_session(self) -> None:
+        """作废当前会话 (如路由器重启后 rpcd 会话全部失效)，下次请求重新登录"""
+        self._sysauth = None
+        self._csrf_token = None
+
+    async def async_probe(self) -> None:
+        """廉价的可达性探测: 只建立 TCP 连接 (不登录、不发送 HTTP 请求)"""
+        url = URL(self._host)
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(url.host, url.port), PROBE_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError) as err:
+            raise OpenWrtConnectionError(f"{url.host}:{url.port} unreachable: {err!r}")
+        writer.close()
+
+    def _drop_session(self, token: str | None) -> None:
+        """请求被拒绝时作废会话；期间已被其它调用者重新登录时保留新会话"""
+        if token is None or self._sysauth == token:
+            self._sysauth = None
+
+    async def _async_login(self) -> bool:
         url = f"{self._host}/cgi-bin/luci/"
         payload = f"luci_username={self._username}&luci_password={quote(self._password)}"
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        started = time.perf_counter()
+        logged_in = False
         
         try:
             async with self._session.post(
                 url, 
                 data=payload, 
                 headers=headers, 
-                ssl=False, 
+                ssl=self._ssl, 
                 allow_redirects=False,
                 timeout=10 # 增加超时限制
             ) as resp:
@@ -61,195 +206,672 @@ class OpenWrtApi:
                 target_cookies = ["sysauth", "sysauth_http", "sysauth_https"]
                 for name in target_cookies:
                     if name in resp.cookies:
-                        self._sysauth = resp.cookies[name].value
+                        self._set_session(resp.cookies[name].value)
                         _LOGGER.debug("Login successful (Set-Cookie)")
-                        return True
-                for cookie in self._session.cookie_jar:
-                    if cookie.key in target_cookies:
-                        self._sysauth = cookie.value
-                        _LOGGER.debug("Login successful (CookieJar)")
-                        return True
+                        logged_in = True
+                        break
+                else:
+                    for cookie in self._session.cookie_jar:
+                        if cookie.key in target_cookies:
+                            self._set_session(cookie.value)
+                            _LOGGER.debug("Login successful (CookieJar)")
+                            logged_in = True
+                            break
 
         except ClientError as err:
             # 抛出连接错误，交给 Coordinator 处理
             raise OpenWrtConnectionError(f"Connection error during login: {err}")
         except asyncio.TimeoutError:
             raise OpenWrtConnectionError("Connection timed out during login")
+        finally:
+            self.metrics.record("login", (time.perf_counter() - started) * 1000)
+
+        if logged_in:
+            await self._async_read_session_timeout()
+            return True
         
         _LOGGER.warning("Login request accepted but no cookie found.")
         return False
 
-    async def get_data(self) -> dict[str, Any]:
-        """Fetch all data using UBUS (JSON-RPC)."""
-        # 如果没有 token，尝试登录
-        if not self._sysauth:
-            if not await self.login():
-                # 登录失败（非网络错误，可能是逻辑错误），抛出异常让 Coordinator 重试
-                raise OpenWrtAuthError("Login failed")
+    def _set_session(self, sysauth: str) -> None:
+        """保存新会话 token，并使 once 层的缓存失效 (新会话重新获取)"""
+        self._sysauth = sysauth
+        self._session_expires = time.time() + self._session_timeout
+        self.invalidate_tier(TIER_ONCE)
+
+    async def _async_read_session_timeout(self) -> None:
+        """从 rpcd 读取会话超时时间 (session list)，失败时沿用默认值"""
+        body = {
+            "jsonrpc": "2.0", "id": 1, "method": "call",
+            "params": [self._sysauth, "session", "list", {}]
+        }
+        try:
+            async with self._session.post(f"{self._host}/ubus/", json=body, ssl=self._ssl, timeout=10) as resp:
+                data = await resp.json(content_type=None)
+            result = data.get("result")
+            info = result[1] if isinstance(result, list) and len(result) > 1 else {}
+            if timeout := info.get("timeout"):
+                self._session_timeout = int(timeout)
+            if (expires := info.get("expires")) is not None:
+                self._session_expires = time.time() + int(expires)
+        except (ClientError, asyncio.TimeoutError, ValueError, AttributeError, TypeError) as err:
+            _LOGGER.debug(f"Unable to read session timeout, using {self._session_timeout}s: {err}")
+
+    @property
+    def session_expires(self) -> float | None:
+        """当前会话的过期时间 (Unix 时间戳)"""
+        return self._session_expires if self._sysauth else None
+
+    @property
+    def session_timeout(self) -> int:
+        return self._session_timeout
+
+    def session_state(self) -> dict[str, Any]:
+        """用于持久化的会话信息"""
+        return {
+            "sysauth": self._sysauth,
+            "expires": self._session_expires,
+            "timeout": self._session_timeout,
+        }
+
+    def restore_session(self, state: dict[str, Any]) -> bool:
+        """恢复持久化的会话，仍在有效期内时返回 True"""
+        self._session_timeout = state.get("timeout") or DEFAULT_SESSION_TIMEOUT
+        sysauth, expires = state.get("sysauth"), state.get("expires")
+        if not sysauth or not expires or expires <= time.time():
+            return False
+        self._set_session(sysauth)
+        self._session_expires = expires
+        return True
+
+    async def async_renew_session(self) -> None:
+        """在会话过期前续期: 使用一次会话 (rpcd 会顺延过期时间)，会话已失效时重新登录"""
+        token = self._sysauth
+        if token:
+            body = {
+                "jsonrpc": "2.0", "id": 1, "method": "call",
+                "params": [token, "session", "access", {}]
+            }
+            try:
+                async with self._session.post(f"{self._host}/ubus/", json=body, ssl=self._ssl, timeout=10) as resp:
+                    data = await resp.json(content_type=None) if resp.status == 200 else None
+                if isinstance(data, dict) and not self._is_session_error(data):
+                    self._session_expires = time.time() + self._session_timeout
+                    return
+            except (ClientError, asyncio.TimeoutError, ValueError) as err:
+                raise OpenWrtConnectionError(f"Connection error renewing session: {err}")
+        self._drop_session(token)
+        await self._async_ensure_login()
+
+    @staticmethod
+    def _is_session_error(item: Any) -> bool:
+        """JSON-RPC "Access denied": 会话无效或已过期"""
+        error = item.get("error") if isinstance(item, dict) else None
+        return isinstance(error, dict) and error.get("code") == UBUS_ACCESS_DENIED
 
+    @staticmethod
+    def _is_unsupported(error: Any) -> bool:
+        """调用本身不可用的错误: ubus 状态码 3/4/6，或单个调用的 "Object not found"/"Access denied".
+
+        整批都是 "Access denied" 时是会话失效，已在此之前处理。
+        """
+        if not isinstance(error, dict):
+            return False
+        return (
+            error.get("ubus_status") in UBUS_STATUS_UNSUPPORTED
+            or error.get("code") in (UBUS_OBJECT_NOT_FOUND, UBUS_ACCESS_DENIED)
+        )
+
+    def _supported(self, call: UbusCall) -> bool:
+        """能力表中调用及其所属调用组都未标记为不支持，且调用没有被暂停"""
+        capabilities = self._capabilities or {}
+        return (
+            capabilities.get(call.key, True)
+            and capabilities.get(call_group(call.key), True)
+            and call.key not in self._suspended_until
+        )
+
+    @staticmethod
+    def _probe_keys(capabilities: dict[str, bool]) -> dict[str, bool]:
+        """只保留探测得出的能力 (调用及调用组)；按接口/设备/射频名称的 key 不保留"""
+        return {key: ok for key, ok in capabilities.items() if call_group(key) == key}
+
+    def capability_state(self) -> dict[str, Any] | None:
+        """用于持久化的能力表 (探测结果；轮询中暂停的调用不在其中)"""
+        if self._capabilities is None:
+            return None
+        return {"version": self._capabilities_version, "capabilities": self._capabilities}
+
+    def restore_capabilities(self, state: dict[str, Any]) -> None:
+        """恢复持久化的能力表；固件版本变化时会在轮询中重新探测"""
+        if isinstance(capabilities := state.get("capabilities"), dict):
+            self._capabilities_version = state.get("version")
+            # 旧版本曾把轮询中失败的单个接口/设备调用写入能力表
+            self._set_capabilities(self._probe_keys(capabilities))
+
+    def _set_capabilities(self, capabilities: dict[str, bool] | None) -> None:
+        """更新能力表，重新选择要轮询的调用，并丢弃不再使用的调用的缓存结果"""
+        self._capabilities = capabilities
+        if self._suspended_until:
+            # 暂停的调用视为不支持，同一指标改用其它来源
+            capabilities = {**(capabilities or {}), **dict.fromkeys(self._suspended_until, False)}
+        self._active_calls = select_calls(capabilities, self._interface_filter)
+        self._wireless_calls = self._select_wireless_calls()
+        self._device_calls = self._select_device_calls()
+        active = {call.key for call in self._poll_calls()}
+        for key in list(self._last_results):
+            if key not in active:
+                del self._last_results[key]
+
+    def set_interface_filter(self, interfaces: InterfaceFilter | None) -> None:
+        """更换接口过滤 (下一次轮询起生效)"""
+        if interfaces == self._interface_filter:
+            return
+        self._interface_filter = interfaces
+        # 接口集合变化后，之前暂停的接口调用立即重新尝试
+        for key in [k for k in self._unsupported_counts if k.startswith("interface_status.")]:
+            del self._unsupported_counts[key]
+            self._suspended_until.pop(key, None)
+        self._set_capabilities(self._capabilities)
+
+    def set_conntrack_analytics(self, enabled: bool) -> None:
+        """开启/关闭连接跟踪表分析 (下一次轮询起生效)"""
+        self._set_optional_calls("conntrack", conntrack_calls if enabled else None)
+
+    def set_client_tracking(self, enabled: bool) -> None:
+        """开启/关闭基于 DHCP 租约的终端跟踪 (下一次轮询起生效)"""
+        self._set_optional_calls("clients", client_calls if enabled else None)
+
+    def _set_optional_calls(
+        self, name: str, factory: Callable[[], tuple[UbusCall, ...]] | None
+    ) -> None:
+        if (factory is not None) == (name in self._optional_calls):
+            return
+        if factory is None:
+            del self._optional_calls[name]
+        else:
+            self._optional_calls[name] = factory()
+        self._set_capabilities(self._capabilities)
+
+    async def _async_probe_capabilities(self) -> None:
+        """一次批量请求探测路由器能力: ubus list 列出对象的方法，session access 检查 ACL.
+
+        同时获取 system board 作为缓存能力表的固件版本。
+        list 或 access 本身失败时视为支持，由轮询中的 ubus 状态码再行排除。
+        """
+        token = self._sysauth
+        probes = probe_calls()
+        objects = sorted({call.object for _, call in probes})
+        checks = [(key, check) for key, call in probes for check in call.acl_checks()]
         rpc_calls = [
-            {"jsonrpc": "2.0", "id": 1, "method": "call", "params": [self._sysauth, "system", "info", {}]},
-            {"jsonrpc": "2.0", "id": 2, "method": "call", "params": [self._sysauth, "system", "board", {}]},
-            {"jsonrpc": "2.0", "id": 3, "method": "call", "params": [self._sysauth, "luci", "getCPUUsage", {}]},
-            {"jsonrpc": "2.0", "id": 4, "method": "call", "params": [self._sysauth, "luci", "getTempInfo", {}]},
-            {"jsonrpc": "2.0", "id": 5, "method": "call", "params": [self._sysauth, "luci", "getOnlineUsers", {}]},
-            {"jsonrpc": "2.0", "id": 6, "method": "call", "params": [self._sysauth, "network.interface", "dump", {}]},
-            {"jsonrpc": "2.0", "id": 7, "method": "call", "params": [self._sysauth, "file", "read", {"path": "/proc/sys/net/netfilter/nf_conntrack_count"}]},
-            {"jsonrpc": "2.0", "id": 8, "method": "call", "params": [self._sysauth, "file", "read", {"path": "/sys/class/thermal/thermal_zone0/temp"}]}
+            {"jsonrpc": "2.0", "id": 1, "method": "list", "params": objects},
+            {"jsonrpc": "2.0", "id": 2, "method": "call",
+             "params": [token, "system", "board", {}]},
+        ] + [
+            {"jsonrpc": "2.0", "id": call_id, "method": "call",
+             "params": [token, "session", "access", check]}
+            for call_id, (_, check) in enumerate(checks, start=3)
         ]
-        
+
+        try:
+            async with self._session.post(
+                f"{self._host}/ubus/", json=rpc_calls, ssl=self._ssl, timeout=10
+            ) as resp:
+                if resp.status in (401, 403):
+                    self._drop_session(token)
+                    raise OpenWrtAuthError("Token expired")
+                data = await resp.json(content_type=None)
+        except ClientError as err:
+            raise OpenWrtConnectionError(f"Connection error probing capabilities: {err}")
+        except asyncio.TimeoutError:
+            raise OpenWrtConnectionError("Timeout probing capabilities")
+        except ValueError:
+            raise OpenWrtConnectionError("Invalid JSON response")
+
+        if not isinstance(data, list):
+            data = []
+        if any(self._is_session_error(item) for item in data[1:]):
+            # list 不需要会话，其余调用被拒绝说明会话已失效
+            self._drop_session(token)
+            raise OpenWrtAuthError("Session expired")
+        replies = {item.get("id"): item for item in data if isinstance(item, dict)}
+
+        listing = (replies.get(1) or {}).get("result")
+        if isinstance(listing, list):
+            listing = ubus_payload(listing)
+        capabilities = {}
+        for key, call in probes:
+            capabilities[key] = not isinstance(listing, dict) or (
+                call.method in (listing.get(call.object) or {})
+            )
+        for call_id, (key, _) in enumerate(checks, start=3):
+            reply = replies.get(call_id)
+            access = ubus_payload(reply.get("result")) if reply and ubus_error(reply) is None else None
+            if access and access.get("access") is False:
+                capabilities[key] = False
+
+        version = None
+        if ubus_error(board := replies.get(2)) is None:
+            self._last_results["system_board"] = board
+            info = {}
+            decode_system_board(board.get("result"), info)
+            version = info.get("sw_version")
+
+        unsupported = sorted(key for key, ok in capabilities.items() if not ok)
+        _LOGGER.debug(f"{self._host}: capabilities for {version}, unsupported: {unsupported}")
+        self._capabilities_version = version
+        self._set_capabilities(capabilities)
+
+    def _check_firmware_version(self, version: str | None) -> None:
+        """固件版本变化 (升级) 后，下一次轮询重新探测能力"""
+        if not version or version == self._capabilities_version:
+            return
+        if self._capabilities_version is None:
+            # 探测时未能取得版本，沿用当前能力表
+            self._capabilities_version = version
+            return
+        _LOGGER.info(f"{self._host}: firmware changed to {version}, re-probing capabilities")
+        self._capabilities_version = None
+        self._set_capabilities(None)
+
+    def _select_wireless_calls(self) -> tuple[UbusCall, ...]:
+        return tuple(call for call in wireless_calls(self._wireless_devices) if self._supported(call))
+
+    def _set_wireless_devices(self, devices: list[str] | None) -> None:
+        """射频列表变化时重新生成各射频的调用 (下一次轮询起与其它调用一起发送)"""
+        if devices is None or tuple(devices) == self._wireless_devices:
+            return
+        self._wireless_devices = tuple(devices)
+        self._wireless_calls = self._select_wireless_calls()
+        keys = {call.key for call in self._wireless_calls}
+        for key in [k for k in self._last_results if k.startswith("iwinfo_") and k not in keys]:
+            del self._last_results[key]
+
+    def _select_device_calls(self) -> tuple[UbusCall, ...]:
+        return tuple(call for call in device_calls(self._interface_devices) if self._supported(call))
+
+    def _set_interface_devices(self, devices: dict[str, list[str]] | None) -> None:
+        """接口所用的设备变化时重新生成各设备的统计调用 (下一次轮询起发送)"""
+        if devices is None:
+            return
+        names = tuple(sorted(devices))
+        if names == self._interface_devices:
+            return
+        self._interface_devices = names
+        self._device_calls = self._select_device_calls()
+        keys = {call.key for call in self._device_calls}
+        for key in [k for k in self._last_results if k.startswith("device_status.") and k not in keys]:
+            del self._last_results[key]
+
+    def _poll_calls(self) -> tuple[UbusCall, ...]:
+        """当前轮询的全部调用 (注册表中可用的调用 + 接口设备的统计调用 + 各射频的调用 + 按选项开启的调用)，即解码顺序"""
+        return self._active_calls + self._device_calls + self._wireless_calls + tuple(
+            call for calls in self._optional_calls.values() for call in calls
+            if self._supported(call)
+        )
+
+    def _due_calls(self) -> list[UbusCall]:
+        """返回本次轮询需要发送的调用"""
+        due = []
+        for call in self._poll_calls():
+            cached = call.key in self._last_results
+            if call.tier == TIER_SLOW and self._tick % SLOW_TIER_EVERY and cached:
+                continue
+            if call.tier == TIER_ONCE and cached:
+                continue
+            due.append(call)
+        return due
+
+    def _store_results(self, calls: list[UbusCall], data: list) -> dict[str, Any]:
+        """按 JSON-RPC id 匹配响应并按调用 key 缓存，返回本次出错的调用.
+
+        once 层只缓存成功的结果，失败时下次轮询重试。
+        """
+        replies = {item.get("id"): item for item in data if isinstance(item, dict)}
+        errors = {}
+        fetched_at = time.time()
+        suspended = False
+        for call_id, call in enumerate(calls, start=1):
+            item = replies.get(call_id)
+            if (error := ubus_error(item)) is not None:
+                errors[call.key] = error
+                if self._is_unsupported(error):
+                    # 不再使用之前的结果；连续失败时暂停 (如文件不存在、接口或设备暂时不存在)
+                    self._last_results.pop(call.key, None)
+                    suspended |= self._record_unsupported(call, error)
+                    continue
+                if call.tier == TIER_ONCE or item is None:
+                    continue
+            elif item is not None:
+                self._unsupported_counts.pop(call.key, None)
+            self._last_results[call.key] = item
+            self._fetched_at[call.key] = fetched_at
+        if suspended:
+            self._set_capabilities(self._capabilities)
+        return errors
+
+    def _record_unsupported(self, call: UbusCall, error: Any) -> bool:
+        """记录一次“不可用”的返回，连续 CALL_SUSPEND_AFTER 次后按指数退避暂停该调用 (返回 True)"""
+        count = self._unsupported_counts[call.key] = self._unsupported_counts.get(call.key, 0) + 1
+        if count < CALL_SUSPEND_AFTER:
+            return False
+        backoff = min(CALL_RETRY_BASE * 2 ** (count - CALL_SUSPEND_AFTER), CALL_RETRY_MAX)
+        _LOGGER.debug(
+            f"{self._host}: {call.object}.{call.method} unsupported ({error}), retrying in {backoff}s"
+        )
+        self._suspended_until[call.key] = time.monotonic() + backoff
+        return True
+
+    def _resume_suspended_calls(self) -> None:
+        """暂停到期的调用重新加入轮询 (再次失败时暂停时间加倍)"""
+        now = time.monotonic()
+        if expired := [key for key, until in self._suspended_until.items() if until <= now]:
+            for key in expired:
+                del self._suspended_until[key]
+            self._set_capabilities(self._capabilities)
+
+    async def get_data(self) -> dict[str, Any]:
+        """Fetch all data using UBUS (JSON-RPC)."""
+        # 如果没有 token，尝试登录 (登录失败时抛出异常让 Coordinator 重试)
+        await self._async_ensure_login()
+
+        try:
+            return await self._async_poll()
+        except OpenWrtAuthError:
+            # 会话过期: 在同一次轮询内重新登录并重发，不让本次轮询失败
+            # (失效的会话已在请求中作废；其它调用者已重新登录时直接使用新会话)
+            _LOGGER.debug("Session expired, re-login and retry")
+            await self._async_ensure_login()
+            return await self._async_poll()
+
+    async def _async_poll(self) -> dict[str, Any]:
+        # 首次轮询 (或固件升级后) 先探测能力，只请求路由器支持的调用
+        if self._capabilities is None:
+            await self._async_probe_capabilities()
+        self._resume_suspended_calls()
+        return await self._async_fetch_batch()
+
+    def invalidate_tier(self, tier: str) -> None:
+        """丢弃某一层的缓存结果，使其在下一次轮询时重新获取"""
+        for call in self._poll_calls():
+            if call.tier == tier:
+                self._last_results.pop(call.key, None)
+
+    async def async_sample(self) -> dict[str, Any]:
+        """高频采样: 只请求 sampled 调用并解码，不影响分层缓存和会话处理.
+
+        采样失败 (包括会话过期) 时返回空字典，由下一次正常轮询处理。
+        """
+        calls = [call for call in self._active_calls if call.sampled]
+        if not self._sysauth or not calls:
+            return {}
+        try:
+            async with self._session.post(
+                f"{self._host}/ubus/", data=self._batch_body(calls, self._sysauth),
+                headers=JSON_HEADERS, ssl=self._ssl, timeout=5,
+            ) as resp:
+                data = json_loads(await resp.read()) if resp.status == 200 else None
+        except (ClientError, asyncio.TimeoutError, ValueError) as err:
+            _LOGGER.debug(f"{self._host}: sample failed: {err}")
+            return {}
+        if not isinstance(data, list):
+            return {}
+
+        replies = {item.get("id"): item for item in data if isinstance(item, dict)}
+        res = {}
+        for call_id, call in enumerate(calls, start=1):
+            if ubus_error(item := replies.get(call_id)) is not None:
+                continue
+            try:
+                call.decoder(item.get("result"), res)
+            except Exception as err:
+                _LOGGER.debug(f"Error decoding sample {call.object}.{call.method}: {err}")
+        return res
+
+    async def async_subscribe(self, path: str) -> AsyncIterator[tuple[str | None, Any]]:
+        """订阅 ubus 对象通知 (uhttpd /ubus/subscribe/<object>, text/event-stream).
+
+        逐条产出 (事件类型, 数据)；路由器不支持订阅时抛出 OpenWrtNotSupportedError。
+        """
+        await self._async_ensure_login()
+        token = self._sysauth
+
+        url = f"{self._host}/ubus/subscribe/{path}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "text/event-stream",
+        }
+        timeout = aiohttp.ClientTimeout(total=None, connect=10, sock_read=SUBSCRIBE_IDLE_TIMEOUT)
+        try:
+            async with self._session.get(url, headers=headers, ssl=self._ssl, timeout=timeout) as resp:
+                if resp.status in (401, 403):
+                    self._drop_session(token)
+                    raise OpenWrtAuthError("Token expired")
+                if resp.status != 200 or resp.content_type != "text/event-stream":
+                    raise OpenWrtNotSupportedError(
+                        f"ubus subscribe not available (status {resp.status})"
+                    )
+
+                event, lines = None, []
+                async for raw in resp.content:
+                    line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        lines.append(line[5:].strip())
+                    elif not line and lines:
+                        # 空行表示一条事件结束
+                        try:
+                            payload = json.loads("\n".join(lines))
+                        except ValueError:
+                            payload = None
+                        yield event, payload
+                        event, lines = None, []
+
+        except ClientError as err:
+            raise OpenWrtConnectionError(f"Event stream error: {err}")
+        except asyncio.TimeoutError:
+            raise OpenWrtConnectionError("Event stream idle timeout")
+
+    async def _async_fetch_batch(self) -> dict[str, Any]:
+        """发送一次批量调用并解析结果"""
+        # 只发送到期的分层调用 (fast 每次, slow 每 N 次, once 每会话一次)
+        # JSON-RPC id 为调用在本批次中的序号，响应按 id 匹配而不依赖顺序
+        calls = self._due_calls()
+        token = self._sysauth
+        body = self._batch_body(calls, token)
+
         url = f"{self._host}/ubus/"
         try:
-            async with self._session.post(url, json=rpc_calls, ssl=False, timeout=10) as resp:
+            started = time.perf_counter()
+            async with self._session.post(
+                url, data=body, headers=JSON_HEADERS, ssl=self._ssl, timeout=10
+            ) as resp:
                 if resp.status in (401, 403):
                     # Token 过期
-                    self._sysauth = None
+                    self._drop_session(token)
                     raise OpenWrtAuthError("Token expired")
                 
-                try:
-                    data = await resp.json()
-                except Exception:
-                    self._sysauth = None
-                    raise OpenWrtConnectionError("Invalid JSON response")
-
-                return self._parse_ubus_data(data)
+                raw = await resp.read()
+                self.metrics.record("http", (time.perf_counter() - started) * 1000)
+                self.metrics.record("response_bytes", len(raw))
+                if self.recorder is not None:
+                    self.recorder.record(self._capabilities_version, calls, raw, token)
+                return self._handle_batch_response(calls, raw, token)
 
         except ClientError as err:
             raise OpenWrtConnectionError(f"Connection error fetching data: {err}")
         except asyncio.TimeoutError:
             raise OpenWrtConnectionError("Timeout fetching data")
 
-    def _parse_ubus_data(self, data: list) -> dict:
-        """Parse ubus response list."""
-        res = {}
+    def _batch_body(self, calls: list[UbusCall], token: str | None) -> bytes:
+        """批量请求体: 同一会话内相同的调用组合只序列化一次"""
+        if token != self._body_token or len(self._body_cache) >= BODY_CACHE_SIZE:
+            self._body_cache = {}
+            self._body_token = token
+        key = tuple(call.key for call in calls)
+        if (body := self._body_cache.get(key)) is None:
+            rpc_calls = [
+                {"jsonrpc": "2.0", "id": call_id, "method": "call",
+                 "params": [token, call.object, call.method, call.params]}
+                for call_id, call in enumerate(calls, start=1)
+            ]
+            body = self._body_cache[key] = json.dumps(rpc_calls, separators=(",", ":")).encode()
+        return body
+
+    def _handle_batch_response(self, calls: list[UbusCall], raw: bytes, token: str | None) -> dict[str, Any]:
+        """解析一次批量调用的原始响应 (轮询和回放共用)"""
         try:
-            if not isinstance(data, list):
-                return res
-
-            # 1. System Info (ID 1)
-            if len(data) > 0:
-                sys_res = data[0].get("result")
-                if sys_res and len(sys_res) > 1:
-                    sys_info = sys_res[1]
-                    res["openwrt_uptime"] = sys_info.get("uptime")
-                    if mem := sys_info.get("memory"):
-                        total = mem.get("total", 1)
-                        free = mem.get("free", 0)
-                        if total > 0:
-                            res["openwrt_memory"] = round((1 - free / total) * 100, 0)
-
-            # 2. System Board (ID 2) [新增解析]
-            if len(data) > 1:
-                board_res = data[1].get("result")
-                if board_res and len(board_res) > 1:
-                    board_info = board_res[1]
-                    # 提取主机名
-                    res["device_name"] = board_info.get("hostname", "OpenWrt")
-                    # 提取型号
-                    res["device_model"] = board_info.get("model", "Router")
-                    # 提取固件版本 (release.description 包含完整版本号)
-                    release = board_info.get("release", {})
-                    res["sw_version"] = release.get("description", release.get("version"))
-
-            # 3. CPU Usage
-            if len(data) > 2:
-                cpu_res = data[2].get("result")
-                val = None
-                if isinstance(cpu_res, dict): 
-                     val = cpu_res.get("cpuusage")
-                elif isinstance(cpu_res, list) and len(cpu_res) > 0:
-                     item = cpu_res[1] if len(cpu_res) > 1 else cpu_res[0]
-                     val = item.get("cpuusage") if isinstance(item, dict) else item
-                
-                if val is not None:
-                    if isinstance(val, str):
-                        try:
-                            res["openwrt_cpu"] = float(val.replace("%", "").strip())
-                        except ValueError:
-                            res["openwrt_cpu"] = 0
-                    else:
-                        res["openwrt_cpu"] = val
-
-            # 4 & 8. CPU Temp
-            temp_val = 0
-            if len(data) > 3:
-                temp_res = data[3].get("result")
-                if isinstance(temp_res, dict):
-                    temp_val = temp_res.get("cputemp", 0)
-                elif isinstance(temp_res, list) and len(temp_res) > 1:
-                     temp_val = temp_res[1].get("cputemp", 0)
-            
-            if not temp_val and len(data) > 7:
-                file_res = data[7].get("result")
-                if file_res and len(file_res) > 1:
-                    raw_temp = file_res[1].get("data", "").strip()
-                    if raw_temp.isdigit():
-                        temp_val = float(raw_temp) / 1000.0
-            if temp_val:
-                res["openwrt_cputemp"] = temp_val
-
-            # 5. Online Users
-            if len(data) > 4:
-                user_res = data[4].get("result")
-                if isinstance(user_res, list) and len(user_res) > 1:
-                    res["openwrt_user_online"] = user_res[1].get("onlineusers")
-
-            # 6. Network Dump
-            if len(data) > 5:
-                net_res = data[5].get("result")
-                if net_res and len(net_res) > 1:
-                    interfaces = net_res[1].get("interface", [])
-                    available_interfaces = []
-                    for iface in interfaces:
-                        name = iface.get("interface", "").lower()
-                        if not name or name == "loopback": continue
-                        available_interfaces.append(name)
-                        ipv4 = iface.get("ipv4-address", [])
-                        if ipv4: res[f"openwrt_{name}_ip"] = ipv4[0].get("address")
-                        ipv6 = iface.get("ipv6-address", [])
-                        if ipv6: res[f"openwrt_{name}_ipv6"] = ipv6[0].get("address")
-                        res[f"openwrt_{name}_uptime"] = iface.get("uptime")
-                    res["_available_interfaces"] = available_interfaces
-
-            # 7. Active Connections
-            if len(data) > 6:
-                conn_res = data[6].get("result")
-                if conn_res and len(conn_res) > 1:
-                    conn_str = conn_res[1].get("data", "").strip()
-                    if conn_str.isdigit():
-                        res["openwrt_conncount"] = int(conn_str)
-        except Exception as e:
-            _LOGGER.error(f"Error parsing ubus data: {e}")
+            started = time.perf_counter()
+            data = json_loads(raw)
+            self.metrics.record("decode", (time.perf_counter() - started) * 1000)
+        except Exception:
+            self._drop_session(token)
+            raise OpenWrtConnectionError("Invalid JSON response")
+
+        if not isinstance(data, list):
+            return {}
+
+        if data and all(self._is_session_error(item) for item in data):
+            self._drop_session(token)
+            raise OpenWrtAuthError("Session expired")
+        # 会话被使用，rpcd 顺延过期时间
+        self._session_expires = time.time() + self._session_timeout
+
+        # 合并各层最近一次的结果，逐个调用解码
+        errors = self._store_results(calls, data)
+        self._tick += 1
+        started = time.perf_counter()
+        res = self._parse_ubus_data(self._last_results, errors)
+        self.metrics.record("parse", (time.perf_counter() - started) * 1000)
+        self.metrics.record_rpc_errors(errors)
+        self._check_firmware_version(res.get("sw_version"))
+        self._set_wireless_devices(res.get("_wireless_devices"))
+        self._set_interface_devices(res.get("_device_interfaces"))
+        return res
+
+    def replay_batch(self, keys: list[str], raw: bytes) -> dict[str, Any]:
+        """回放一条捕获的批次 (调用 key 列表 + 原始响应)，经过与轮询相同的解析流程"""
+        calls = calls_for_keys(keys)
+        if names := tuple(
+            call.key.split(".", 1)[1] for call in calls if call.key.startswith("interface_status.")
+        ):
+            # 捕获时使用了接口允许列表
+            self.set_interface_filter(InterfaceFilter(names))
+        keys = {call.key for call in calls}
+        if "conntrack_table" in keys:
+            self.set_conntrack_analytics(True)
+        if "dhcp_leases" in keys:
+            self.set_client_tracking(True)
+        return self._handle_batch_response(calls, raw, None)
+
+    def _parse_ubus_data(
+        self, results: dict[str, dict], errors: dict[str, Any] | None = None
+    ) -> dict:
+        """按注册表顺序解码各调用的结果; 单个调用出错不影响其它调用.
+
+        各 *_uptime 值所属结果的取得时刻写入 _uptime_fetched_at，供计算开机/连接时刻。
+        """
+        res = {}
+        uptime_fetched_at = {}
+        for call in self._poll_calls():
+            item = results.get(call.key)
+            if item is None or ubus_error(item) is not None:
+                continue
+            count = len(res)
+            try:
+                call.decoder(item.get("result"), res)
+            except Exception as err:
+                _LOGGER.debug(f"Error decoding {call.object}.{call.method}: {err}")
+                if errors is not None:
+                    errors[call.key] = {"decode_error": str(err)}
+            if (fetched_at := self._fetched_at.get(call.key)) is not None:
+                # 新写入的 key 位于字典末尾，从末尾反向取，不必跳过已有的 key
+                for key in islice(reversed(res), len(res) - count):
+                    if key.endswith("_uptime"):
+                        uptime_fetched_at[key] = fetched_at
+        if uptime_fetched_at:
+            res["_uptime_fetched_at"] = uptime_fetched_at
         return res
 
+    async def _async_queue_action(self, key: tuple, action) -> Any:
+        """动作队列: 相同的动作正在执行时共享其结果 (去重)；
+        每个路由器同时最多执行 ACTION_CONCURRENCY 个动作，其余排队等待。
+        """
+        if (pending := self._pending_actions.get(key)) is None:
+            async def _run() -> Any:
+                async with self._action_semaphore:
+                    return await action()
+
+            pending = self._pending_actions[key] = asyncio.ensure_future(_run())
+            pending.add_done_callback(lambda _: self._pending_actions.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _async_csrf_token(self, url: str, sysauth: str, refresh: bool = False) -> str:
+        """LuCI CSRF token (同一会话内不变)，按会话缓存，避免每次动作都抓取页面"""
+        if not refresh and self._csrf_token and self._csrf_token[0] == sysauth:
+            return self._csrf_token[1]
+        async with self._session.get(
+            url, cookies=self._auth_cookies(sysauth), ssl=self._ssl, timeout=10
+        ) as resp:
+            if resp.status in (401, 403):
+                self._drop_session(sysauth)
+                raise OpenWrtAuthError("Token expired")
+            text = await resp.text()
+        if match := re.search(r"token:\s*'([a-f0-9]+)'", text):
+            token = match.group(1)
+        elif match := re.search(r'name="token"\s+value="([a-f0-9]+)"', text):
+            token = match.group(1)
+        else:
+            raise OpenWrtActionError("CSRF token not found")
+        self._csrf_token = (sysauth, token)
+        return token
+
+    def _auth_cookies(self, sysauth: str) -> dict[str, str]:
+        """LuCI 页面请求显式携带当前会话的 cookie.
+
+        不依赖 cookie jar: 会话可能恢复自存储或已重新登录，jar 中可能没有或是旧值。
+        新版 LuCI 按协议区分 cookie 名 (sysauth_http/sysauth_https)，旧版使用 sysauth。
+        """
+        scheme = "https" if self._host.startswith("https://") else "http"
+        return {"sysauth": sysauth, f"sysauth_{scheme}": sysauth}
+
     async def execute_legacy_url_action(self, url_path: str) -> None:
         """Legacy URL action."""
-        if not self._sysauth:
-            await self.login()
+        await self._async_queue_action(
+            ("legacy", url_path), lambda: self._async_legacy_action(url_path)
+        )
+
+    async def _async_legacy_action(self, url_path: str) -> None:
+        """POST LuCI 页面动作；403 时先重新获取 CSRF token，仍被拒绝则重新登录后再试一次"""
         full_url = f"{self._host}/cgi-bin/luci/{url_path}"
-        token = None
         try:
-            async with self._session.get(full_url, ssl=False) as resp:
-                if resp.status in (401, 403):
-                    self._sysauth = None
+            for attempt in range(3):
+                await self._async_ensure_login()
+                sysauth = self._sysauth
+                token = await self._async_csrf_token(full_url, sysauth, refresh=attempt > 0)
+                async with self._session.post(
+                    full_url, data={"token": token}, cookies=self._auth_cookies(sysauth),
+                    ssl=self._ssl, timeout=10,
+                ) as resp:
+                    if resp.status == 403:
+                        self._csrf_token = None
+                        if attempt > 0:
+                            # 新的 CSRF token 也被拒绝: 会话已失效 (如 LuCI 会话被清除)，
+                            # 经单飞登录换新会话 (并发的轮询共用同一次登录)
+                            self._drop_session(sysauth)
+                        continue
+                    if resp.status >= 400:
+                        raise OpenWrtActionError(f"{url_path} failed with status {resp.status}")
                     return
-                text = await resp.text()
-                if match := re.search(r"token:\s*'([a-f0-9]+)'", text):
-                    token = match.group(1)
-                elif match := re.search(r'name="token"\s+value="([a-f0-9]+)"', text):
-                    token = match.group(1)
-            if token:
-                data = {"token": token}
-                async with self._session.post(full_url, data=data, ssl=False) as resp:
-                    pass
-        except ClientError:
-            pass
-
-    async def execute_ubus_action(self, method: str, payload: Any = None) -> None:
-        """Execute Ubus action."""
-        if not self._sysauth:
-            await self.login()
-        
+        except ClientError as err:
+            raise OpenWrtConnectionError(f"Connection error executing {url_path}: {err}")
+        except asyncio.TimeoutError:
+            raise OpenWrtConnectionError(f"Timeout executing {url_path}")
+        raise OpenWrtActionError(f"{url_path} rejected the session and CSRF token")
+
+    async def execute_ubus_action(self, method: str, payload: Any = None) -> dict[str, Any]:
+        """Execute Ubus action, return the confirmed ubus result."""
         object_path = ""
         func_name = ""
         params = {}
@@ -268,19 +890,48 @@ class OpenWrtApi:
             object_path = "file"
             func_name = "exec"
             params = payload
-        
-        if object_path:
+        else:
+            raise OpenWrtActionError(f"Unknown action {method}")
+
+        key = ("ubus", object_path, func_name, json.dumps(params, sort_keys=True, default=str))
+        return await self._async_queue_action(
+            key, lambda: self._async_ubus_action(object_path, func_name, params)
+        )
+
+    async def _async_ubus_action(self, object_path: str, func_name: str, params: Any) -> dict[str, Any]:
+        """执行一次 ubus 调用并确认结果；会话失效时重新登录并重试一次"""
+        url = f"{self._host}/ubus/"
+        for _ in range(2):
+            await self._async_ensure_login()
+            token = self._sysauth
             body = {
                 "jsonrpc": "2.0", "id": 1, "method": "call", 
-                "params": [self._sysauth, object_path, func_name, params]
+                "params": [token, object_path, func_name, params]
             }
-            url = f"{self._host}/ubus/"
             try:
-                async with self._session.post(url, json=body, ssl=False) as resp:
+                async with self._session.post(url, json=body, ssl=self._ssl, timeout=10) as resp:
                     if resp.status in (401, 403):
-                        self._sysauth = None
-                        _LOGGER.warning("UBUS action failed: Token expired")
-                    else:
-                        _LOGGER.debug(f"UBUS action sent. Status: {resp.status}")
-            except ClientError as e:
-                _LOGGER.error(f"Failed to execute ubus action: {e}")
\ No newline at end of file
+                        self._drop_session(token)
+                        continue
+                    data = await resp.json(content_type=None)
+            except ClientError as err:
+                raise OpenWrtConnectionError(f"Failed to execute ubus action: {err}")
+            except asyncio.TimeoutError:
+                raise OpenWrtConnectionError("Timeout executing ubus action")
+            except ValueError:
+                raise OpenWrtActionError("Invalid JSON response")
+
+            if self._is_session_error(data):
+                self._drop_session(token)
+                continue
+            if (error := ubus_error(data)) is not None:
+                raise OpenWrtActionError(f"{object_path}.{func_name} failed: {error}")
+            result = ubus_payload(data.get("result")) or {}
+            if object_path == "file" and func_name == "exec" and result.get("code", 0) != 0:
+                raise OpenWrtActionError(
+                    f"{params.get('command')} exited with code {result['code']}: "
+                    f"{(result.get('stderr') or '').strip()}"
+                )
+            _LOGGER.debug(f"UBUS action {object_path}.{func_name} confirmed")
+            return result
+        raise OpenWrtAuthError("Session rejected")
@@ -3,11 +3,13 @@ import logging
 from dataclasses import replace
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN, BUTTON_TYPES, OpenWrtButtonEntityDescription
 from .coordinator import OpenWrtDataUpdateCoordinator
+from .api import OpenWrtActionError, OpenWrtAuthError, OpenWrtConnectionError
 
 # 初始化日志
 _LOGGER = logging.getLogger(__name__)
@@ -24,6 +26,8 @@ async def async_setup_entry(
     available_interfaces = coordinator.data.get("_available_interfaces", [])
     
     entities = []
+    # 每个接口的重连按钮，接口消失时移除
+    interface_buttons: dict[str, OpenWrtButton] = {}
     
     for description in BUTTON_TYPES:
         # [核心逻辑] 如果是接口重连模板，则进行动态分裂
@@ -33,16 +37,9 @@ async def async_setup_entry(
                 continue
 
             for iface in available_interfaces:
-                # 动态生成新的 Description
-                # 使用 dataclasses.replace 复制模板并修改特定字段
-                new_desc = replace(
-                    description,
-                    key=f"reconnect_{iface}",                  # 生成唯一 Key: reconnect_wan
-                    name=description.name.format(iface.upper()), # 格式化名称: Reconnect WAN
-                    ubus_payload=iface,                        # 设置 Payload: wan
-                    icon="mdi:lan-connect"                     # 你也可以根据接口名动态给不同图标
-                )
-                entities.append(OpenWrtButton(coordinator, new_desc))
+                button = _interface_button(coordinator, description, iface)
+                interface_buttons[iface] = button
+                entities.append(button)
         
         else:
             # 普通按钮直接添加
@@ -50,6 +47,43 @@ async def async_setup_entry(
         
     async_add_entities(entities)
 
+    @callback
+    def _async_interfaces_changed(list_key: str, added: set[str], removed: set[str]) -> None:
+        """接口出现/消失时只增删对应的重连按钮"""
+        if list_key != "_available_interfaces":
+            return
+        coordinator.async_remove_entities(
+            [interface_buttons.pop(iface) for iface in removed if iface in interface_buttons]
+        )
+        new_buttons = []
+        for iface in sorted(added):
+            for description in BUTTON_TYPES:
+                if description.is_interface_template:
+                    interface_buttons[iface] = _interface_button(coordinator, description, iface)
+                    new_buttons.append(interface_buttons[iface])
+        if new_buttons:
+            async_add_entities(new_buttons)
+
+    entry.async_on_unload(coordinator.async_add_template_listener(_async_interfaces_changed))
+
+
+def _interface_button(
+    coordinator: OpenWrtDataUpdateCoordinator,
+    description: OpenWrtButtonEntityDescription,
+    iface: str,
+) -> "OpenWrtButton":
+    """按模板为接口创建重连按钮"""
+    # 动态生成新的 Description
+    # 使用 dataclasses.replace 复制模板并修改特定字段
+    new_desc = replace(
+        description,
+        key=f"reconnect_{iface}",                  # 生成唯一 Key: reconnect_wan
+        name=description.name.format(iface.upper()), # 格式化名称: Reconnect WAN
+        ubus_payload=iface,                        # 设置 Payload: wan
+        icon="mdi:lan-connect"                     # 你也可以根据接口名动态给不同图标
+    )
+    return OpenWrtButton(coordinator, new_desc)
+
 class OpenWrtButton(ButtonEntity):
     """OpenWrt Button."""
 
@@ -83,14 +117,29 @@ class OpenWrtButton(ButtonEntity):
             # 模式 B: 高效 UBUS 模式
             elif self.entity_description.ubus_method:
                 _LOGGER.debug(f"Action Type: UBUS -> Method: {self.entity_description.ubus_method}, Payload: {self.entity_description.ubus_payload}")
-                await self.coordinator.api.execute_ubus_action(
-                    self.entity_description.ubus_method,
-                    self.entity_description.ubus_payload
-                )
+                reboot = self.entity_description.ubus_method == "system_reboot"
+                if reboot:
+                    # 发送之前就进入重启窗口 (路由器可能来不及回复就已关机)：
+                    # 重启期间暂停轮询，恢复后立即重连
+                    self.coordinator.async_expect_reboot()
+                try:
+                    await self.coordinator.api.execute_ubus_action(
+                        self.entity_description.ubus_method,
+                        self.entity_description.ubus_payload
+                    )
+                except (OpenWrtActionError, OpenWrtAuthError):
+                    # 路由器明确返回了错误；连接错误/超时时无法确定，保持重启窗口
+                    if reboot:
+                        self.coordinator.async_cancel_reboot()
+                    raise
                 _LOGGER.info(f"Button action executed successfully (UBUS): {self.name}")
                 
             else:
                 _LOGGER.warning(f"Button {self.name} has no valid action configuration!")
 
+        except (OpenWrtActionError, OpenWrtAuthError, OpenWrtConnectionError) as e:
+            # 动作经路由器确认失败: 在界面上报告错误
+            _LOGGER.error(f"Failed to execute button press for {self.name}: {e}")
+            raise HomeAssistantError(f"Failed to execute {self.name}: {e}") from e
         except Exception as e:
             _LOGGER.error(f"Failed to execute button press for {self.name}: {e}", exc_info=True)
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""Record/replay of raw ubus batches for OpenWrt."""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Any, Iterator
+
+from .ubus import UbusCall
+
+_LOGGER = logging.getLogger(__name__)
+
+# 单个捕获文件的大小上限 (压缩后字节数)，达到后停止写入
+CAPTURE_MAX_BYTES = 5 * 1024 * 1024
+# 替换 sysauth token 的占位符
+REDACTED = b"**REDACTED**"
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_") or "unknown"
+
+
+class BatchRecorder:
+    """把每次轮询的原始批量响应写入 gzip JSON Lines 文件 (每个路由器、每个固件版本一个文件).
+
+    每行: {"t": 时间戳, "calls": [调用 key], "response": 原始响应文本}。
+    响应中的 sysauth token 会被替换；请求参数不记录 (由调用 key 在回放时还原)。
+    record() 只在内存中缓存，flush() 在执行器中写盘。
+    """
+
+    def __init__(self, directory: str, host: str) -> None:
+        self._directory = directory
+        self._host = _slug(re.sub(r"^https?://", "", host))
+        self._pending: list[tuple[str, bytes]] = []
+
+    def record(
+        self, firmware: str | None, calls: list[UbusCall], raw: bytes, token: str | None
+    ) -> None:
+        if token:
+            raw = raw.replace(token.encode(), REDACTED)
+        line = json.dumps(
+            {
+                "t": round(time.time(), 3),
+                "calls": [call.key for call in calls],
+                "response": raw.decode("utf-8", "replace"),
+            },
+            separators=(",", ":"),
+        )
+        self._pending.append((firmware or "unknown", line.encode() + b"\n"))
+
+    def path(self, firmware: str) -> str:
+        return os.path.join(self._directory, f"{self._host}_{_slug(firmware)}.jsonl.gz")
+
+    def flush(self) -> None:
+        """写入缓存的记录 (阻塞 IO，需在执行器中调用)"""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        os.makedirs(self._directory, exist_ok=True)
+        for firmware in dict.fromkeys(firmware for firmware, _ in pending):
+            path = self.path(firmware)
+            if os.path.exists(path) and os.path.getsize(path) >= CAPTURE_MAX_BYTES:
+                continue
+            # gzip 支持多成员追加，gzip.open 可连续读出
+            with gzip.open(path, "ab") as file:
+                file.writelines(line for fw, line in pending if fw == firmware)
+
+
+def load_capture(path: str) -> Iterator[tuple[list[str], bytes]]:
+    """逐条读取捕获文件: (调用 key 列表, 原始响应)"""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                yield record["calls"], record["response"].encode()
+
+
+class _ReplayEntry:
+    """回放时协调器使用的配置条目 (没有真实条目，选项由捕获中的调用推断)"""
+
+    entry_id = "replay"
+    data: dict[str, Any] = {}
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        self.options = options
+
+    def async_on_unload(self, func) -> None:
+        pass
+
+
+async def async_replay(hass, path: str, repeat: int = 1) -> dict[str, Any]:
+    """不限速地把捕获的批次按原顺序送入协调器的更新流程，返回吞吐量和解析统计.
+
+    经过与轮询相同的解析、流量速率、CPU 差值和监听者通知 (API 不发请求，直接返回捕获的批次)。
+    """
+    from .api import OpenWrtApi
+    from .const import CONF_CONNTRACK_ANALYTICS, CONF_TRACK_CLIENTS
+    from .coordinator import OpenWrtDataUpdateCoordinator
+
+    class ReplayApi(OpenWrtApi):
+        """按顺序返回捕获批次解析结果的 API (不登录、不发请求)"""
+
+        def __init__(self, batches: Iterator[tuple[list[str], bytes]]) -> None:
+            super().__init__("replay", "", "", session=None)
+            self._batches = batches
+
+        async def get_data(self) -> dict[str, Any]:
+            return self.replay_batch(*next(self._batches))
+
+    records = list(load_capture(path))
+    keys = set().union(*(batch_keys for batch_keys, _ in records))
+    api = ReplayApi(itertools.chain.from_iterable(itertools.repeat(records, repeat)))
+    entry = _ReplayEntry({
+        CONF_CONNTRACK_ANALYTICS: "conntrack_table" in keys,
+        CONF_TRACK_CLIENTS: "dhcp_leases" in keys,
+    })
+    coordinator = OpenWrtDataUpdateCoordinator(hass, api, 10, entry)
+    stats = {"notifications": 0, "changed_keys": 0, "template_changes": 0}
+
+    def _listener() -> None:
+        stats["notifications"] += 1
+        stats["changed_keys"] += len(coordinator.changed_keys or ())
+
+    def _template_listener(list_key: str, added: set[str], removed: set[str]) -> None:
+        stats["template_changes"] += 1
+
+    unsub = coordinator.async_add_listener(_listener)
+    unsub_template = coordinator.async_add_template_listener(_template_listener)
+    batches = len(records) * repeat
+    started = time.perf_counter()
+    for _ in range(batches):
+        coordinator.async_set_updated_data(await coordinator._async_update_data())
+    elapsed = time.perf_counter() - started
+    unsub()
+    unsub_template()
+    return {
+        "batches": batches,
+        "seconds": round(elapsed, 4),
+        "batches_per_second": round(batches / elapsed, 1) if elapsed else None,
+        **stats,
+        # 最后一批中算出的流量速率个数 (首批没有速率)
+        "rates": sum(
+            1 for key, value in (coordinator.data or {}).items()
+            if key.endswith("_rate") and value is not None
+        ),
+        "metrics": api.metrics.as_dict(),
+    }
+
+
+def replay(path: str, repeat: int = 1) -> dict[str, Any]:
+    """在独立的事件循环中回放 (临时配置目录中的 HA 实例)"""
+    from homeassistant.core import HomeAssistant
+
+    async def _run() -> dict[str, Any]:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            try:
+                return await async_replay(hass, path, repeat)
+            finally:
+                await hass.async_stop(force=True)
+
+    return asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    # python -m custom_components.openwrt.capture <捕获文件> [重复次数]
+    print(json.dumps(
+        replay(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 1), indent=2
+    ))
@@ -3,8 +3,37 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, CONF_HOST, CONF_USERNAME, CONF_PASSWORD, CONF_UPDATE_INTERVAL
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_UPDATE_INTERVAL,
+    CONF_PUSH_EVENTS,
+    CONF_DEDICATED_CONNECTION,
+    CONF_KEEPALIVE,
+    CONF_CONNECTION_LIMIT,
+    CONF_SSL_FINGERPRINT,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_SAMPLE_INTERVAL,
+    CONF_CAPTURE,
+    CONF_UPTIME_TIMESTAMP,
+    CONF_CONNTRACK_ANALYTICS,
+    CONF_TRACK_CLIENTS,
+    CONF_TRACKED_CLIENTS,
+    CONF_INTERFACE_INCLUDE,
+    CONF_INTERFACE_EXCLUDE,
+    DEFAULT_KEEPALIVE,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_SAMPLE_INTERVAL,
+)
 from .api import OpenWrtApi, OpenWrtAuthError
+from .connection import parse_fingerprint
+from .coordinator import parse_client_macs
 
 class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle config flow."""
@@ -31,7 +60,9 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     
                     return self.async_create_entry(
                         title=user_input[CONF_HOST], 
-                        data=user_input
+                        data=user_input,
+                        # 新条目的在线时间传感器直接以时间戳发布
+                        options={CONF_UPTIME_TIMESTAMP: True},
                     )
                 else:
                     errors["base"] = "cannot_connect"
@@ -57,15 +88,96 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         super().__init__()
 
     async def async_step_init(self, user_input=None):
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if fingerprint := user_input.get(CONF_SSL_FINGERPRINT, "").strip():
+                try:
+                    parse_fingerprint(fingerprint)
+                except ValueError:
+                    errors[CONF_SSL_FINGERPRINT] = "invalid_fingerprint"
+            try:
+                parse_client_macs(user_input.get(CONF_TRACKED_CLIENTS))
+            except ValueError:
+                errors[CONF_TRACKED_CLIENTS] = "invalid_mac"
+            if user_input.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL) > user_input.get(
+                CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL
+            ):
+                errors["base"] = "invalid_interval_range"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
 
+        options = self.config_entry.options
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
                 vol.Optional(
                     CONF_UPDATE_INTERVAL,
-                    default=self.config_entry.options.get(CONF_UPDATE_INTERVAL, 10),
-                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+                    default=options.get(CONF_UPDATE_INTERVAL, 10),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_PUSH_EVENTS,
+                    default=options.get(CONF_PUSH_EVENTS, False),
+                ): bool,
+                vol.Optional(
+                    CONF_ADAPTIVE_INTERVAL,
+                    default=options.get(CONF_ADAPTIVE_INTERVAL, False),
+                ): bool,
+                vol.Optional(
+                    CONF_MIN_INTERVAL,
+                    default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_MAX_INTERVAL,
+                    default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_SAMPLE_INTERVAL,
+                    default=options.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=60)),
+                vol.Optional(
+                    CONF_CAPTURE,
+                    default=options.get(CONF_CAPTURE, False),
+                ): bool,
+                vol.Optional(
+                    CONF_INTERFACE_INCLUDE,
+                    default=options.get(CONF_INTERFACE_INCLUDE, ""),
+                ): str,
+                vol.Optional(
+                    CONF_INTERFACE_EXCLUDE,
+                    default=options.get(CONF_INTERFACE_EXCLUDE, ""),
+                ): str,
+                vol.Optional(
+                    CONF_CONNTRACK_ANALYTICS,
+                    default=options.get(CONF_CONNTRACK_ANALYTICS, False),
+                ): bool,
+                vol.Optional(
+                    CONF_TRACK_CLIENTS,
+                    default=options.get(CONF_TRACK_CLIENTS, False),
+                ): bool,
+                vol.Optional(
+                    CONF_TRACKED_CLIENTS,
+                    default=options.get(CONF_TRACKED_CLIENTS, ""),
+                ): str,
+                vol.Optional(
+                    CONF_UPTIME_TIMESTAMP,
+                    default=options.get(CONF_UPTIME_TIMESTAMP, False),
+                ): bool,
+                vol.Optional(
+                    CONF_DEDICATED_CONNECTION,
+                    default=options.get(CONF_DEDICATED_CONNECTION, False),
+                ): bool,
+                vol.Optional(
+                    CONF_KEEPALIVE,
+                    default=options.get(CONF_KEEPALIVE, DEFAULT_KEEPALIVE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                vol.Optional(
+                    CONF_CONNECTION_LIMIT,
+                    default=options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                vol.Optional(
+                    CONF_SSL_FINGERPRINT,
+                    default=options.get(CONF_SSL_FINGERPRINT, ""),
+                ): str,
             }),
+            errors=errors,
         )
\ No newline at end of file
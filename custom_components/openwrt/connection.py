@@ -0,0 +1,73 @@
+"""Per-router HTTP connection for OpenWrt."""
+from __future__ import annotations
+
+import ssl
+from typing import Any
+
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.ssl import get_default_no_verify_context
+
+from .const import (
+    CONF_CONNECTION_LIMIT,
+    CONF_DEDICATED_CONNECTION,
+    CONF_HOST,
+    CONF_KEEPALIVE,
+    CONF_SSL_FINGERPRINT,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_KEEPALIVE,
+    DNS_CACHE_TTL,
+)
+
+
+def parse_fingerprint(value: str) -> aiohttp.Fingerprint:
+    """把 SHA-256 证书指纹 (hex，可带冒号) 转换为 aiohttp.Fingerprint"""
+    return aiohttp.Fingerprint(bytes.fromhex(value.replace(":", "").strip()))
+
+
+def ssl_setting(entry: ConfigEntry) -> aiohttp.Fingerprint | ssl.SSLContext | bool:
+    """请求使用的 ssl 参数.
+
+    配置了证书指纹时固定 (pin) 路由器的自签名证书；
+    否则与原来一样不校验证书 (HTTPS 时复用 HA 预先创建好的 SSLContext)。
+    """
+    if fingerprint := entry.options.get(CONF_SSL_FINGERPRINT):
+        return parse_fingerprint(fingerprint)
+    if entry.data[CONF_HOST].startswith("https://"):
+        return get_default_no_verify_context()
+    return False
+
+
+def async_get_router_session(
+    hass: HomeAssistant, entry: ConfigEntry, ssl_param: Any
+) -> aiohttp.ClientSession:
+    """返回该路由器使用的 ClientSession.
+
+    默认使用 HA 共享的 session；启用独立连接时为该路由器创建专用的连接器
+    (可配置 keep-alive 时长和每主机连接数上限，DNS 结果缓存)，条目卸载或 HA 停止时关闭。
+    """
+    if not entry.options.get(CONF_DEDICATED_CONNECTION, False):
+        return async_get_clientsession(hass)
+
+    connector = aiohttp.TCPConnector(
+        limit_per_host=entry.options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+        keepalive_timeout=entry.options.get(CONF_KEEPALIVE, DEFAULT_KEEPALIVE),
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        ssl=ssl_param,
+    )
+    # 路由器通常以 IP 访问，需要 unsafe cookie jar 才能保存 sysauth
+    session = aiohttp.ClientSession(
+        connector=connector, cookie_jar=aiohttp.CookieJar(unsafe=True)
+    )
+
+    async def _async_close(_event: Event) -> None:
+        await session.close()
+
+    entry.async_on_unload(session.close)
+    entry.async_on_unload(hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _async_close))
+    return session
@@ -0,0 +1,102 @@
+"""Connection tracking table analytics for OpenWrt."""
+from __future__ import annotations
+
+import heapq
+from operator import itemgetter
+from typing import Any, Iterable, Iterator
+
+# 属性中列出的连接数最多的源主机数量，以及近似统计时跟踪的主机数上限
+CONNTRACK_TOP_N = 10
+CONNTRACK_TRACKED_HOSTS = 256
+
+# 单独计数的协议，其余协议计入 other
+CONNTRACK_PROTOCOLS = ("tcp", "udp", "icmp")
+
+CONNTRACK_TABLE = "/proc/net/nf_conntrack"
+
+
+class TopTalkers:
+    """固定容量的高频项统计 (Space-Saving 算法).
+
+    最多跟踪 capacity 个源主机；已满时新主机替换计数最小的主机并继承其计数，
+    继承的部分记为该主机的误差。计数是上界，计数减误差是下界；
+    连接数超过总数 1/capacity 的主机一定会保留下来。
+    """
+
+    def __init__(self, capacity: int = CONNTRACK_TRACKED_HOSTS) -> None:
+        self._capacity = capacity
+        self._counts: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        # (计数, 主机) 最小堆，每个主机一项；计数增加时不更新，替换前再修正过期的堆顶
+        self._heap: list[tuple[int, str]] = []
+
+    def add(self, host: str) -> None:
+        counts = self._counts
+        if host in counts:
+            counts[host] += 1
+            return
+        heap = self._heap
+        if len(counts) < self._capacity:
+            counts[host] = 1
+            self._errors[host] = 0
+            heapq.heappush(heap, (1, host))
+            return
+        while (count := counts[heap[0][1]]) != heap[0][0]:
+            heapq.heapreplace(heap, (count, heap[0][1]))
+        evicted = heap[0][1]
+        del counts[evicted], self._errors[evicted]
+        counts[host] = count + 1
+        self._errors[host] = count
+        heapq.heapreplace(heap, (count + 1, host))
+
+    def top(self, count: int = CONNTRACK_TOP_N) -> dict[str, int]:
+        """计数最大的 count 个主机 (从多到少)"""
+        return dict(heapq.nlargest(count, self._counts.items(), key=itemgetter(1)))
+
+    def error(self, hosts: Iterable[str]) -> int:
+        """这些主机计数的最大误差 (0 表示计数准确)"""
+        return max((self._errors[host] for host in hosts), default=0)
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """逐行遍历，不生成整张表的行列表"""
+    start = 0
+    while (end := text.find("\n", start)) != -1:
+        yield text[start:end]
+        start = end + 1
+    if start < len(text):
+        yield text[start:]
+
+
+def summarize_conntrack(lines: Iterable[str]) -> dict[str, Any]:
+    """流式解析 /proc/net/nf_conntrack，按协议、TCP 状态和源主机汇总 (内存占用与表大小无关).
+
+    行格式: ipv4 2 tcp 6 431999 ESTABLISHED src=192.168.1.2 dst=... (非 TCP 没有状态字段)
+    """
+    protocols = dict.fromkeys(CONNTRACK_PROTOCOLS + ("other",), 0)
+    tcp_states: dict[str, int] = {}
+    talkers = TopTalkers()
+    entries = 0
+    for line in lines:
+        fields = line.split(None, 7)
+        if len(fields) < 7:
+            continue
+        entries += 1
+        protocol = fields[2]
+        if protocol == "icmpv6":
+            protocol = "icmp"
+        protocols[protocol if protocol in protocols else "other"] += 1
+        source = fields[5]
+        if not source.startswith("src="):
+            if protocol == "tcp":
+                tcp_states[source] = tcp_states.get(source, 0) + 1
+            source = fields[6]
+        talkers.add(source[4:])
+    top = talkers.top()
+    return {
+        "entries": entries,
+        "protocols": protocols,
+        "tcp_states": tcp_states,
+        "top": top,
+        "top_error": talkers.error(top),
+    }
@@ -11,6 +11,10 @@ from homeassistant.components.sensor import (
 from homeassistant.components.button import ButtonEntityDescription
 from homeassistant.const import (
     PERCENTAGE,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfDataRate,
+    UnitOfInformation,
     UnitOfTemperature,
     UnitOfTime,
 )
@@ -21,14 +25,116 @@ CONF_HOST: Final = "host"
 CONF_USERNAME: Final = "username"
 CONF_PASSWORD: Final = "password"
 CONF_UPDATE_INTERVAL: Final = "update_interval_seconds"
+CONF_PUSH_EVENTS: Final = "push_events"
+CONF_DEDICATED_CONNECTION: Final = "dedicated_connection"
+CONF_KEEPALIVE: Final = "keepalive_seconds"
+CONF_CONNECTION_LIMIT: Final = "connection_limit"
+CONF_SSL_FINGERPRINT: Final = "ssl_fingerprint"
+CONF_ADAPTIVE_INTERVAL: Final = "adaptive_interval"
+CONF_MIN_INTERVAL: Final = "min_interval_seconds"
+CONF_MAX_INTERVAL: Final = "max_interval_seconds"
+CONF_SAMPLE_INTERVAL: Final = "sample_interval_seconds"
+CONF_CAPTURE: Final = "capture_responses"
+CONF_UPTIME_TIMESTAMP: Final = "uptime_as_timestamp"
+# 接口允许/排除列表: 逗号分隔的 glob 模式，e.g. "wan, lan, wg*"
+CONF_INTERFACE_INCLUDE: Final = "interface_include"
+CONF_INTERFACE_EXCLUDE: Final = "interface_exclude"
+CONF_CONNTRACK_ANALYTICS: Final = "conntrack_analytics"
+CONF_TRACK_CLIENTS: Final = "track_clients"
+# 只为这些终端创建追踪器: 逗号分隔的 MAC 地址；留空时为出现在无线终端列表中的终端创建
+CONF_TRACKED_CLIENTS: Final = "tracked_clients"
+
+# 独立连接默认值: keep-alive 小于 uhttpd 默认的 20 秒，避免复用已被路由器关闭的连接
+DEFAULT_KEEPALIVE: Final = 15
+DEFAULT_CONNECTION_LIMIT: Final = 2
+DNS_CACHE_TTL: Final = 300
+# 高频采样: 两次轮询之间按 CONF_SAMPLE_INTERVAL 采样的指标 (0 表示关闭)，
+# 发布时以 <key>_stats 给出 min/max/mean/p95
+SAMPLED_METRICS: Final = ("openwrt_cpu", "openwrt_memory", "openwrt_conncount")
+DEFAULT_SAMPLE_INTERVAL: Final = 0
+
+# 熔断: 连续多少次连接失败后熔断、退避的初始/最大秒数及随机抖动比例
+BREAKER_THRESHOLD: Final = 3
+BREAKER_BASE_BACKOFF: Final = 15
+BREAKER_MAX_BACKOFF: Final = 300
+BREAKER_JITTER: Final = 0.2
+# 重启窗口: 按下重启按钮后等待路由器关机的秒数、探测间隔及窗口总时长
+REBOOT_SETTLE: Final = 15
+REBOOT_PROBE_INTERVAL: Final = 5
+REBOOT_WINDOW: Final = 300
+
+# 在线时间以开机/连接时刻 (时间戳) 发布；两次轮询算出的时刻相差不超过该秒数时视为未变化
+UPTIME_JITTER_TOLERANCE: Final = 5
+
+# 原始批量响应的捕获目录 (HA 配置目录下)，用于离线回放
+CAPTURE_DIRECTORY: Final = "openwrt_captures"
+
+# 改变实体种类的选项及其默认值: 变化时重新加载条目 (重建实体)。
+# 在线时间时间戳对已有条目默认关闭 (不改变已有传感器)，新建条目时打开
+RELOAD_OPTIONS: Final = {
+    CONF_UPTIME_TIMESTAMP: False,
+    CONF_CONNTRACK_ANALYTICS: False,
+    CONF_TRACK_CLIENTS: False,
+    CONF_TRACKED_CLIENTS: "",
+}
+
+# 影响 HTTP 连接的选项: 变化时为该路由器换用新的 session (不重新加载条目)
+CONNECTION_OPTIONS: Final = (
+    CONF_DEDICATED_CONNECTION,
+    CONF_KEEPALIVE,
+    CONF_CONNECTION_LIMIT,
+    CONF_SSL_FINGERPRINT,
+)
+# 换下来的专用 session 延迟关闭的秒数
+SESSION_CLOSE_DELAY: Final = 30
+
+# 自适应轮询: 默认上下限 (秒)、视为高负载的 CPU 百分比、
+# 连续多少次无变化后放慢、连接数增长多少比例视为突增
+DEFAULT_MIN_INTERVAL: Final = 5
+DEFAULT_MAX_INTERVAL: Final = 120
+ADAPTIVE_CPU_HIGH: Final = 80
+ADAPTIVE_STABLE_POLLS: Final = 6
+ADAPTIVE_CONNTRACK_SPIKE: Final = 0.5
+
+# 动态模板的成员列表 (coordinator.data 中的 key): 接口、无线射频、SSID、CPU 核心、在线终端
+TEMPLATE_LISTS: Final = (
+    "_available_interfaces", "_wireless_radios", "_wireless_ssids", "_cpu_cores", "_present_clients"
+)
+
+# 多路由器共享调度器 (hass.data key) 及同时进行的轮询上限
+DATA_FLEET: Final = f"{DOMAIN}_fleet"
+FLEET_MAX_CONCURRENT_POLLS: Final = 8
+
+# sysauth 会话持久化: 存储版本、过期前多少秒续期、仅顺延过期时间时的延迟保存秒数
+SESSION_STORAGE_VERSION: Final = 1
+SESSION_RENEW_MARGIN: Final = 60
+SESSION_SAVE_DELAY: Final = 300
+
+# 能力探测结果 (按固件版本缓存) 的存储版本
+CAPABILITY_STORAGE_VERSION: Final = 1
+
+# 终端跟踪: 最后在线时刻的存储版本、延迟保存秒数，
+# 以及离线多久 (秒) 后从实体注册表中删除 (列在选项中的终端除外)
+CLIENT_STORAGE_VERSION: Final = 1
+CLIENT_SAVE_DELAY: Final = 60
+CLIENT_RETENTION: Final = 30 * 24 * 3600
+
+# 推送模式: 事件流断开后的重连退避 (秒)
+EVENT_STREAM_RETRY_MIN: Final = 5
+EVENT_STREAM_RETRY_MAX: Final = 300
 
 @dataclass
 class OpenWrtSensorEntityDescription(SensorEntityDescription):
     """自定义 OpenWrt 传感器描述类"""
     json_key: str | None = None
     is_human_readable: bool = False
+    timestamp_suffix: str | None = None # 时间戳模式下改用 <key><suffix> 中的开机/连接时刻
     is_interface_template: bool = False
     template_suffix: str | None = None # e.g. "_ip", "_ipv6", "_uptime"
+    template_list: str = "_available_interfaces" # 模板成员列表: 接口、无线射频、SSID 或 CPU 核心
+    template_prefix: str = "" # 成员名前的 key 前缀, e.g. "wifi_" -> openwrt_wifi_wlan0_clients
+    attributes_key: str | None = None # coordinator.data 中存放额外属性的 key (模板中为后缀)
+    create_without_value: bool = False # key 存在但暂无值 (如首次采样的速率) 时也创建实体
 
 @dataclass
 class OpenWrtButtonEntityDescription(ButtonEntityDescription):
@@ -47,11 +153,13 @@ SENSOR_TYPES: tuple[OpenWrtSensorEntityDescription, ...] = (
         json_key="openwrt_uptime",
         name="Uptime",
         icon="mdi:clock-time-eight",
-        is_human_readable=True, 
+        is_human_readable=True,
+        timestamp_suffix="_since",
     ),
     OpenWrtSensorEntityDescription(
         key="cpu_load",
         json_key="openwrt_cpu",
+        attributes_key="openwrt_cpu_stats",
         name="CPU Load",
         icon="mdi:cpu-64-bit",
         unit_of_measurement=PERCENTAGE,
@@ -69,11 +177,151 @@ SENSOR_TYPES: tuple[OpenWrtSensorEntityDescription, ...] = (
     OpenWrtSensorEntityDescription(
         key="memory_usage",
         json_key="openwrt_memory",
+        attributes_key="openwrt_memory_stats",
         name="Memory Usage",
         icon="mdi:memory",
         unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
     ),
+    OpenWrtSensorEntityDescription(
+        key="cpu_iowait",
+        json_key="openwrt_cpu_iowait",
+        name="CPU IOWait",
+        icon="mdi:cpu-64-bit",
+        unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="cpu_softirq",
+        json_key="openwrt_cpu_softirq",
+        name="CPU Softirq",
+        icon="mdi:cpu-64-bit",
+        unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="load_1",
+        json_key="openwrt_load_1",
+        name="Load (1m)",
+        icon="mdi:chart-line",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="load_5",
+        json_key="openwrt_load_5",
+        name="Load (5m)",
+        icon="mdi:chart-line",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="load_15",
+        json_key="openwrt_load_15",
+        name="Load (15m)",
+        icon="mdi:chart-line",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="memory_available",
+        json_key="openwrt_memory_available",
+        name="Memory Available",
+        icon="mdi:memory",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="memory_buffered",
+        json_key="openwrt_memory_buffered",
+        name="Memory Buffered",
+        icon="mdi:memory",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="memory_cached",
+        json_key="openwrt_memory_cached",
+        name="Memory Cached",
+        icon="mdi:memory",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="memory_shared",
+        json_key="openwrt_memory_shared",
+        name="Memory Shared",
+        icon="mdi:memory",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="swap_usage",
+        json_key="openwrt_swap_usage",
+        name="Swap Usage",
+        icon="mdi:swap-horizontal",
+        unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="root_usage",
+        json_key="openwrt_root_usage",
+        name="Root Filesystem Usage",
+        icon="mdi:harddisk",
+        unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="tmp_usage",
+        json_key="openwrt_tmp_usage",
+        name="Tmp Filesystem Usage",
+        icon="mdi:folder-clock-outline",
+        unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    # 连接跟踪表分析 (可选，slow 层): 各协议连接数、连接数最多的源主机
+    OpenWrtSensorEntityDescription(
+        key="conntrack_tcp",
+        json_key="openwrt_conntrack_tcp",
+        attributes_key="openwrt_conntrack_tcp_states",
+        name="Conntrack TCP",
+        icon="mdi:lan-connect",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="conntrack_udp",
+        json_key="openwrt_conntrack_udp",
+        name="Conntrack UDP",
+        icon="mdi:lan-connect",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="conntrack_icmp",
+        json_key="openwrt_conntrack_icmp",
+        name="Conntrack ICMP",
+        icon="mdi:lan-connect",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="conntrack_other",
+        json_key="openwrt_conntrack_other",
+        name="Conntrack Other",
+        icon="mdi:lan-connect",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="conntrack_top_talker",
+        json_key="openwrt_conntrack_top_talker",
+        attributes_key="openwrt_conntrack_top_talkers",
+        name="Conntrack Top Talker",
+        icon="mdi:account-network",
+    ),
     OpenWrtSensorEntityDescription(
         key="online_users",
         json_key="openwrt_user_online",
@@ -84,10 +332,111 @@ SENSOR_TYPES: tuple[OpenWrtSensorEntityDescription, ...] = (
     OpenWrtSensorEntityDescription(
         key="active_connections",
         json_key="openwrt_conncount",
+        attributes_key="openwrt_conncount_stats",
         name="Active Connections",
         icon="mdi:lan-connect",
         state_class=SensorStateClass.MEASUREMENT,
     ),
+
+    # 轮询诊断传感器 (状态为 p95，属性为 last/p50/p95/max)
+    OpenWrtSensorEntityDescription(
+        key="poll_total",
+        json_key="openwrt_poll_total",
+        attributes_key="openwrt_poll_total_stats",
+        name="Poll Duration",
+        icon="mdi:timer-outline",
+        unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="poll_login",
+        json_key="openwrt_poll_login",
+        attributes_key="openwrt_poll_login_stats",
+        name="Poll Login Time",
+        icon="mdi:login",
+        unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="poll_http",
+        json_key="openwrt_poll_http",
+        attributes_key="openwrt_poll_http_stats",
+        name="Poll HTTP Round Trip",
+        icon="mdi:swap-horizontal",
+        unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="poll_response_bytes",
+        json_key="openwrt_poll_response_bytes",
+        attributes_key="openwrt_poll_response_bytes_stats",
+        name="Poll Response Size",
+        icon="mdi:file-download-outline",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="poll_decode",
+        json_key="openwrt_poll_decode",
+        attributes_key="openwrt_poll_decode_stats",
+        name="Poll JSON Decode Time",
+        icon="mdi:code-json",
+        unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="poll_parse",
+        json_key="openwrt_poll_parse",
+        attributes_key="openwrt_poll_parse_stats",
+        name="Poll Parse Time",
+        icon="mdi:cog-outline",
+        unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="poll_interval",
+        json_key="openwrt_poll_interval",
+        name="Poll Interval",
+        icon="mdi:timer-cog-outline",
+        device_class=SensorDeviceClass.DURATION,
+        unit_of_measurement=UnitOfTime.SECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="schedule_lag",
+        json_key="openwrt_schedule_lag",
+        name="Poll Schedule Lag",
+        icon="mdi:timer-alert-outline",
+        device_class=SensorDeviceClass.DURATION,
+        unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="rpc_errors",
+        json_key="openwrt_rpc_errors",
+        attributes_key="openwrt_rpc_errors_stats",
+        name="RPC Errors",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
     
     # [核心修改] 接口动态传感器模板
     
@@ -115,9 +464,186 @@ SENSOR_TYPES: tuple[OpenWrtSensorEntityDescription, ...] = (
         name="{} Uptime",
         icon="mdi:timer-sync-outline",
         is_human_readable=True,
+        timestamp_suffix="_since",
         is_interface_template=True,
         template_suffix="_uptime",
     ),
+
+    # 模板 4-5: 接口实时速率 (由累计字节数在本地计算)
+    OpenWrtSensorEntityDescription(
+        key="interface_rx_rate",
+        name="{} Download Speed",
+        icon="mdi:download-network",
+        device_class=SensorDeviceClass.DATA_RATE,
+        unit_of_measurement=UnitOfDataRate.KILOBYTES_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        is_interface_template=True,
+        template_suffix="_rx_rate",
+        create_without_value=True,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_tx_rate",
+        name="{} Upload Speed",
+        icon="mdi:upload-network",
+        device_class=SensorDeviceClass.DATA_RATE,
+        unit_of_measurement=UnitOfDataRate.KILOBYTES_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        is_interface_template=True,
+        template_suffix="_tx_rate",
+        create_without_value=True,
+    ),
+
+    # 模板 6-13: 接口累计计数 (network.device status)
+    OpenWrtSensorEntityDescription(
+        key="interface_rx_bytes",
+        name="{} Received",
+        icon="mdi:download",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        is_interface_template=True,
+        template_suffix="_rx_bytes",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_tx_bytes",
+        name="{} Sent",
+        icon="mdi:upload",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        is_interface_template=True,
+        template_suffix="_tx_bytes",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_rx_packets",
+        name="{} Received Packets",
+        icon="mdi:package-down",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        is_interface_template=True,
+        template_suffix="_rx_packets",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_tx_packets",
+        name="{} Sent Packets",
+        icon="mdi:package-up",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        is_interface_template=True,
+        template_suffix="_tx_packets",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_rx_errors",
+        name="{} Receive Errors",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        is_interface_template=True,
+        template_suffix="_rx_errors",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_tx_errors",
+        name="{} Send Errors",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        is_interface_template=True,
+        template_suffix="_tx_errors",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_rx_dropped",
+        name="{} Receive Drops",
+        icon="mdi:delete-alert-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        is_interface_template=True,
+        template_suffix="_rx_dropped",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="interface_tx_dropped",
+        name="{} Send Drops",
+        icon="mdi:delete-alert-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        is_interface_template=True,
+        template_suffix="_tx_dropped",
+    ),
+
+    # 无线射频模板 (iwinfo): 终端数量、平均信号、底噪；各终端的速率汇总在属性中
+    OpenWrtSensorEntityDescription(
+        key="wifi_clients",
+        name="WiFi {} Clients",
+        icon="mdi:wifi",
+        state_class=SensorStateClass.MEASUREMENT,
+        is_interface_template=True,
+        template_list="_wireless_radios",
+        template_prefix="wifi_",
+        template_suffix="_clients",
+        attributes_key="_stats",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="wifi_signal",
+        name="WiFi {} Client Signal",
+        icon="mdi:wifi-strength-2",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        is_interface_template=True,
+        template_list="_wireless_radios",
+        template_prefix="wifi_",
+        template_suffix="_signal",
+    ),
+    OpenWrtSensorEntityDescription(
+        key="wifi_noise",
+        name="WiFi {} Noise",
+        icon="mdi:wifi-strength-alert-outline",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        is_interface_template=True,
+        template_list="_wireless_radios",
+        template_prefix="wifi_",
+        template_suffix="_noise",
+    ),
+    # CPU 核心模板 (/proc/stat): 每个核心的使用率和 softirq 占比
+    OpenWrtSensorEntityDescription(
+        key="cpu_core_usage",
+        name="{} Usage",
+        icon="mdi:cpu-64-bit",
+        unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        is_interface_template=True,
+        template_list="_cpu_cores",
+        template_suffix="_usage",
+        create_without_value=True,
+    ),
+    OpenWrtSensorEntityDescription(
+        key="cpu_core_softirq",
+        name="{} Softirq",
+        icon="mdi:cpu-64-bit",
+        unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        is_interface_template=True,
+        template_list="_cpu_cores",
+        template_suffix="_softirq",
+        create_without_value=True,
+    ),
+    # SSID 模板: 所有射频上该 SSID 的终端总数
+    OpenWrtSensorEntityDescription(
+        key="ssid_clients",
+        name="SSID {} Clients",
+        icon="mdi:wifi-star",
+        state_class=SensorStateClass.MEASUREMENT,
+        is_interface_template=True,
+        template_list="_wireless_ssids",
+        template_prefix="ssid_",
+        template_suffix="_clients",
+    ),
 )
 
 # --- 按钮定义 ---
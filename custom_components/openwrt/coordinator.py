@@ -1,73 +1,747 @@
-"""Coordinator for OpenWrt."""
-import logging
-from datetime import timedelta
-import async_timeout
-
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.exceptions import ConfigEntryAuthFailed
-
-from .const import DOMAIN
-from .api import OpenWrtApi, OpenWrtAuthError, OpenWrtConnectionError
-
-_LOGGER = logging.getLogger(__name__)
-
-class OpenWrtDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching OpenWrt data."""
-
-    def __init__(
-        self, 
-        hass: HomeAssistant, 
-        api: OpenWrtApi, 
-        update_interval: int
-    ) -> None:
-        """Initialize."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
-        )
-        self.api = api
-        self.device_info = {}
-
-    async def _async_update_data(self):
-        """Update data via API."""
-        try:
-            # 设定超时保护，防止请求卡死
-            async with async_timeout.timeout(15):
-                data = await self.api.get_data()
-                
-                if data:
-                    self.device_info = {
-                        "identifiers": {(DOMAIN, self.api._host)},
-                        "name": data.get("device_name", "OpenWrt Router"),
-                        "manufacturer": "OpenWrt",
-                        "model": data.get("device_model", "Router"),
-                        "sw_version": data.get("sw_version"),
-                        "configuration_url": self.api._host,
-                    }
-                return data
-
-        except OpenWrtAuthError:
-            # Token 过期或认证失败
-            _LOGGER.debug("Authentication failed, trying to re-login...")
-            # 尝试重新登录一次
-            try:
-                self.api._sysauth = None
-                await self.api.login()
-                # 重登录后立即重试获取数据
-                return await self.api.get_data()
-            except (OpenWrtAuthError, OpenWrtConnectionError) as err:
-                # 如果重试依然失败，抛出 UpdateFailed
-                # 这样 HA 会标记实体为“不可用”，并在下个周期自动重试
-                raise UpdateFailed(f"Authentication failed: {err}") from err
-
-        except OpenWrtConnectionError as err:
-            # 网络连接错误（如路由器重启中）
-            # 直接抛出 UpdateFailed，实体变“不可用”，等待路由器启动完成
-            raise UpdateFailed(f"Connection error: {err}") from err
-            
-        except Exception as err:
-            # 其他未知错误
-            raise UpdateFailed(f"Unexpected error: {err}") from err
\ No newline at end of file
+"""Coordinator for OpenWrt."""
+import asyncio
+import logging
+import random
+import re
+import time
+from datetime import datetime, timedelta
+import async_timeout
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    ADAPTIVE_CONNTRACK_SPIKE,
+    ADAPTIVE_CPU_HIGH,
+    ADAPTIVE_STABLE_POLLS,
+    BREAKER_BASE_BACKOFF,
+    BREAKER_JITTER,
+    BREAKER_MAX_BACKOFF,
+    BREAKER_THRESHOLD,
+    CAPABILITY_STORAGE_VERSION,
+    CAPTURE_DIRECTORY,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_CAPTURE,
+    CONF_INTERFACE_EXCLUDE,
+    CONF_INTERFACE_INCLUDE,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONNECTION_OPTIONS,
+    CONF_PUSH_EVENTS,
+    CONF_SAMPLE_INTERVAL,
+    CONF_UPDATE_INTERVAL,
+    CONF_CONNTRACK_ANALYTICS,
+    CONF_TRACK_CLIENTS,
+    CONF_UPTIME_TIMESTAMP,
+    RELOAD_OPTIONS,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_SAMPLE_INTERVAL,
+    SAMPLED_METRICS,
+    TEMPLATE_LISTS,
+    UPTIME_JITTER_TOLERANCE,
+    EVENT_STREAM_RETRY_MAX,
+    EVENT_STREAM_RETRY_MIN,
+    REBOOT_PROBE_INTERVAL,
+    REBOOT_SETTLE,
+    REBOOT_WINDOW,
+    SESSION_RENEW_MARGIN,
+    SESSION_SAVE_DELAY,
+    SESSION_STORAGE_VERSION,
+)
+from .api import (
+    OpenWrtApi,
+    OpenWrtAuthError,
+    OpenWrtConnectionError,
+    OpenWrtNotSupportedError,
+)
+from .capture import BatchRecorder
+from .cpu import CpuUsageTracker
+from .metrics import SampleRing
+from .traffic import CounterRateTracker
+from .ubus import TIER_SLOW, InterfaceFilter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def session_storage_key(entry_id: str) -> str:
+    """sysauth 会话的存储 key"""
+    return f"{DOMAIN}.session.{entry_id}"
+
+
+def capability_storage_key(entry_id: str) -> str:
+    """能力探测结果的存储 key"""
+    return f"{DOMAIN}.capabilities.{entry_id}"
+
+
+def client_storage_key(entry_id: str) -> str:
+    """终端最后在线时刻的存储 key"""
+    return f"{DOMAIN}.clients.{entry_id}"
+
+
+def parse_client_macs(text: str | None) -> frozenset[str]:
+    """选项中逗号分隔的 MAC 地址 (统一为小写、冒号分隔)；格式错误时抛出 ValueError"""
+    macs = set()
+    for item in (text or "").split(","):
+        if not (item := item.strip()):
+            continue
+        if not re.fullmatch(r"[0-9a-fA-F]{2}([:-][0-9a-fA-F]{2}){5}", item):
+            raise ValueError(f"Invalid MAC address: {item}")
+        macs.add(item.lower().replace("-", ":"))
+    return frozenset(macs)
+
+
+def interface_filter(options) -> InterfaceFilter:
+    """由选项创建接口允许/排除列表"""
+    return InterfaceFilter.from_options(
+        options.get(CONF_INTERFACE_INCLUDE), options.get(CONF_INTERFACE_EXCLUDE)
+    )
+
+
+def reload_options(entry: ConfigEntry) -> dict:
+    """需要重新加载条目才能生效的选项的当前值"""
+    return {key: entry.options.get(key, default) for key, default in RELOAD_OPTIONS.items()}
+
+
+class OpenWrtDataUpdateCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching OpenWrt data."""
+
+    def __init__(
+        self, 
+        hass: HomeAssistant, 
+        api: OpenWrtApi, 
+        update_interval: int,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize."""
+        # 不使用 DataUpdateCoordinator 自带的定时器，
+        # 轮询由 OpenWrtFleetScheduler 统一错峰调度
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=None,
+        )
+        self.api = api
+        self.device_info = {}
+        self.poll_interval = timedelta(seconds=update_interval)
+        # 相对计划时间的落后秒数 (由调度器写入)
+        self.schedule_lag = 0.0
+        # 轮询间隔变化时的回调 (由调度器设置，用于立即按新间隔重新排期)
+        self.interval_listener = None
+        # 建立连接时的配置，选项更新时据此判断需要重载、换用 session 还是原地应用
+        self.config_data = dict(entry.data)
+        self.connection_options = {key: entry.options.get(key) for key in CONNECTION_OPTIONS}
+        self.reload_options = reload_options(entry)
+
+        # 自适应轮询: 在 [min, max] 之间根据路由器负载和数据变化调整间隔
+        self._adaptive = entry.options.get(CONF_ADAPTIVE_INTERVAL, False)
+        self._min_interval = entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        self._max_interval = entry.options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+        self._stable_polls = 0
+        self._event_stream: asyncio.Task | None = None
+
+        # 高频采样: 两次发布之间的样本存入定长环形缓冲，发布时汇总为属性
+        self._sample_interval = entry.options.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL)
+        self._samples = {key: SampleRing() for key in SAMPLED_METRICS}
+        self._sampler: asyncio.Task | None = None
+
+        # 捕获原始批量响应 (离线回放、解析回归测试)
+        self._async_set_capture(entry.options.get(CONF_CAPTURE, False))
+        self.api.set_interface_filter(interface_filter(entry.options))
+        self.api.set_conntrack_analytics(entry.options.get(CONF_CONNTRACK_ANALYTICS, False))
+        self._track_clients = entry.options.get(CONF_TRACK_CLIENTS, False)
+        self.api.set_client_tracking(self._track_clients)
+        # 接口流量速率 (由相邻两次轮询的累计字节数计算)
+        self._traffic = CounterRateTracker()
+        self._cpu = CpuUsageTracker()
+        # 在线时间传感器发布开机/连接时刻 (变化需要重建实体，属于 RELOAD_OPTIONS)
+        self.uptime_as_timestamp = entry.options.get(CONF_UPTIME_TIMESTAMP, False)
+        self._up_since: dict[str, datetime] = {}
+
+        # sysauth 会话持久化，重启后复用，过期前后台续期
+        self._session_store = Store(
+            hass, SESSION_STORAGE_VERSION, session_storage_key(entry.entry_id)
+        )
+        self._session_token = None
+        self._unsub_session_renewal = None
+        entry.async_on_unload(self._async_cancel_session_renewal)
+
+        # 熔断: 连续连接失败后按指数退避 (带抖动) 暂停轮询，恢复前先做 TCP 探测
+        self._failures = 0
+        self._open_until = 0.0
+        # 重启窗口 (重启按钮按下后): 暂停常规轮询，频繁探测，路由器恢复后立即重连
+        self._reboot_until = 0.0
+        self._reboot_uptime = None
+        self._unsub_reboot_probe = None
+        entry.async_on_unload(self._async_cancel_reboot_probe)
+
+        # 能力探测结果按固件版本持久化，重启后不必重新探测
+        self._capability_store = Store(
+            hass, CAPABILITY_STORAGE_VERSION, capability_storage_key(entry.entry_id)
+        )
+        self._capability_state = None
+
+        # 上一次通知时的数据快照，用于按 key 计算变化
+        self._previous_data: dict | None = None
+        self._previous_success = True
+        # 本次刷新中值发生变化的 key (None 表示全部视为变化)
+        self.changed_keys: set[str] | None = None
+        # 各模板列表 (接口、无线射频、SSID) 的当前成员，变化时通知各平台增删实体
+        self.template_members: dict[str, set[str]] | None = None
+        self._template_listeners: list = []
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """只通知订阅了变化 key 的实体.
+
+        实体以 context (key 的 frozenset) 注册监听，没有 context 的监听者总是被通知；
+        首次刷新或可用性变化时通知全部监听者。
+        """
+        data = self.data or {}
+        previous = self._previous_data
+        if previous is None or self.last_update_success != self._previous_success:
+            changed = None
+        else:
+            changed = {
+                key for key in data.keys() | previous.keys()
+                if data.get(key) != previous.get(key)
+            }
+        self._previous_data = data
+        self._previous_success = self.last_update_success
+        self.changed_keys = changed
+
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                update_callback()
+
+        if self.last_update_success:
+            self._async_update_template_members(data)
+
+    @callback
+    def _async_update_template_members(self, data: dict) -> None:
+        """比较各模板列表的成员，通知新增/消失的成员.
+
+        列表缺失 (如接口信息解析失败) 时不视为成员全部消失。
+        """
+        members = {key: set(data[key]) for key in TEMPLATE_LISTS if key in data}
+        if self.template_members is None:
+            # 首次刷新: 各平台在设置时直接读取数据
+            self.template_members = {key: members.get(key, set()) for key in TEMPLATE_LISTS}
+            return
+        for list_key, current in members.items():
+            previous = self.template_members[list_key]
+            if current == previous:
+                continue
+            added, removed = current - previous, previous - current
+            _LOGGER.debug(f"{self.api._host}: {list_key} added {added}, removed {removed}")
+            self.template_members[list_key] = current
+            for template_callback in list(self._template_listeners):
+                template_callback(list_key, added, removed)
+
+    @callback
+    def async_add_template_listener(self, template_callback) -> CALLBACK_TYPE:
+        """订阅模板列表成员变化: template_callback(list_key, added, removed)，返回取消订阅的回调"""
+        self._template_listeners.append(template_callback)
+
+        @callback
+        def _remove() -> None:
+            self._template_listeners.remove(template_callback)
+
+        return _remove
+
+    @callback
+    def async_remove_entities(self, entities: list[Entity]) -> None:
+        """移除已消失接口的实体，同时从实体注册表删除，不留下不可用的实体"""
+        registry = er.async_get(self.hass)
+        for entity in entities:
+            if entity.entity_id and registry.async_get(entity.entity_id):
+                registry.async_remove(entity.entity_id)
+            elif entity.hass:
+                self.hass.async_create_task(entity.async_remove())
+
+    @callback
+    def async_start_event_stream(self, entry: ConfigEntry) -> None:
+        """推送模式: 订阅路由器的接口事件 (随条目卸载自动取消)"""
+        if self._event_stream and not self._event_stream.done():
+            return
+        self._event_stream = entry.async_create_background_task(
+            self.hass,
+            self._async_event_stream(),
+            f"openwrt event stream {self.api._host}",
+        )
+
+    @callback
+    def async_stop_event_stream(self) -> None:
+        if self._event_stream:
+            self._event_stream.cancel()
+            self._event_stream = None
+
+    @callback
+    def async_start_sampler(self, entry: ConfigEntry) -> None:
+        """启动高频采样 (采样间隔为 0 时不启动)"""
+        if self._sampler and not self._sampler.done():
+            return
+        if not self._sample_interval:
+            return
+        self._sampler = entry.async_create_background_task(
+            self.hass,
+            self._async_sampler(),
+            f"openwrt sampler {self.api._host}",
+        )
+
+    @callback
+    def async_stop_sampler(self) -> None:
+        if self._sampler:
+            self._sampler.cancel()
+            self._sampler = None
+        for ring in self._samples.values():
+            ring.clear()
+
+    async def _async_sampler(self) -> None:
+        """按采样间隔请求 CPU/内存/连接数，只写入环形缓冲，不通知实体"""
+        while True:
+            await asyncio.sleep(self._sample_interval)
+            if self._sample_interval >= self.poll_interval.total_seconds():
+                # 轮询本身已经足够频繁
+                continue
+            now = time.monotonic()
+            if (
+                self._failures >= BREAKER_THRESHOLD
+                or now < self._open_until
+                or self._in_reboot_window(now)
+            ):
+                # 路由器不可达、熔断中或等待重启: 由常规轮询和探测负责恢复，不额外发请求
+                continue
+            sample = await self.api.async_sample()
+            self._compute_cpu_usage(sample)
+            for key, ring in self._samples.items():
+                if (value := sample.get(key)) is not None:
+                    ring.add(value)
+
+    def _publish_samples(self, data: dict) -> None:
+        """把本次轮询的值并入样本，写入 <key>_stats 后清空缓冲"""
+        for key, ring in self._samples.items():
+            if (value := data.get(key)) is not None:
+                ring.add(value)
+            if len(ring):
+                data[f"{key}_stats"] = ring.summary()
+                ring.clear()
+
+    @callback
+    def _async_set_capture(self, enabled: bool) -> None:
+        if not enabled:
+            self.api.recorder = None
+        elif self.api.recorder is None:
+            self.api.recorder = BatchRecorder(
+                self.hass.config.path(CAPTURE_DIRECTORY), self.api._host
+            )
+
+    @callback
+    def async_apply_options(self, entry: ConfigEntry) -> None:
+        """在运行中应用选项 (刷新间隔、自适应范围、推送模式)，不重新加载条目"""
+        options = entry.options
+        adaptive = options.get(CONF_ADAPTIVE_INTERVAL, False)
+        self._min_interval = options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        self._max_interval = options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL)
+        interval = options.get(CONF_UPDATE_INTERVAL, 10)
+        if adaptive:
+            if self._adaptive:
+                # 保持当前自适应的间隔，只收紧到新的范围内
+                interval = self.poll_interval.total_seconds()
+            interval = min(max(interval, self._min_interval), self._max_interval)
+            self._stable_polls = 0
+        self._adaptive = adaptive
+        self.async_set_poll_interval(interval)
+
+        if options.get(CONF_PUSH_EVENTS, False):
+            self.async_start_event_stream(entry)
+        else:
+            self.async_stop_event_stream()
+
+        self._async_set_capture(options.get(CONF_CAPTURE, False))
+        self.api.set_interface_filter(interface_filter(options))
+
+        self._sample_interval = options.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL)
+        if self._sample_interval:
+            self.async_start_sampler(entry)
+        else:
+            self.async_stop_sampler()
+
+    async def _async_event_stream(self) -> None:
+        """保持事件流连接，断开后退避重连；路由器不支持订阅时退回纯轮询"""
+        retry = EVENT_STREAM_RETRY_MIN
+        while True:
+            try:
+                async for event, payload in self.api.async_subscribe("network.interface"):
+                    retry = EVENT_STREAM_RETRY_MIN
+                    self._async_apply_interface_event(event, payload)
+            except OpenWrtNotSupportedError as err:
+                _LOGGER.info(f"{self.api._host}: {err}, falling back to polling")
+                return
+            except (OpenWrtAuthError, OpenWrtConnectionError) as err:
+                _LOGGER.debug(f"{self.api._host}: event stream closed: {err}")
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, EVENT_STREAM_RETRY_MAX)
+
+    @callback
+    def _async_apply_interface_event(self, event: str | None, payload) -> None:
+        """把接口事件立即应用到当前数据，并触发一次对账轮询"""
+        if not self.data or not isinstance(payload, dict):
+            return
+        iface = str(payload.get("interface", "")).lower()
+        if not iface:
+            return
+        _LOGGER.debug(f"{self.api._host}: interface event {event} for {iface}")
+
+        if "down" in (event or "") or payload.get("action") == "ifdown":
+            # 接口断开: 立即让相关传感器变为不可用，不必等待下一次轮询
+            data = dict(self.data)
+            for suffix in ("_ip", "_ipv6", "_uptime", "_uptime_since", "_rx_rate", "_tx_rate"):
+                if f"openwrt_{iface}{suffix}" in data:
+                    data[f"openwrt_{iface}{suffix}"] = None
+            self.async_set_updated_data(data)
+
+        # 新地址等完整信息仍以轮询为准: 让接口信息 (slow 层) 在下一次轮询中刷新
+        self.api.invalidate_tier(TIER_SLOW)
+        self.hass.async_create_task(self.async_request_refresh())
+
+    async def async_restore_session(self) -> None:
+        """从 HA 存储恢复 sysauth 会话"""
+        if (state := await self._session_store.async_load()) and self.api.restore_session(state):
+            _LOGGER.debug("Reusing stored session for %s", self.api._host)
+        self._session_token = self.api.session_state()["sysauth"]
+
+    async def async_restore_capabilities(self) -> None:
+        """从 HA 存储恢复能力表"""
+        if state := await self._capability_store.async_load():
+            self.api.restore_capabilities(state)
+        self._capability_state = self.api.capability_state()
+
+    @callback
+    def _async_capabilities_updated(self) -> None:
+        """能力表变化 (探测、固件升级、发现不可用的调用) 时保存"""
+        state = self.api.capability_state()
+        if state is not None and state != self._capability_state:
+            self._capability_state = state
+            self._capability_store.async_delay_save(lambda: state, 0)
+
+    @callback
+    def _async_session_updated(self) -> None:
+        """会话变化时立即保存；仅顺延过期时间时延迟保存 (HA 停止时也会写入)"""
+        token = self.api.session_state()["sysauth"]
+        if token != self._session_token:
+            self._session_token = token
+            self._session_store.async_delay_save(self.api.session_state, 0)
+        else:
+            self._session_store.async_delay_save(self.api.session_state, SESSION_SAVE_DELAY)
+        self._async_schedule_session_renewal()
+
+    @callback
+    def _async_schedule_session_renewal(self) -> None:
+        self._async_cancel_session_renewal()
+        if (expires := self.api.session_expires) is None:
+            return
+        margin = min(SESSION_RENEW_MARGIN, self.api.session_timeout / 5)
+        delay = max(0, expires - time.time() - margin)
+        self._unsub_session_renewal = async_call_later(
+            self.hass, delay, self._async_renew_session
+        )
+
+    @callback
+    def _async_cancel_session_renewal(self) -> None:
+        if self._unsub_session_renewal:
+            self._unsub_session_renewal()
+            self._unsub_session_renewal = None
+
+    async def _async_renew_session(self, _now) -> None:
+        """会话即将过期 (期间没有轮询使用它)，后台续期"""
+        self._unsub_session_renewal = None
+        try:
+            await self.api.async_renew_session()
+        except (OpenWrtAuthError, OpenWrtConnectionError) as err:
+            # 续期失败时不重试，下次轮询会重新登录
+            _LOGGER.debug(f"Session renewal failed for {self.api._host}: {err}")
+            return
+        self._async_session_updated()
+
+    @callback
+    def async_expect_reboot(self) -> None:
+        """路由器即将重启 (在发送重启调用之前调用): 暂停常规轮询，等待关机后频繁探测直到路由器恢复.
+
+        重启后旧会话失效，由恢复后的第一次轮询重新登录。
+        """
+        now = time.monotonic()
+        self._reboot_until = now + REBOOT_WINDOW
+        self._reboot_uptime = (self.data or {}).get("openwrt_uptime")
+        self._open_until = now + REBOOT_SETTLE
+        _LOGGER.info(f"{self.api._host}: reboot requested, waiting for the router to come back")
+        self._async_schedule_reboot_probe(REBOOT_SETTLE)
+
+    @callback
+    def async_cancel_reboot(self) -> None:
+        """路由器明确拒绝了重启调用: 退出重启窗口，恢复常规轮询"""
+        self._async_cancel_reboot_probe()
+        self._reboot_until = 0.0
+        self._reboot_uptime = None
+        self._open_until = 0.0
+
+    @callback
+    def _async_schedule_reboot_probe(self, delay: float = REBOOT_PROBE_INTERVAL) -> None:
+        self._async_cancel_reboot_probe()
+        self._unsub_reboot_probe = async_call_later(self.hass, delay, self._async_reboot_probe)
+
+    @callback
+    def _async_cancel_reboot_probe(self) -> None:
+        if self._unsub_reboot_probe:
+            self._unsub_reboot_probe()
+            self._unsub_reboot_probe = None
+
+    async def _async_reboot_probe(self, _now) -> None:
+        """重启窗口内: uhttpd 端口可连接后立即刷新，否则稍后再探测"""
+        self._unsub_reboot_probe = None
+        if time.monotonic() >= self._reboot_until:
+            return
+        try:
+            await self.api.async_probe()
+        except OpenWrtConnectionError:
+            self._async_schedule_reboot_probe()
+            return
+        self._open_until = 0.0
+        await self.async_refresh()
+        if self._reboot_until:
+            # 刷新失败，或路由器尚未真正重启 (uptime 没有变小)
+            self._async_schedule_reboot_probe()
+
+    def _in_reboot_window(self, now: float) -> bool:
+        return now < self._reboot_until
+
+    def _record_failure(self, now: float) -> None:
+        """记录一次连接失败，必要时熔断 (指数退避 + 随机抖动)"""
+        self._failures += 1
+        if self._in_reboot_window(now):
+            # 重启窗口内由探测循环负责重连，常规轮询暂停
+            self._open_until = now + REBOOT_PROBE_INTERVAL
+            return
+        if self._failures < BREAKER_THRESHOLD:
+            return
+        backoff = min(
+            BREAKER_MAX_BACKOFF,
+            BREAKER_BASE_BACKOFF * 2 ** (self._failures - BREAKER_THRESHOLD),
+        )
+        backoff *= random.uniform(1 - BREAKER_JITTER, 1 + BREAKER_JITTER)
+        self._open_until = now + backoff
+        if self._failures == BREAKER_THRESHOLD:
+            _LOGGER.warning(f"{self.api._host}: router unreachable, backing off")
+        _LOGGER.debug(f"{self.api._host}: circuit open for {backoff:.0f}s ({self._failures} failures)")
+
+    def _record_success(self, data: dict, now: float) -> None:
+        if self._in_reboot_window(now):
+            uptime = data.get("openwrt_uptime")
+            if self._reboot_uptime is not None and (uptime is None or uptime >= self._reboot_uptime):
+                # 路由器还没有关机: 保持窗口，由探测循环继续等待
+                self._open_until = now + REBOOT_PROBE_INTERVAL
+                return
+            _LOGGER.info(f"{self.api._host}: router is back after reboot")
+            self._reboot_until = 0.0
+            self._async_cancel_reboot_probe()
+        elif self._failures >= BREAKER_THRESHOLD:
+            _LOGGER.info(f"{self.api._host}: router reachable again")
+        self._failures = 0
+        self._open_until = 0.0
+
+    async def _async_update_data(self):
+        """Update data via API."""
+        now = time.monotonic()
+        if now < self._open_until:
+            # 熔断中 (或等待重启): 不发起请求，实体保持不可用
+            raise UpdateFailed("Router unreachable, waiting before retrying")
+        if self._failures >= BREAKER_THRESHOLD:
+            # 熔断半开: 先用 TCP 探测确认路由器可达，再进行完整的登录和轮询
+            try:
+                await self.api.async_probe()
+            except OpenWrtConnectionError as err:
+                self._record_failure(now)
+                raise UpdateFailed(f"Connection error: {err}") from err
+
+        started = time.perf_counter()
+        try:
+            data = await self._async_fetch()
+        except UpdateFailed as err:
+            if isinstance(err.__cause__, (OpenWrtConnectionError, asyncio.TimeoutError)):
+                self._record_failure(now)
+            raise
+        self._record_success(data or {}, now)
+        self.api.metrics.record("total", (time.perf_counter() - started) * 1000)
+        if (recorder := self.api.recorder) is not None:
+            await self.hass.async_add_executor_job(recorder.flush)
+        self._async_session_updated()
+        self._async_capabilities_updated()
+
+        if data:
+            self._compute_traffic_rates(data, time.monotonic())
+            self._compute_cpu_usage(data)
+            self._compute_up_since(data, dt_util.utcnow())
+            if self._track_clients:
+                self._compute_present_clients(data)
+            if self._sample_interval:
+                self._publish_samples(data)
+            if self._adaptive:
+                self._adapt_interval(data)
+            data["openwrt_poll_interval"] = self.poll_interval.total_seconds()
+            self.device_info = {
+                "identifiers": {(DOMAIN, self.api._host)},
+                "name": data.get("device_name", "OpenWrt Router"),
+                "manufacturer": "OpenWrt",
+                "model": data.get("device_model", "Router"),
+                "sw_version": data.get("sw_version"),
+                "configuration_url": self.api._host,
+            }
+            # 轮询耗时统计 (诊断传感器)
+            data.update(self.api.metrics.sensor_data())
+            data["openwrt_schedule_lag"] = round(self.schedule_lag, 2)
+        return data
+
+    @callback
+    def async_set_poll_interval(self, seconds: float) -> None:
+        """修改轮询间隔并通知调度器"""
+        if seconds == self.poll_interval.total_seconds():
+            return
+        self.poll_interval = timedelta(seconds=seconds)
+        if self.interval_listener:
+            self.interval_listener()
+
+    def _adapt_interval(self, data: dict) -> None:
+        """自适应轮询间隔.
+
+        出现变化 (接口断开/地址变化、连接数突增) 时立即回到最小间隔；
+        路由器 CPU 过高时加倍退避；连续多次没有变化时逐步放慢到最大间隔。
+        """
+        current = self.poll_interval.total_seconds()
+        if self._detect_change(self.data or {}, data):
+            new = self._min_interval
+            self._stable_polls = 0
+        elif (cpu := data.get("openwrt_cpu")) is not None and cpu >= ADAPTIVE_CPU_HIGH:
+            new = current * 2
+        else:
+            self._stable_polls += 1
+            new = current
+            if self._stable_polls >= ADAPTIVE_STABLE_POLLS:
+                new = current * 1.5
+                self._stable_polls = 0
+        new = round(min(max(new, self._min_interval), self._max_interval))
+        if new != current:
+            _LOGGER.debug(f"{self.api._host}: poll interval {current:g}s -> {new}s")
+            self.async_set_poll_interval(new)
+
+    @staticmethod
+    def _detect_change(previous: dict, data: dict) -> bool:
+        """是否出现值得加快轮询的变化"""
+        if not previous:
+            return False
+        interfaces = data.get("_available_interfaces", [])
+        if interfaces != previous.get("_available_interfaces", []):
+            return True
+        for iface in interfaces:
+            for suffix in ("_ip", "_ipv6"):
+                key = f"openwrt_{iface}{suffix}"
+                if data.get(key) != previous.get(key):
+                    return True
+        old_conn = previous.get("openwrt_conncount")
+        new_conn = data.get("openwrt_conncount")
+        if old_conn and new_conn and new_conn > old_conn * (1 + ADAPTIVE_CONNTRACK_SPIKE):
+            return True
+        return False
+
+    def _compute_traffic_rates(self, data: dict, now: float) -> None:
+        """为每个接口计算 rx/tx 速率 (kB/s)"""
+        seen = set()
+        for iface in data.get("_available_interfaces", []):
+            for direction in ("rx", "tx"):
+                value = data.get(f"openwrt_{iface}_{direction}_bytes")
+                if value is None:
+                    continue
+                key = f"{iface}_{direction}"
+                seen.add(key)
+                rate = self._traffic.update(key, value, now)
+                # 首次采样没有速率，保留 key 以便创建实体
+                data[f"openwrt_{key}_rate"] = round(rate / 1000, 2) if rate is not None else None
+        self._traffic.prune(seen)
+
+    @staticmethod
+    def _compute_present_clients(data: dict) -> None:
+        """在线终端 = 无线终端列表 ∪ ARP 邻居表 (_present_clients).
+
+        两者都缺失 (调用失败) 时不写入，避免把全部终端视为离线。
+        """
+        if "_stations" in data or "_neighbours" in data:
+            data["_present_clients"] = sorted({*data.get("_stations", ()), *data.get("_neighbours", ())})
+
+    def _compute_up_since(self, data: dict, now: datetime) -> None:
+        """由系统和各接口的在线秒数计算开机/连接时刻，写入 <key>_since.
+
+        在线秒数按其所属结果的取得时刻换算 (慢速层的缓存结果可能是几次轮询前取得的)；
+        轮询耗时和时钟误差会让算出的时刻来回抖动，差值在容差内时沿用上次的时刻，
+        使状态只在重启或重新连接时变化。
+        """
+        fetched_at = data.pop("_uptime_fetched_at", {})
+        keys = ["openwrt_uptime"] + [
+            f"openwrt_{iface}_uptime" for iface in data.get("_available_interfaces", [])
+        ]
+        up_since = {}
+        for key in keys:
+            try:
+                seconds = float(data.get(key))
+            except (TypeError, ValueError):
+                continue
+            age = max(0.0, now.timestamp() - fetched_at.get(key, now.timestamp()))
+            since = (now - timedelta(seconds=seconds + age)).replace(microsecond=0)
+            previous = self._up_since.get(key)
+            if previous and abs((since - previous).total_seconds()) <= UPTIME_JITTER_TOLERANCE:
+                since = previous
+            up_since[key] = data[f"{key}_since"] = since
+        self._up_since = up_since
+
+    def _compute_cpu_usage(self, data: dict) -> None:
+        """由 /proc/stat 计数计算总体及每个核心的使用率、iowait、softirq (%)"""
+        if not (times := data.pop("_cpu_times", None)):
+            return
+        usage = self._cpu.update(times)
+        if total := usage.pop("cpu", None):
+            data["openwrt_cpu"] = total["usage"]
+            data["openwrt_cpu_iowait"] = total["iowait"]
+            data["openwrt_cpu_softirq"] = total["softirq"]
+        cores = sorted(usage, key=lambda name: int(name[3:] or 0))
+        data["_cpu_cores"] = cores
+        for core in cores:
+            values = usage[core] or {}
+            data[f"openwrt_{core}_usage"] = values.get("usage")
+            data[f"openwrt_{core}_softirq"] = values.get("softirq")
+
+    async def _async_fetch(self):
+        """Fetch data, re-login once on auth failure."""
+        try:
+            # 设定超时保护，防止请求卡死
+            async with async_timeout.timeout(15):
+                return await self.api.get_data()
+
+        except OpenWrtAuthError as err:
+            # 会话过期已在 get_data 内重新登录并重试，到这里说明登录本身失败
+            # 抛出 UpdateFailed，HA 会标记实体为“不可用”，并在下个周期自动重试
+            raise UpdateFailed(f"Authentication failed: {err}") from err
+
+        except OpenWrtConnectionError as err:
+            # 网络连接错误（如路由器重启中）
+            # 直接抛出 UpdateFailed，实体变“不可用”，等待路由器启动完成
+            raise UpdateFailed(f"Connection error: {err}") from err
+            
+        except Exception as err:
+            # 其他未知错误
+            raise UpdateFailed(f"Unexpected error: {err}") from err
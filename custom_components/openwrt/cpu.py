@@ -0,0 +1,52 @@
+"""CPU utilisation from /proc/stat for OpenWrt."""
+from __future__ import annotations
+
+# /proc/stat 每行 cpu 时间的字段顺序 (guest 已计入 user，不参与合计)
+PROC_STAT_FIELDS = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+
+
+def parse_proc_stat(text: str) -> dict[str, tuple[int, ...]]:
+    """解析 /proc/stat 的 cpu 行: {"cpu": 合计, "cpu0": ..., "cpu1": ...}"""
+    times = {}
+    for line in text.splitlines():
+        if not line.startswith("cpu"):
+            continue
+        name, *values = line.split()
+        times[name] = tuple(int(v) for v in values[: len(PROC_STAT_FIELDS)])
+    return times
+
+
+class CpuUsageTracker:
+    """根据相邻两次读取的 /proc/stat 计算各 CPU 的使用率、iowait 和 softirq 百分比.
+
+    首次读取或计数变小 (路由器重启) 时以开机以来的累计值计算。
+    """
+
+    def __init__(self) -> None:
+        self._last: dict[str, tuple[int, ...]] = {}
+
+    def update(self, times: dict[str, tuple[int, ...]]) -> dict[str, dict[str, float] | None]:
+        """记录新的 CPU 时间，返回 {cpu 名称: {"usage", "iowait", "softirq"}}，两次读取之间无时间增量时为 None"""
+        result = {}
+        for name, values in times.items():
+            previous = self._last.get(name)
+            self._last[name] = values
+            if previous is None or any(c < p for c, p in zip(values, previous)):
+                previous = (0,) * len(values)
+            result[name] = _usage(previous, values)
+        for name in self._last.keys() - times.keys():
+            del self._last[name]
+        return result
+
+
+def _usage(previous: tuple[int, ...], current: tuple[int, ...]) -> dict[str, float] | None:
+    deltas = dict(zip(PROC_STAT_FIELDS, (c - p for c, p in zip(current, previous))))
+    total = sum(deltas.values())
+    if total <= 0:
+        return None
+    idle = deltas.get("idle", 0) + deltas.get("iowait", 0)
+    return {
+        "usage": round((total - idle) / total * 100, 1),
+        "iowait": round(deltas.get("iowait", 0) / total * 100, 1),
+        "softirq": round(deltas.get("softirq", 0) / total * 100, 1),
+    }
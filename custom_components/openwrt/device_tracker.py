@@ -0,0 +1,193 @@
+"""OpenWrt Device Tracker Entities."""
+import time
+from datetime import timedelta
+
+from homeassistant.components.device_tracker import ScannerEntity, SourceType
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import (
+    DOMAIN,
+    CONF_TRACK_CLIENTS,
+    CONF_TRACKED_CLIENTS,
+    CLIENT_RETENTION,
+    CLIENT_SAVE_DELAY,
+    CLIENT_STORAGE_VERSION,
+)
+from .coordinator import OpenWrtDataUpdateCoordinator, client_storage_key, parse_client_macs
+
+# 检查过期终端的间隔
+PRUNE_INTERVAL = timedelta(hours=1)
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up client trackers.
+
+    选项中列出 MAC 时只为这些终端创建追踪器；否则在终端首次出现在无线终端列表中时创建。
+    在线状态来自 _present_clients (无线终端列表 ∪ ARP 邻居表) 的成员变化，DHCP 租约只提供
+    IP/主机名。未列出的终端离线超过 CLIENT_RETENTION 后从实体注册表中删除。
+    """
+    if not entry.options.get(CONF_TRACK_CLIENTS, False):
+        return
+    coordinator: OpenWrtDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    registry = er.async_get(hass)
+    try:
+        selected = parse_client_macs(entry.options.get(CONF_TRACKED_CLIENTS))
+    except ValueError:
+        selected = frozenset()
+    store = Store(hass, CLIENT_STORAGE_VERSION, client_storage_key(entry.entry_id))
+    # MAC -> 最后一次离线的时刻 (在线的终端不会过期)
+    last_seen: dict[str, float] = await store.async_load() or {}
+    trackers: dict[str, OpenWrtClientTracker] = {}
+    present = set(coordinator.data.get("_present_clients", ()))
+
+    @callback
+    def _async_add(macs) -> None:
+        new_trackers = []
+        for mac in macs:
+            if mac not in trackers:
+                trackers[mac] = OpenWrtClientTracker(coordinator, mac, mac in present, mac in selected)
+                new_trackers.append(trackers[mac])
+        if new_trackers:
+            async_add_entities(new_trackers)
+
+    @callback
+    def _async_save() -> None:
+        store.async_delay_save(lambda: last_seen, CLIENT_SAVE_DELAY)
+
+    @callback
+    def _async_presence_changed(list_key: str, added: set[str], removed: set[str]) -> None:
+        """只有上线/离线的终端写入状态；新出现的无线终端 (或列出的终端) 创建实体"""
+        if list_key != "_present_clients":
+            return
+        present.difference_update(removed)
+        present.update(added)
+        now = time.time()
+        for mac in removed & trackers.keys():
+            last_seen[mac] = now
+            trackers[mac].async_set_connected(False)
+        for mac in added & trackers.keys():
+            trackers[mac].async_set_connected(True)
+        if new := added - trackers.keys():
+            if selected:
+                _async_add(sorted(new & selected))
+            else:
+                stations = set(coordinator.data.get("_stations", ()))
+                _async_add(sorted(new & stations))
+        if removed & trackers.keys():
+            _async_save()
+
+    @callback
+    def _async_prune(_now=None) -> None:
+        """删除离线超过 CLIENT_RETENTION 的终端 (列出的终端除外)"""
+        cutoff = time.time() - CLIENT_RETENTION
+        expired = [
+            mac for mac in trackers
+            if mac not in selected and mac not in present and last_seen.get(mac, cutoff) < cutoff
+        ]
+        for mac in expired:
+            tracker = trackers.pop(mac)
+            last_seen.pop(mac, None)
+            if tracker.entity_id and registry.async_get(tracker.entity_id):
+                registry.async_remove(tracker.entity_id)
+        if expired:
+            _async_save()
+
+    # 恢复注册表中的终端: 列出 MAC 时删除不再列出的终端，其余的按最后在线时刻过期
+    prefix = f"{coordinator.api._host}_"
+    now = time.time()
+    restored = []
+    for registry_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if registry_entry.domain != "device_tracker" or not registry_entry.unique_id.startswith(prefix):
+            continue
+        mac = registry_entry.unique_id.removeprefix(prefix)
+        expired = last_seen.get(mac, now) < now - CLIENT_RETENTION and mac not in present
+        if (selected and mac not in selected) or (not selected and expired):
+            registry.async_remove(registry_entry.entity_id)
+            last_seen.pop(mac, None)
+            continue
+        # 没有记录的终端 (升级前创建) 从现在开始计算保留期
+        last_seen.setdefault(mac, now)
+        restored.append(mac)
+    _async_add(restored)
+    _async_add(sorted(selected))
+    _async_presence_changed("_present_clients", present - trackers.keys(), set())
+    for mac in last_seen.keys() - trackers.keys():
+        del last_seen[mac]
+    _async_save()
+
+    entry.async_on_unload(coordinator.async_add_template_listener(_async_presence_changed))
+    entry.async_on_unload(async_track_time_interval(hass, _async_prune, PRUNE_INTERVAL))
+
+class OpenWrtClientTracker(CoordinatorEntity, ScannerEntity):
+    """无线终端列表或 ARP 邻居表中的终端.
+
+    在线状态由平台在终端上线/离线时设置；以 openwrt_client_<mac> 作为 context，
+    只在租约中的 IP/主机名变化时另外写入状态。
+    自动发现的终端与其它 ScannerEntity 一样默认禁用 (除非已有该 MAC 的设备)，选项中列出的终端默认启用。
+    """
+
+    def __init__(
+        self, coordinator: OpenWrtDataUpdateCoordinator, mac: str, connected: bool, selected: bool
+    ) -> None:
+        self._mac = mac
+        self._selected = selected
+        self._data_key = f"openwrt_client_{mac}"
+        super().__init__(coordinator, context=frozenset({self._data_key}))
+        self._connected = connected
+        self._client: dict | None = coordinator.data.get(self._data_key)
+        self._attr_name = (self._client or {}).get("hostname") or mac
+
+    @callback
+    def async_set_connected(self, connected: bool) -> None:
+        if connected == self._connected:
+            return
+        self._connected = connected
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        data = self.coordinator.data
+        if "_clients" not in data:
+            # 租约获取失败，保留原来的 IP/主机名
+            return
+        self._client = data.get(self._data_key)
+        self.async_write_ha_state()
+
+    @property
+    def entity_registry_enabled_default(self) -> bool:
+        return self._selected or super().entity_registry_enabled_default
+
+    @property
+    def unique_id(self) -> str:
+        # ScannerEntity 默认以 MAC 为 unique_id，多台路由器可能看到同一终端
+        return f"{self.coordinator.api._host}_{self._mac}"
+
+    @property
+    def source_type(self) -> SourceType:
+        return SourceType.ROUTER
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def mac_address(self) -> str:
+        return self._mac
+
+    @property
+    def ip_address(self) -> str | None:
+        return (self._client or {}).get("ip")
+
+    @property
+    def hostname(self) -> str | None:
+        return (self._client or {}).get("hostname")
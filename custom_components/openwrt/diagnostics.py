@@ -0,0 +1,52 @@
+"""Diagnostics support for OpenWrt."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_FLEET, CONF_PASSWORD, CONF_USERNAME, CONF_TRACKED_CLIENTS
+from .coordinator import OpenWrtDataUpdateCoordinator
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, CONF_TRACKED_CLIENTS}
+
+# 数据中含地址的 key (接口 IP、连接数最多的主机)
+DATA_REDACT_SUFFIXES = ("_ip", "_ipv6", "_conntrack_top_talker", "_conntrack_top_talkers")
+CLIENT_PREFIX = "openwrt_client_"
+# 终端 MAC 列表 (租约、无线终端、ARP 邻居、在线终端)
+CLIENT_LISTS = ("_clients", "_stations", "_neighbours", "_present_clients")
+
+
+def _redact_data(data: dict[str, Any] | None) -> dict[str, Any] | None:
+    """隐去接口地址和终端信息；终端的 key 含 MAC，改用序号"""
+    if data is None:
+        return None
+    clients = {mac: index for index, mac in enumerate(data.get("_clients", []), start=1)}
+    res = {}
+    for key, value in data.items():
+        if key in CLIENT_LISTS:
+            res[key] = [REDACTED] * len(value)
+        elif key.startswith(CLIENT_PREFIX):
+            res[f"{CLIENT_PREFIX}{clients.get(key.removeprefix(CLIENT_PREFIX), 0)}"] = REDACTED
+        elif key.endswith(DATA_REDACT_SUFFIXES) and value is not None:
+            res[key] = REDACTED
+        else:
+            res[key] = value
+    return res
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: OpenWrtDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    scheduler = hass.data.get(DATA_FLEET)
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "poll_metrics": coordinator.api.metrics.as_dict(),
+        "fleet": scheduler.snapshot() if scheduler else None,
+        "data": _redact_data(coordinator.data),
+    }
@@ -0,0 +1,125 @@
+"""Poll metrics for OpenWrt."""
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+from typing import Any
+
+# 每个指标保留最近多少次轮询的样本
+METRICS_WINDOW = 120
+
+# 高频采样环形缓冲的容量 (两次发布之间最多保留的样本数)
+SAMPLE_BUFFER_SIZE = 64
+
+# 轮询指标: 除 response_bytes 为字节数外，其余均为毫秒耗时
+POLL_METRICS = ("total", "login", "http", "response_bytes", "decode", "parse")
+
+
+class RollingWindow:
+    """固定长度的滚动窗口，计算 p50/p95/max"""
+
+    def __init__(self, size: int = METRICS_WINDOW) -> None:
+        self._values: deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        self._values.append(value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def percentile(self, pct: float) -> float | None:
+        """Nearest-rank 百分位"""
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> dict[str, Any]:
+        if not self._values:
+            return {"count": 0}
+        return {
+            "last": round(self._values[-1], 2),
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "max": round(max(self._values), 2),
+            "count": len(self._values),
+        }
+
+
+class SampleRing:
+    """定长的数值环形缓冲 (array('d'))，保存两次发布之间的高频采样"""
+
+    def __init__(self, size: int = SAMPLE_BUFFER_SIZE) -> None:
+        self._buffer = array("d", [0.0]) * size
+        self._size = size
+        self._next = 0
+        self._count = 0
+
+    def add(self, value: float) -> None:
+        self._buffer[self._next] = value
+        self._next = (self._next + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        self._next = self._count = 0
+
+    def summary(self) -> dict[str, Any]:
+        """min/max/mean/p95 (nearest-rank) 及样本数"""
+        if not self._count:
+            return {"samples": 0}
+        ordered = sorted(self._buffer[: self._count])
+        index = max(0, math.ceil(0.95 * self._count) - 1)
+        return {
+            "min": round(ordered[0], 2),
+            "max": round(ordered[-1], 2),
+            "mean": round(sum(ordered) / self._count, 2),
+            "p95": round(ordered[index], 2),
+            "samples": self._count,
+        }
+
+
+class PollMetrics:
+    """记录每次轮询各阶段的耗时/大小，以及按 RPC id 归类的错误"""
+
+    def __init__(self, size: int = METRICS_WINDOW) -> None:
+        self.windows = {name: RollingWindow(size) for name in POLL_METRICS}
+        self.rpc_errors: dict[str, int] = {}
+        self.last_rpc_errors: dict[str, Any] = {}
+
+    def record(self, name: str, value: float) -> None:
+        self.windows[name].add(value)
+
+    def record_rpc_errors(self, errors: dict[str, Any]) -> None:
+        """errors: {调用 key: 错误内容}"""
+        self.last_rpc_errors = errors
+        for label in errors:
+            self.rpc_errors[label] = self.rpc_errors.get(label, 0) + 1
+
+    def sensor_data(self) -> dict[str, Any]:
+        """供诊断传感器使用的数据: 状态为 p95，统计值放入 *_stats 属性"""
+        res: dict[str, Any] = {}
+        for name, window in self.windows.items():
+            if not len(window):
+                continue
+            key = f"openwrt_poll_{name}"
+            res[key] = round(window.percentile(95), 2)
+            res[f"{key}_stats"] = window.summary()
+        res["openwrt_rpc_errors"] = sum(self.rpc_errors.values())
+        res["openwrt_rpc_errors_stats"] = {
+            "by_call": dict(self.rpc_errors),
+            "last_poll": dict(self.last_rpc_errors),
+        }
+        return res
+
+    def as_dict(self) -> dict[str, Any]:
+        """诊断下载内容"""
+        return {
+            "window": {name: window.summary() for name, window in self.windows.items()},
+            "rpc_errors": dict(self.rpc_errors),
+            "last_rpc_errors": dict(self.last_rpc_errors),
+        }
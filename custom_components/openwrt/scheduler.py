@@ -0,0 +1,192 @@
+"""Fleet poll scheduler for OpenWrt."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import FLEET_MAX_CONCURRENT_POLLS
+from .metrics import RollingWindow
+
+if TYPE_CHECKING:
+    from .coordinator import OpenWrtDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# 黄金分割比例: 依次加入的路由器相位尽量均匀地分布在轮询周期内
+_PHASE_STEP = (math.sqrt(5) - 1) / 2
+
+# 事件循环延迟探测间隔 (秒)，以及统计轮询速率的时间窗口 (秒)
+LOOP_LAG_PROBE_INTERVAL = 1.0
+POLL_RATE_WINDOW = 60.0
+
+
+@dataclass
+class _FleetMember:
+    """单个路由器的调度状态"""
+    coordinator: OpenWrtDataUpdateCoordinator
+    phase: float
+    next_run: float | None = None
+    handle: asyncio.TimerHandle | None = None
+    task: asyncio.Task | None = None
+    task_scheduled: float = 0.0
+    lag: float = 0.0
+    skipped: int = 0
+    polls: int = 0
+
+
+class OpenWrtFleetScheduler:
+    """所有 OpenWrt 配置条目共享的轮询调度器.
+
+    每个路由器分配一个固定相位，使轮询错开分布在整个周期内；
+    同时运行的轮询数量受 max_concurrent 限制，排队造成的延迟记录为 lag。
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_concurrent: int = FLEET_MAX_CONCURRENT_POLLS
+    ) -> None:
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._max_concurrent = max_concurrent
+        self._members: dict[str, _FleetMember] = {}
+        self._slot = 0
+        # 整个车队的负载统计: 事件循环延迟、单次轮询耗时、完成时间 (计算 polls/s)
+        self._loop_lag = RollingWindow()
+        self._poll_duration = RollingWindow()
+        self._completed: deque[float] = deque()
+        self._probe: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_add(
+        self, entry_id: str, coordinator: OpenWrtDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        """加入调度，返回移除回调"""
+        member = _FleetMember(coordinator, (self._slot * _PHASE_STEP) % 1.0)
+        self._slot += 1
+        self._members[entry_id] = member
+        self._schedule(member)
+        coordinator.interval_listener = lambda: self.async_reschedule(entry_id)
+        if self._probe is None:
+            self._schedule_probe()
+
+        @callback
+        def _remove() -> None:
+            self._members.pop(entry_id, None)
+            coordinator.interval_listener = None
+            if member.handle:
+                member.handle.cancel()
+                member.handle = None
+            if member.task and not member.task.done():
+                member.task.cancel()
+            if not self._members and self._probe:
+                self._probe.cancel()
+                self._probe = None
+
+        return _remove
+
+    @callback
+    def async_reschedule(self, entry_id: str) -> None:
+        """轮询间隔变化后，按新的间隔重新对齐相位"""
+        if (member := self._members.get(entry_id)) is None:
+            return
+        if member.handle:
+            member.handle.cancel()
+        member.next_run = None
+        self._schedule(member)
+
+    def _schedule(self, member: _FleetMember) -> None:
+        loop = self.hass.loop
+        now = loop.time()
+        interval = member.coordinator.poll_interval.total_seconds()
+
+        if member.next_run is None:
+            # 首次调度: 对齐到本路由器的相位
+            next_run = now - (now % interval) + member.phase * interval
+        else:
+            next_run = member.next_run + interval
+        if next_run <= now:
+            # 错过的周期直接跳过，保持相位不变
+            next_run += math.ceil((now - next_run) / interval) * interval
+
+        member.next_run = next_run
+        member.handle = loop.call_at(next_run, self._fire, member)
+
+    @callback
+    def _fire(self, member: _FleetMember) -> None:
+        member.handle = None
+        scheduled = member.next_run
+        if member.task and not member.task.done():
+            # 上一次轮询尚未完成 (排队或路由器响应慢)，本周期跳过
+            member.skipped += 1
+            member.lag = self.hass.loop.time() - member.task_scheduled
+            _LOGGER.debug(
+                "%s: previous poll still running, skipping (behind %.1fs)",
+                member.coordinator.api._host, member.lag,
+            )
+        else:
+            member.task_scheduled = scheduled
+            member.task = self.hass.async_create_background_task(
+                self._run(member, scheduled),
+                f"openwrt poll {member.coordinator.api._host}",
+            )
+        self._schedule(member)
+
+    async def _run(self, member: _FleetMember, scheduled: float) -> None:
+        loop = self.hass.loop
+        async with self._semaphore:
+            started = loop.time()
+            member.lag = max(0.0, started - scheduled)
+            member.coordinator.schedule_lag = member.lag
+            member.polls += 1
+            await member.coordinator.async_refresh()
+        finished = loop.time()
+        self._poll_duration.add((finished - started) * 1000)
+        self._completed.append(finished)
+        self._trim_completed(finished)
+
+    def _schedule_probe(self) -> None:
+        loop = self.hass.loop
+        expected = loop.time() + LOOP_LAG_PROBE_INTERVAL
+        self._probe = loop.call_at(expected, self._async_probe, expected)
+
+    @callback
+    def _async_probe(self, expected: float) -> None:
+        """回调实际执行时间与预定时间之差即事件循环延迟"""
+        self._loop_lag.add(max(0.0, self.hass.loop.time() - expected) * 1000)
+        self._schedule_probe()
+
+    def _trim_completed(self, now: float) -> None:
+        cutoff = now - POLL_RATE_WINDOW
+        while self._completed and self._completed[0] < cutoff:
+            self._completed.popleft()
+
+    def _polls_per_second(self) -> float:
+        self._trim_completed(self.hass.loop.time())
+        return round(len(self._completed) / POLL_RATE_WINDOW, 3)
+
+    def snapshot(self) -> dict[str, Any]:
+        """诊断信息: 车队负载 (polls/s、轮询耗时、事件循环延迟) 及每个路由器的相位、落后时间、跳过次数"""
+        return {
+            "max_concurrent": self._max_concurrent,
+            "polls_per_second": self._polls_per_second(),
+            "poll_duration_ms": self._poll_duration.summary(),
+            "loop_lag_ms": self._loop_lag.summary(),
+            "in_flight": sum(
+                1 for m in self._members.values() if m.task and not m.task.done()
+            ),
+            "members": {
+                m.coordinator.api._host: {
+                    "interval": m.coordinator.poll_interval.total_seconds(),
+                    "phase": round(m.phase, 3),
+                    "lag": round(m.lag, 3),
+                    "skipped": m.skipped,
+                    "polls": m.polls,
+                }
+                for m in self._members.values()
+            },
+        }
@@ -2,7 +2,7 @@
 from dataclasses import replace
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -17,30 +17,19 @@ async def async_setup_entry(
     """Set up sensors."""
     coordinator: OpenWrtDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
     
-    # 获取接口列表
-    available_interfaces = coordinator.data.get("_available_interfaces", [])
-    
     entities = []
+    # 每个模板成员 (接口、无线射频、SSID) 已创建的传感器，以及成员已存在但数据尚未出现的模板
+    member_entities: dict[tuple[str, str], list[OpenWrtSensor]] = {}
+    pending: dict[str, tuple[str, OpenWrtSensorEntityDescription]] = {}
     
     for description in SENSOR_TYPES:
         
-        # [逻辑 A] 接口动态模板传感器
+        # [逻辑 A] 动态模板传感器 (成员来自 template_list，默认为接口列表)
         if description.is_interface_template:
-            for iface in available_interfaces:
-                # 动态生成 Key: openwrt_wan_ip
-                dynamic_key = f"openwrt_{iface}{description.template_suffix}"
-                
-                # 预检查数据是否存在
-                val = coordinator.data.get(dynamic_key)
-                if val is not None and val != "":
-                    # 动态生成 Description
-                    new_desc = replace(
-                        description,
-                        key=dynamic_key,
-                        json_key=dynamic_key, # json_key 与 key 一致
-                        name=description.name.format(iface.upper()) # WAN IP
-                    )
-                    entities.append(OpenWrtSensor(coordinator, new_desc))
+            for member in coordinator.data.get(description.template_list, []):
+                entities.extend(
+                    _add_template_sensor(coordinator, description, member, member_entities, pending)
+                )
                     
         # [逻辑 B] 普通静态传感器
         else:
@@ -52,6 +41,73 @@ async def async_setup_entry(
             
     async_add_entities(entities)
 
+    @callback
+    def _async_members_changed(list_key: str, added: set[str], removed: set[str]) -> None:
+        """接口/射频/SSID 出现或消失时只增删对应的传感器"""
+        for member in removed:
+            coordinator.async_remove_entities(member_entities.pop((list_key, member), []))
+            for key in [k for k, (m, d) in pending.items() if m == member and d.template_list == list_key]:
+                del pending[key]
+        new_entities = []
+        for member in sorted(added):
+            for description in SENSOR_TYPES:
+                if description.is_interface_template and description.template_list == list_key:
+                    new_entities.extend(
+                        _add_template_sensor(coordinator, description, member, member_entities, pending)
+                    )
+        if new_entities:
+            async_add_entities(new_entities)
+
+    @callback
+    def _async_check_pending() -> None:
+        """已有成员的数据后来才出现 (如 PPPoE 拨号后获得地址) 时补建传感器"""
+        changed = coordinator.changed_keys
+        keys = [k for k in pending if changed is None or k in changed]
+        new_entities = []
+        for key in keys:
+            member, description = pending.pop(key)
+            new_entities.extend(
+                _add_template_sensor(coordinator, description, member, member_entities, pending)
+            )
+        if new_entities:
+            async_add_entities(new_entities)
+
+    entry.async_on_unload(coordinator.async_add_template_listener(_async_members_changed))
+    entry.async_on_unload(coordinator.async_add_listener(_async_check_pending))
+
+
+def _add_template_sensor(
+    coordinator: OpenWrtDataUpdateCoordinator,
+    description: OpenWrtSensorEntityDescription,
+    member: str,
+    member_entities: dict[tuple[str, str], list["OpenWrtSensor"]],
+    pending: dict[str, tuple[str, OpenWrtSensorEntityDescription]],
+) -> list["OpenWrtSensor"]:
+    """按模板为成员创建传感器；数据尚不存在时记入 pending"""
+    # 动态生成 Key: openwrt_wan_ip / openwrt_wifi_wlan0_clients
+    prefix = f"openwrt_{description.template_prefix}{member}"
+    dynamic_key = f"{prefix}{description.template_suffix}"
+    
+    # 预检查数据是否存在
+    val = coordinator.data.get(dynamic_key)
+    if not ((val is not None and val != "") or (
+        description.create_without_value and dynamic_key in coordinator.data
+    )):
+        pending[dynamic_key] = (member, description)
+        return []
+    # 动态生成 Description
+    new_desc = replace(
+        description,
+        key=dynamic_key,
+        json_key=dynamic_key, # json_key 与 key 一致
+        name=description.name.format(member.upper()), # WAN IP
+        # 模板的 attributes_key 是后缀
+        attributes_key=f"{prefix}{description.attributes_key}" if description.attributes_key else None,
+    )
+    sensor = OpenWrtSensor(coordinator, new_desc)
+    member_entities.setdefault((description.template_list, member), []).append(sensor)
+    return [sensor]
+
 class OpenWrtSensor(CoordinatorEntity, SensorEntity):
     """Representation of an OpenWrt sensor."""
 
@@ -63,7 +119,21 @@ class OpenWrtSensor(CoordinatorEntity, SensorEntity):
         description: OpenWrtSensorEntityDescription
     ) -> None:
         """Initialize."""
-        super().__init__(coordinator)
+        # 数据 key 在构造时解析一次；以 key 集合作为 context，只在这些 key 变化时更新
+        self._data_key = description.json_key or description.key
+        if coordinator.uptime_as_timestamp and description.timestamp_suffix:
+            # 发布开机/连接时刻，状态只在重启或重新连接时变化；前端按相对时间显示
+            self._data_key += description.timestamp_suffix
+            description = replace(
+                description,
+                device_class=SensorDeviceClass.TIMESTAMP,
+                is_human_readable=False,
+            )
+        self._attributes_key = description.attributes_key
+        super().__init__(
+            coordinator,
+            context=frozenset(k for k in (self._data_key, self._attributes_key) if k),
+        )
         self.entity_description = description
         self._attr_unique_id = f"{coordinator.api._host}_{description.key}"
         self._attr_device_info = coordinator.device_info
@@ -80,15 +150,20 @@ class OpenWrtSensor(CoordinatorEntity, SensorEntity):
         """运行时可用性检查"""
         if not super().available:
             return False
-        key = self.entity_description.json_key or self.entity_description.key
-        val = self.coordinator.data.get(key)
+        val = self.coordinator.data.get(self._data_key)
         return val is not None and val != ""
 
+    @property
+    def extra_state_attributes(self):
+        """额外属性 (如轮询诊断的 p50/p95/max)"""
+        if not self._attributes_key:
+            return None
+        return self.coordinator.data.get(self._attributes_key)
+
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        key = self.entity_description.json_key or self.entity_description.key
-        val = self.coordinator.data.get(key)
+        val = self.coordinator.data.get(self._data_key)
         
         if val is None:
             return None
@@ -0,0 +1,62 @@
+"""Interface traffic counters for OpenWrt."""
+from __future__ import annotations
+
+# 32 位计数器的取值空间 (部分 MIPS 设备的网卡统计仍是 32 位)
+COUNTER_32 = 2**32
+
+# 判断 32 位计数器回绕时允许的最大速率 (字节/秒，1 Gbit/s)；超过则视为计数重置
+COUNTER_MAX_RATE = 125_000_000
+
+# network.device status 中读取的统计项
+TRAFFIC_COUNTERS = (
+    "rx_bytes",
+    "tx_bytes",
+    "rx_packets",
+    "tx_packets",
+    "rx_errors",
+    "tx_errors",
+    "rx_dropped",
+    "tx_dropped",
+)
+
+
+class CounterRateTracker:
+    """根据相邻两次轮询的累计计数计算速率.
+
+    时间使用单调时钟。计数器变小时按每个计数器推断的位宽区分回绕和重置: 从未超过 2**32
+    的计数器视为 32 位，补上回绕量后的速率不超过 COUNTER_MAX_RATE 时按回绕计算；
+    否则 (或计数器曾超过 2**32) 视为设备重置，本次不返回速率。
+    """
+
+    def __init__(self) -> None:
+        self._last: dict[str, tuple[int, float]] = {}
+        # 出现过 >= 2**32 的值的计数器 (64 位，不会回绕)
+        self._wide: set[str] = set()
+
+    def update(self, key: str, value: int, now: float) -> float | None:
+        """记录新的计数值，返回每秒增量 (首次采样或计数重置时返回 None)"""
+        previous = self._last.get(key)
+        self._last[key] = (value, now)
+        if value >= COUNTER_32:
+            self._wide.add(key)
+        if previous is None:
+            return None
+
+        last_value, last_time = previous
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return None
+
+        delta = value - last_value
+        if delta < 0:
+            delta += COUNTER_32
+            if key in self._wide or delta / elapsed > COUNTER_MAX_RATE:
+                # 设备重置 (如接口重建)，下一次轮询起重新计算
+                return None
+        return delta / elapsed
+
+    def prune(self, keys: set[str]) -> None:
+        """丢弃已不存在的计数器"""
+        for key in self._last.keys() - keys:
+            del self._last[key]
+        self._wide &= keys
@@ -0,0 +1,567 @@
+"""UBUS call registry and response decoders for OpenWrt."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field, replace
+from fnmatch import fnmatchcase
+from functools import partial
+from itertools import chain
+from typing import Any, Callable
+
+from .conntrack import CONNTRACK_TABLE, iter_lines, summarize_conntrack
+from .cpu import parse_proc_stat
+from .traffic import TRAFFIC_COUNTERS
+
+# 轮询分层: fast 每次轮询都调用, slow 每隔 SLOW_TIER_EVERY 次调用, once 每个会话只调用一次
+TIER_FAST = "fast"
+TIER_SLOW = "slow"
+TIER_ONCE = "once"
+
+SLOW_TIER_EVERY = 6
+
+# 表示调用不可用的 ubus 状态码: 3=方法不存在, 4=对象/文件不存在, 6=无权限
+UBUS_STATUS_UNSUPPORTED = (3, 4, 6)
+
+MIB = 1024 * 1024
+
+# 允许列表最多包含多少个具体接口名时改为逐个请求 network.interface.<name> status (超过则请求 dump)
+INTERFACE_STATUS_MAX = 8
+
+# /proc/net/arp 的 Flags 中表示地址已解析的位 (ATF_COM)，及未解析条目的硬件地址
+ARP_COMPLETE = 0x2
+ARP_NO_ADDRESS = "00:00:00:00:00:00"
+
+
+@dataclass(frozen=True)
+class UbusCall:
+    """一个 ubus 调用: 对象/方法/参数、所属轮询层，以及把结果写入数据字典的解码函数.
+
+    metric 相同的调用是同一指标的不同来源，只使用路由器支持的来源中 cost 最低的一个。
+    """
+    key: str
+    object: str
+    method: str
+    decoder: Callable[[Any, dict], None]
+    params: dict = field(default_factory=dict)
+    tier: str = TIER_FAST
+    metric: str | None = None
+    cost: int = 0
+    # 是否参与两次轮询之间的高频采样 (CPU、内存、连接数)
+    sampled: bool = False
+
+    def acl_checks(self) -> list[dict]:
+        """检查当前会话是否有权调用所需的 session access 参数"""
+        checks = [{"scope": "ubus", "object": self.object, "function": self.method}]
+        if self.object == "file" and (path := self.params.get("path")):
+            checks.append({"scope": "file", "object": path, "function": self.method})
+        return checks
+
+
+@dataclass(frozen=True)
+class InterfaceFilter:
+    """接口允许/排除列表 (glob，不区分大小写)，允许列表为空表示全部接口.
+
+    模式保留原始大小写: 具体接口名用于 network.interface.<name> 对象名。
+    """
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+
+    @classmethod
+    def from_options(cls, include: str | None, exclude: str | None) -> InterfaceFilter:
+        """由选项中逗号分隔的模式创建, e.g. "wan, lan, wg*" """
+        return cls(_patterns(include), _patterns(exclude))
+
+    def match(self, name: str) -> bool:
+        name = name.lower()
+        if self.include and not any(fnmatchcase(name, p.lower()) for p in self.include):
+            return False
+        return not any(fnmatchcase(name, p.lower()) for p in self.exclude)
+
+    def names(self) -> tuple[str, ...] | None:
+        """允许列表都是具体接口名且数量不多时返回这些接口名，否则返回 None.
+
+        这些接口名全部被排除时返回空元组 (没有接口)。
+        """
+        if not self.include or len(self.include) > INTERFACE_STATUS_MAX:
+            return None
+        if any(char in pattern for pattern in self.include for char in "*?["):
+            return None
+        return tuple(name for name in self.include if self.match(name))
+
+    def calls(self, dump: UbusCall) -> tuple[UbusCall, ...]:
+        """替换 interface dump 调用: 逐个接口的 status 调用，或在解码时过滤的 dump"""
+        if names := self.names():
+            return interface_status_calls(names)
+        if not self.include and not self.exclude:
+            return (dump,)
+        # 允许列表中的接口全部被排除时同样请求 dump (全部过滤掉)，使可用接口列表变为空、清理旧实体
+        return (replace(dump, decoder=partial(decode_interface_dump, match=self.match)),)
+
+
+def _patterns(value: str | None) -> tuple[str, ...]:
+    patterns = {}
+    for pattern in (value or "").split(","):
+        if pattern := pattern.strip():
+            # 大小写不同的重复模式只保留第一个
+            patterns.setdefault(pattern.lower(), pattern)
+    return tuple(patterns.values())
+
+
+def select_calls(
+    capabilities: dict[str, bool] | None, interfaces: InterfaceFilter | None = None
+) -> tuple[UbusCall, ...]:
+    """按能力表选出要轮询的调用: 去掉不支持的调用，每个指标只保留最便宜的来源.
+
+    设置了接口过滤时，interface dump 在原位置替换为 InterfaceFilter.calls 的结果。
+    """
+    calls = UBUS_CALLS
+    if interfaces is not None:
+        calls = tuple(chain.from_iterable(
+            interfaces.calls(call) if call.key == "interface_dump" else (call,)
+            for call in UBUS_CALLS
+        ))
+    if capabilities is None:
+        return calls
+    supported = [call for call in calls if capabilities.get(call.key, True)]
+    cheapest: dict[str, UbusCall] = {}
+    for call in supported:
+        if call.metric and (
+            call.metric not in cheapest or call.cost < cheapest[call.metric].cost
+        ):
+            cheapest[call.metric] = call
+    return tuple(
+        call for call in supported
+        if not call.metric or cheapest[call.metric] is call
+    )
+
+
+def ubus_payload(result: Any) -> dict | None:
+    """取出 ubus 结果 [status, payload] 中的 payload"""
+    if isinstance(result, list) and len(result) > 1 and isinstance(result[1], dict):
+        return result[1]
+    return None
+
+
+def ubus_error(item: dict | None) -> Any:
+    """单个 JSON-RPC 响应的错误 (没有错误时返回 None)"""
+    if not isinstance(item, dict):
+        return "no reply"
+    if "error" in item:
+        return item["error"]
+    result = item.get("result")
+    if isinstance(result, list) and result and result[0] != 0:
+        # ubus 状态码非 0 (如 3=方法不存在, 6=无权限)
+        return {"ubus_status": result[0]}
+    return None
+
+
+# --- 解码函数: (result, res) -> None ---
+
+def decode_system_info(result: Any, res: dict) -> None:
+    if not (info := ubus_payload(result)):
+        return
+    res["openwrt_uptime"] = info.get("uptime")
+    if mem := info.get("memory"):
+        total = mem.get("total", 1)
+        free = mem.get("free", 0)
+        if total > 0:
+            res["openwrt_memory"] = round((1 - free / total) * 100, 0)
+        for name in ("available", "buffered", "cached", "shared"):
+            if (value := mem.get(name)) is not None:
+                res[f"openwrt_memory_{name}"] = round(value / MIB, 1)
+    # load 为定点数 (x65536)
+    for minutes, value in zip((1, 5, 15), info.get("load") or ()):
+        res[f"openwrt_load_{minutes}"] = round(value / 65536, 2)
+    if (swap := info.get("swap")) and swap.get("total"):
+        res["openwrt_swap_usage"] = round(
+            (1 - swap.get("free", 0) / swap["total"]) * 100, 1
+        )
+    for mount in ("root", "tmp"):
+        if (fs := info.get(mount)) and fs.get("total"):
+            res[f"openwrt_{mount}_usage"] = round(fs.get("used", 0) / fs["total"] * 100, 1)
+
+
+def decode_system_board(result: Any, res: dict) -> None:
+    if not (board_info := ubus_payload(result)):
+        return
+    # 提取主机名
+    res["device_name"] = board_info.get("hostname", "OpenWrt")
+    # 提取型号
+    res["device_model"] = board_info.get("model", "Router")
+    # 提取固件版本 (release.description 包含完整版本号)
+    release = board_info.get("release", {})
+    res["sw_version"] = release.get("description", release.get("version"))
+
+
+def decode_cpu_usage(result: Any, res: dict) -> None:
+    # 不同 luci 分支返回 dict 或 [status, dict]，数值可能是 "12%" 这样的字符串
+    val = None
+    if isinstance(result, dict):
+        val = result.get("cpuusage")
+    elif isinstance(result, list) and len(result) > 0:
+        item = result[1] if len(result) > 1 else result[0]
+        val = item.get("cpuusage") if isinstance(item, dict) else item
+
+    if val is None:
+        return
+    if isinstance(val, str):
+        try:
+            res["openwrt_cpu"] = float(val.replace("%", "").strip())
+        except ValueError:
+            res["openwrt_cpu"] = 0
+    else:
+        res["openwrt_cpu"] = val
+
+
+def decode_proc_stat(result: Any, res: dict) -> None:
+    # 只保存原始计数，使用率由协调器根据前后两次读取计算
+    if not (payload := ubus_payload(result)):
+        return
+    if times := parse_proc_stat(payload.get("data", "")):
+        res["_cpu_times"] = times
+
+
+def decode_temp_info(result: Any, res: dict) -> None:
+    temp_val = 0
+    if isinstance(result, dict):
+        temp_val = result.get("cputemp", 0)
+    elif payload := ubus_payload(result):
+        temp_val = payload.get("cputemp", 0)
+    if temp_val:
+        res["openwrt_cputemp"] = temp_val
+
+
+def decode_thermal_zone(result: Any, res: dict) -> None:
+    # 能力探测失败 (两个来源都在轮询) 时，以 luci getTempInfo 的结果为准
+    if res.get("openwrt_cputemp") or not (payload := ubus_payload(result)):
+        return
+    raw_temp = payload.get("data", "").strip()
+    if raw_temp.isdigit() and (temp_val := float(raw_temp) / 1000.0):
+        res["openwrt_cputemp"] = temp_val
+
+
+def decode_online_users(result: Any, res: dict) -> None:
+    if payload := ubus_payload(result):
+        res["openwrt_user_online"] = payload.get("onlineusers")
+
+
+def decode_interface_dump(
+    result: Any, res: dict, match: Callable[[str], bool] | None = None
+) -> None:
+    if not (payload := ubus_payload(result)):
+        return
+    res["_available_interfaces"] = []
+    # 三层设备名 -> 使用该设备的接口名 (用于匹配 network.device 的流量统计)
+    res["_device_interfaces"] = {}
+    for iface in payload.get("interface", []):
+        name = iface.get("interface", "").lower()
+        if not name or name == "loopback" or (match and not match(name)):
+            continue
+        _decode_interface(name, iface, res)
+
+
+def decode_interface_status(name: str, result: Any, res: dict) -> None:
+    # network.interface.<name> status 的结果与 dump 中的单个接口相同 (不含接口名)
+    if (iface := ubus_payload(result)) is None:
+        return
+    _decode_interface(name, iface, res)
+
+
+def _decode_interface(name: str, iface: dict, res: dict) -> None:
+    res.setdefault("_available_interfaces", []).append(name)
+    if ipv4 := iface.get("ipv4-address", []):
+        res[f"openwrt_{name}_ip"] = ipv4[0].get("address")
+    if ipv6 := iface.get("ipv6-address", []):
+        res[f"openwrt_{name}_ipv6"] = ipv6[0].get("address")
+    res[f"openwrt_{name}_uptime"] = iface.get("uptime")
+    if device := iface.get("l3_device") or iface.get("device"):
+        res.setdefault("_device_interfaces", {}).setdefault(device, []).append(name)
+
+
+def decode_conntrack_count(result: Any, res: dict) -> None:
+    if not (payload := ubus_payload(result)):
+        return
+    conn_str = payload.get("data", "").strip()
+    if conn_str.isdigit():
+        res["openwrt_conncount"] = int(conn_str)
+
+
+def decode_device_status(device: str, result: Any, res: dict) -> None:
+    # 依赖接口信息先写入 _device_interfaces (多个接口可能共用一个设备)
+    if not (stats := (ubus_payload(result) or {}).get("statistics")):
+        return
+    for name in res.get("_device_interfaces", {}).get(device, ()):
+        for counter in TRAFFIC_COUNTERS:
+            if (value := stats.get(counter)) is not None:
+                res[f"openwrt_{name}_{counter}"] = value
+
+
+def member_slug(name: str) -> str:
+    """射频/SSID 名称转换为 key 中使用的形式 (小写字母、数字和下划线)"""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _average(values: list) -> float | None:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def decode_iwinfo_devices(result: Any, res: dict) -> None:
+    if not (payload := ubus_payload(result)):
+        return
+    # 射频/SSID 列表由各射频的 info 结果填充 (只包含本次有数据的成员)
+    res["_wireless_devices"] = list(payload.get("devices", []))
+    res["_wireless_radios"] = []
+    res["_wireless_ssids"] = []
+    res["_wireless_radio_info"] = {}
+
+
+def decode_iwinfo_info(device: str, result: Any, res: dict) -> None:
+    if not (info := ubus_payload(result)) or "_wireless_radios" not in res:
+        return
+    radio = member_slug(device)
+    res["_wireless_radios"].append(radio)
+    res["_wireless_radio_info"][device] = {
+        "ssid": info.get("ssid"),
+        "channel": info.get("channel"),
+        "mode": info.get("mode"),
+    }
+    res[f"openwrt_wifi_{radio}_noise"] = info.get("noise")
+    if ssid := info.get("ssid"):
+        if (slug := member_slug(ssid)) and slug not in res["_wireless_ssids"]:
+            res["_wireless_ssids"].append(slug)
+
+
+def decode_iwinfo_assoclist(device: str, result: Any, res: dict) -> None:
+    """把终端列表汇总为数量、信号和速率统计；每个终端只保留 MAC (_stations，用于终端在线状态)"""
+    if not (payload := ubus_payload(result)) or "_wireless_radio_info" not in res:
+        return
+    info = res["_wireless_radio_info"].get(device)
+    if info is None:
+        return
+    radio = member_slug(device)
+    stations = payload.get("results", [])
+    res.setdefault("_stations", []).extend(
+        mac.lower() for station in stations if (mac := station.get("mac"))
+    )
+    signals = [s["signal"] for s in stations if isinstance(s.get("signal"), (int, float))]
+    # iwinfo 速率单位为 kbit/s，汇总为 Mbit/s
+    rx_rates = [s["rx"]["rate"] / 1000 for s in stations if (s.get("rx") or {}).get("rate")]
+    tx_rates = [s["tx"]["rate"] / 1000 for s in stations if (s.get("tx") or {}).get("rate")]
+
+    res[f"openwrt_wifi_{radio}_clients"] = len(stations)
+    res[f"openwrt_wifi_{radio}_signal"] = _average(signals)
+    res[f"openwrt_wifi_{radio}_stats"] = {
+        **info,
+        "signal_min": min(signals, default=None),
+        "signal_max": max(signals, default=None),
+        "rx_rate_avg": _average(rx_rates),
+        "rx_rate_min": min(rx_rates, default=None),
+        "tx_rate_avg": _average(tx_rates),
+        "tx_rate_min": min(tx_rates, default=None),
+    }
+    if ssid := info.get("ssid"):
+        key = f"openwrt_ssid_{member_slug(ssid)}_clients"
+        res[key] = res.get(key, 0) + len(stations)
+
+
+class ConntrackDecoder:
+    """连接跟踪表的解码函数 (每个 API 实例一个).
+
+    slow 层的结果在两次请求之间会被重复解码，汇总结果按原始结果缓存，只在重新读取后计算。
+    """
+
+    def __init__(self) -> None:
+        self._result: Any = None
+        self._summary: dict[str, Any] | None = None
+
+    def __call__(self, result: Any, res: dict) -> None:
+        if result is not self._result:
+            if not (payload := ubus_payload(result)):
+                return
+            self._summary = summarize_conntrack(iter_lines(payload.get("data", "")))
+            self._result = result
+        summary = self._summary
+        for protocol, count in summary["protocols"].items():
+            res[f"openwrt_conntrack_{protocol}"] = count
+        res["openwrt_conntrack_tcp_states"] = summary["tcp_states"]
+        top = summary["top"]
+        res["openwrt_conntrack_top_talker"] = next(iter(top), None)
+        res["openwrt_conntrack_top_talkers"] = {
+            "top": top,
+            # 近似统计: top 中的连接数最多偏高 error
+            "error": summary["top_error"],
+            "entries": summary["entries"],
+        }
+
+
+def decode_dhcp_leases(result: Any, res: dict) -> None:
+    """DHCP 租约中的终端: _clients 为 MAC 列表，openwrt_client_<mac> 为 IP 和主机名"""
+    if not (payload := ubus_payload(result)):
+        return
+    clients = {}
+    for lease in chain(payload.get("dhcp_leases") or (), payload.get("dhcp6_leases") or ()):
+        if not (mac := (lease.get("macaddr") or "").lower()) or mac in clients:
+            continue
+        clients[mac] = {"ip": lease.get("ipaddr"), "hostname": lease.get("hostname")}
+    res["_clients"] = list(clients)
+    for mac, client in clients.items():
+        res[f"openwrt_client_{mac}"] = client
+
+
+def decode_host_hints(result: Any, res: dict) -> None:
+    # 在租约之后解码，只补充租约中缺少的 IP/主机名 (不在数据中留下主机提示)
+    if not (hints := ubus_payload(result)):
+        return
+    for mac in res.get("_clients", ()):
+        if not (hint := hints.get(mac) or hints.get(mac.upper())):
+            continue
+        client = res[f"openwrt_client_{mac}"]
+        client["ip"] = client["ip"] or next(iter(hint.get("ipaddrs") or ()), None)
+        client["hostname"] = client["hostname"] or hint.get("name")
+
+
+def decode_arp_table(result: Any, res: dict) -> None:
+    """ARP 邻居表中已解析 (ATF_COM) 的终端: _neighbours 为 MAC 列表"""
+    if not (payload := ubus_payload(result)):
+        return
+    neighbours = []
+    # 首行为表头: IP address  HW type  Flags  HW address  Mask  Device
+    for line in payload.get("data", "").splitlines()[1:]:
+        fields = line.split()
+        if len(fields) >= 4 and int(fields[2], 16) & ARP_COMPLETE and fields[3] != ARP_NO_ADDRESS:
+            neighbours.append(fields[3].lower())
+    res["_neighbours"] = neighbours
+
+
+def client_calls() -> tuple[UbusCall, ...]:
+    """终端跟踪 (可选): 租约和主机提示 (slow，只提供 IP/主机名，主机提示在租约之后解码)，
+    以及每次轮询读取的 ARP 邻居表 (与无线终端列表一起决定在线状态)
+    """
+    return (
+        UbusCall("dhcp_leases", "luci-rpc", "getDHCPLeases", decode_dhcp_leases, tier=TIER_SLOW),
+        UbusCall("host_hints", "luci-rpc", "getHostHints", decode_host_hints, tier=TIER_SLOW),
+        UbusCall("arp_table", "file", "read", decode_arp_table, params={"path": "/proc/net/arp"}),
+    )
+
+
+def conntrack_calls() -> tuple[UbusCall, ...]:
+    """连接跟踪表的读取 (slow，可选)；每次调用生成新的解码器，各 API 实例分别缓存汇总"""
+    return (
+        UbusCall(
+            "conntrack_table", "file", "read", ConntrackDecoder(),
+            params={"path": CONNTRACK_TABLE}, tier=TIER_SLOW,
+        ),
+    )
+
+
+def device_calls(devices: tuple[str, ...]) -> tuple[UbusCall, ...]:
+    """接口所用设备的流量统计 (每次轮询)；只请求这些设备，不转储全部设备"""
+    return tuple(
+        UbusCall(
+            f"device_status.{device}", "network.device", "status",
+            partial(decode_device_status, device), params={"name": device},
+        )
+        for device in devices
+    )
+
+
+def interface_status_calls(names: tuple[str, ...]) -> tuple[UbusCall, ...]:
+    """允许列表中各接口的 status 调用 (代替 interface dump)；对象名用原始接口名，数据 key 用小写"""
+    return tuple(
+        UbusCall(
+            f"interface_status.{name}", f"network.interface.{name}", "status",
+            partial(decode_interface_status, name.lower()), tier=TIER_SLOW,
+        )
+        for name in names
+    )
+
+
+def wireless_calls(devices: list[str]) -> tuple[UbusCall, ...]:
+    """每个射频的 info (slow) 和 assoclist (fast) 调用，与其它调用在同一批次中发送.
+
+    同一射频的 info 在 assoclist 之前解码 (终端汇总需要 SSID)。
+    """
+    calls = []
+    for device in devices:
+        calls.append(UbusCall(
+            f"iwinfo_info.{device}", "iwinfo", "info", partial(decode_iwinfo_info, device),
+            params={"device": device}, tier=TIER_SLOW,
+        ))
+        calls.append(UbusCall(
+            f"iwinfo_assoclist.{device}", "iwinfo", "assoclist",
+            partial(decode_iwinfo_assoclist, device), params={"device": device},
+        ))
+    return tuple(calls)
+
+
+# UBUS 调用注册表；解码按此顺序进行 (流量统计依赖接口信息)
+# 温度优先直接读取 thermal_zone (rpcd 读文件)，其次才是 luci getTempInfo (部分分支会执行脚本)
+UBUS_CALLS: tuple[UbusCall, ...] = (
+    UbusCall("system_info", "system", "info", decode_system_info, sampled=True),
+    UbusCall("system_board", "system", "board", decode_system_board, tier=TIER_ONCE),
+    UbusCall(
+        "proc_stat", "file", "read", decode_proc_stat,
+        params={"path": "/proc/stat"}, metric="cpu", sampled=True,
+    ),
+    # 依赖非标准的 luci 插件，仅在无法读取 /proc/stat 时使用
+    UbusCall(
+        "cpu_usage", "luci", "getCPUUsage", decode_cpu_usage,
+        metric="cpu", cost=1, sampled=True,
+    ),
+    UbusCall(
+        "temp_info", "luci", "getTempInfo", decode_temp_info,
+        metric="temperature", cost=1,
+    ),
+    UbusCall("online_users", "luci", "getOnlineUsers", decode_online_users),
+    # 接口信息；各接口设备的流量统计调用由 device_calls 按此结果生成
+    UbusCall("interface_dump", "network.interface", "dump", decode_interface_dump, tier=TIER_SLOW),
+    UbusCall(
+        "conntrack_count", "file", "read", decode_conntrack_count,
+        params={"path": "/proc/sys/net/netfilter/nf_conntrack_count"}, sampled=True,
+    ),
+    UbusCall(
+        "thermal_zone", "file", "read", decode_thermal_zone,
+        params={"path": "/sys/class/thermal/thermal_zone0/temp"},
+        metric="temperature",
+    ),
+    # 无线射频列表；各射频的调用由 wireless_calls 按此结果生成
+    UbusCall("wireless_devices", "iwinfo", "devices", decode_iwinfo_devices, tier=TIER_SLOW),
+)
+
+
+def call_group(key: str) -> str:
+    """按名称生成的调用 (iwinfo_info.wlan0、device_status.eth0 等) 所属的调用组"""
+    return key.split(".", 1)[0]
+
+
+def probe_calls() -> tuple[tuple[str, UbusCall], ...]:
+    """能力探测的调用: (能力表 key, 调用).
+
+    注册表和可选调用按调用 key 探测；按射频/设备生成的调用对象和方法相同，而射频和设备
+    在探测时尚未知，每组只探测一次，以组名为 key。各接口的 status 调用不探测: 接口可能
+    只是暂时不存在，由轮询中的暂停和重试处理。
+    """
+    calls = UBUS_CALLS + conntrack_calls() + client_calls()
+    groups = wireless_calls([""]) + device_calls(("",))
+    return tuple((call.key, call) for call in calls) + tuple(
+        (call_group(call.key), call) for call in groups
+    )
+
+
+def calls_for_keys(keys: list[str]) -> list[UbusCall]:
+    """按调用 key 还原调用列表 (用于回放捕获的批次)；射频、接口调用按 key 中的名称生成"""
+    devices = list(dict.fromkeys(
+        key.split(".", 1)[1] for key in keys if key.startswith("iwinfo_") and "." in key
+    ))
+    interfaces = tuple(
+        key.split(".", 1)[1] for key in keys if key.startswith("interface_status.")
+    )
+    interface_devices = tuple(
+        key.split(".", 1)[1] for key in keys if key.startswith("device_status.")
+    )
+    by_key = {
+        call.key: call
+        for call in UBUS_CALLS + wireless_calls(devices) + interface_status_calls(interfaces)
+        + device_calls(interface_devices) + conntrack_calls() + client_calls()
+    }
+    return [by_key[key] for key in keys]
@@ -0,0 +1,10 @@
+"""Fixtures for OpenWrt integration tests."""
+import pytest
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """加载仓库中的 custom_components/openwrt"""
+    yield
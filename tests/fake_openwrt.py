@@ -0,0 +1,444 @@
+"""Stand-in OpenWrt router (LuCI login + ubus JSON-RPC + event stream) for tests and benchmarks.
+
+作为独立进程运行 (供基准测试使用，避免与被测的客户端共用事件循环):
+    python -m tests.fake_openwrt --routers 100 --interfaces 200 --latency 0.02
+启动后在标准输出打印一行 JSON: {"urls": [...]}，之后一直运行直到被终止。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import sys
+import time
+from typing import Any
+
+from aiohttp import web
+
+PASSWORD = "password"
+
+# 注入的临时错误: ubus 状态码 7 (超时)，不会被集成当作“不支持”而停用调用
+UBUS_STATUS_TIMEOUT = 7
+UBUS_STATUS_METHOD_NOT_FOUND = 3
+UBUS_ACCESS_DENIED = -32002
+
+TRAFFIC_COUNTERS = (
+    "rx_bytes", "tx_bytes", "rx_packets", "tx_packets",
+    "rx_errors", "tx_errors", "rx_dropped", "tx_dropped",
+)
+
+
+class FakeOpenWrt:
+    """一台模拟的 OpenWrt 路由器.
+
+    interfaces: 接口数量 (wan + lan1..)，决定 interface dump 的大小
+    radios / stations: 射频数量及每个射频的终端数 (无线终端是前 stations 个 DHCP 终端)
+    clients: DHCP 租约数量 (其余终端为有线终端，出现在 ARP 邻居表中)
+    latency: 每个 HTTP 请求的额外延迟 (秒)
+    session_timeout: 会话空闲超时 (秒)，与 rpcd 一样每次使用后顺延
+    error_rate: 单个调用返回临时错误 (ubus 状态码 7) 的概率
+    unsupported: 不存在的 "object.method" (ubus list 中不列出，调用返回状态码 3)
+    """
+
+    def __init__(
+        self,
+        *,
+        interfaces: int = 3,
+        radios: int = 1,
+        stations: int = 4,
+        clients: int = 8,
+        latency: float = 0.0,
+        session_timeout: int = 300,
+        error_rate: float = 0.0,
+        unsupported: tuple[str, ...] = ("luci.getCPUUsage", "luci.getTempInfo"),
+        seed: int | None = None,
+    ) -> None:
+        self.interfaces = interfaces
+        self.radios = radios
+        self.stations = stations
+        self.clients = clients
+        self.latency = latency
+        self.session_timeout = session_timeout
+        self.error_rate = error_rate
+        self.unsupported = set(unsupported)
+        # 已离开的终端: 租约仍在，但不在无线终端列表和 ARP 邻居表中
+        self.away: set[str] = set()
+        # 已断开的接口 (没有地址和在线时间)
+        self.down: set[str] = set()
+        # 接下来被拒绝 (403) 的页面动作 POST 数 (模拟 CSRF token 或会话已被 LuCI 作废)
+        self.reject_actions = 0
+        self._random = random.Random(seed)
+        self._booted = time.time() - 3600
+        self._sessions: dict[str, float] = {}
+        self._runner: web.AppRunner | None = None
+        # 事件流订阅者的队列 (None 表示关闭连接)
+        self._subscribers: list[asyncio.Queue] = []
+        # 统计
+        self.logins = 0
+        self.requests = 0
+        self.calls: dict[str, int] = {}
+
+    # -- 生命周期 --------------------------------------------------------
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/cgi-bin/luci/", self._login)
+        app.router.add_route("*", "/cgi-bin/luci/{path:.+}", self._legacy)
+        app.router.add_post("/ubus/", self._ubus)
+        app.router.add_get("/ubus/subscribe/{path}", self._subscribe)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """在 host:port 上开始服务 (port 为 0 时自动分配)，返回基础 URL"""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self.close_subscriptions()
+            await self._runner.cleanup()
+            self._runner = None
+
+    def open_session(self) -> str:
+        """新建一个会话 (登录成功时调用；基准测试可直接用它构造请求)"""
+        token = secrets.token_hex(16)
+        self._sessions[token] = time.monotonic() + self.session_timeout
+        return token
+
+    def expire_sessions(self) -> None:
+        """立即作废所有会话 (模拟会话过期或路由器重启)"""
+        self._sessions.clear()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def notify(self, event: str, data: dict) -> None:
+        """向所有事件流订阅者推送一条 ubus 通知"""
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    def close_subscriptions(self) -> None:
+        """断开所有事件流 (模拟 uhttpd 重启)"""
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    # -- HTTP ------------------------------------------------------------
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _login(self, request: web.Request) -> web.Response:
+        await self._delay()
+        form = await request.post()
+        if form.get("luci_password") != PASSWORD:
+            return web.Response(status=403)
+        self.logins += 1
+        token = self.open_session()
+        response = web.Response(status=302, headers={"Location": "/cgi-bin/luci/admin"})
+        response.set_cookie("sysauth_http", token, path="/cgi-bin/luci/")
+        return response
+
+    async def _legacy(self, request: web.Request) -> web.Response:
+        await self._delay()
+        if not self._session_valid(request.cookies.get("sysauth_http")):
+            return web.Response(status=403)
+        if request.method == "GET":
+            return web.Response(text="<script>L.env = { token: '0123456789abcdef' };</script>")
+        if self.reject_actions:
+            self.reject_actions -= 1
+            return web.Response(status=403)
+        return web.Response(text="ok")
+
+    async def _ubus(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = json.loads(await request.read())
+        if isinstance(body, list):
+            reply: Any = [self.reply(call) for call in body]
+        else:
+            reply = self.reply(body)
+        return web.Response(body=json.dumps(reply), content_type="application/json")
+
+    async def _subscribe(self, request: web.Request) -> web.StreamResponse:
+        """uhttpd 的 ubus 事件流: Bearer 会话认证，每条通知为一个 text/event-stream 事件"""
+        await self._delay()
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not self._session_valid(token):
+            return web.Response(status=403)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            while (item := await queue.get()) is not None:
+                event, data = item
+                await response.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        finally:
+            self._subscribers.remove(queue)
+        return response
+
+    def _session_valid(self, token: str | None) -> bool:
+        now = time.monotonic()
+        if token is None or self._sessions.get(token, 0) <= now:
+            self._sessions.pop(token, None)
+            return False
+        self._sessions[token] = now + self.session_timeout
+        return True
+
+    # -- JSON-RPC --------------------------------------------------------
+
+    def reply(self, call: dict) -> dict:
+        """单个 JSON-RPC 请求的响应"""
+        reply: dict[str, Any] = {"jsonrpc": "2.0", "id": call.get("id")}
+        params = call.get("params") or []
+        if call.get("method") == "list":
+            reply["result"] = self._list(params)
+            return reply
+        token, obj, method = params[0], params[1], params[2]
+        args = params[3] if len(params) > 3 else {}
+        if not self._session_valid(token):
+            reply["error"] = {"code": UBUS_ACCESS_DENIED, "message": "Access denied"}
+            return reply
+        name = f"{obj}.{method}"
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if name in self.unsupported:
+            reply["result"] = [UBUS_STATUS_METHOD_NOT_FOUND]
+        elif self.error_rate and self._random.random() < self.error_rate:
+            reply["result"] = [UBUS_STATUS_TIMEOUT]
+        elif (payload := self._result(obj, method, args)) is None:
+            reply["result"] = [UBUS_STATUS_METHOD_NOT_FOUND]
+        else:
+            reply["result"] = [0, payload]
+        return reply
+
+    def _objects(self) -> dict[str, tuple[str, ...]]:
+        objects = {
+            "system": ("info", "board", "reboot"),
+            "file": ("read", "exec"),
+            "session": ("access", "list"),
+            "luci": ("getCPUUsage", "getTempInfo", "getOnlineUsers"),
+            "luci-rpc": ("getDHCPLeases", "getHostHints"),
+            "network.interface": ("dump",),
+            "network.device": ("status",),
+            "iwinfo": ("devices", "info", "assoclist"),
+        }
+        for name in self._interface_names():
+            objects[f"network.interface.{name}"] = ("status",)
+        return {
+            obj: tuple(m for m in methods if f"{obj}.{m}" not in self.unsupported)
+            for obj, methods in objects.items()
+        }
+
+    def _list(self, names: list[str]) -> dict:
+        objects = self._objects()
+        return {
+            obj: {method: {} for method in methods}
+            for obj, methods in objects.items()
+            if not names or obj in names
+        }
+
+    def _interface_names(self) -> list[str]:
+        return ["wan"] + [f"lan{i}" for i in range(1, self.interfaces)]
+
+    def _uptime(self) -> int:
+        return int(time.time() - self._booted)
+
+    def _interface(self, index: int) -> dict:
+        if self._interface_names()[index] in self.down:
+            return {"up": False, "l3_device": f"eth{index}", "device": f"eth{index}",
+                    "ipv4-address": [], "ipv6-address": [], "data": {}}
+        return {
+            "up": True,
+            "uptime": self._uptime() - index,
+            "l3_device": f"eth{index}",
+            "device": f"eth{index}",
+            "proto": "dhcp" if index == 0 else "static",
+            "ipv4-address": [{"address": f"10.{index // 250}.{index % 250}.1", "mask": 24}],
+            "ipv6-address": [{"address": f"fd00:{index:x}::1", "mask": 64}],
+            "route": [{"target": "0.0.0.0", "mask": 0, "nexthop": f"10.0.{index % 250}.254"}],
+            "dns-server": ["1.1.1.1", "8.8.8.8"],
+            "data": {},
+        }
+
+    def _statistics(self, index: int) -> dict:
+        elapsed = self._uptime()
+        rates = (125_000 * (index + 1), 40_000 * (index + 1), 100, 40, 0, 0, 0, 0)
+        return {counter: rate * elapsed for counter, rate in zip(TRAFFIC_COUNTERS, rates)}
+
+    def _result(self, obj: str, method: str, args: dict) -> dict | None:
+        if obj == "system" and method == "info":
+            total = 512 * 1024 * 1024
+            return {
+                "uptime": self._uptime(),
+                "load": [65536, 32768, 16384],
+                "memory": {
+                    "total": total, "free": total // 3, "shared": 0,
+                    "buffered": total // 20, "available": total // 2, "cached": total // 10,
+                },
+                "swap": {"total": 0, "free": 0},
+                "root": {"total": 65536, "free": 32768, "used": 32768, "avail": 32768},
+                "tmp": {"total": 262144, "free": 200000, "used": 62144, "avail": 200000},
+            }
+        if obj == "system" and method == "board":
+            return {
+                "hostname": "OpenWrt", "model": "Fake Router",
+                "release": {"version": "23.05.3", "description": "OpenWrt 23.05.3"},
+            }
+        if obj == "system" and method == "reboot":
+            return {}
+        if obj == "session" and method == "access":
+            return {"access": True}
+        if obj == "session" and method == "list":
+            return {"timeout": self.session_timeout, "expires": self.session_timeout}
+        if obj == "file" and method == "read":
+            return self._file(args.get("path", ""))
+        if obj == "file" and method == "exec":
+            return {"code": 0}
+        if obj == "luci" and method == "getOnlineUsers":
+            return {"onlineusers": self.clients}
+        if obj == "luci" and method == "getCPUUsage":
+            return {"cpuusage": "12%"}
+        if obj == "luci" and method == "getTempInfo":
+            return {"cputemp": 52}
+        if obj == "network.interface" and method == "dump":
+            names = self._interface_names()
+            return {"interface": [
+                {"interface": name, **self._interface(index)} for index, name in enumerate(names)
+            ]}
+        if obj.startswith("network.interface.") and method == "status":
+            names = self._interface_names()
+            name = obj.removeprefix("network.interface.")
+            return self._interface(names.index(name)) if name in names else None
+        if obj == "network.device" and method == "status":
+            devices = {
+                f"eth{index}": {"up": True, "statistics": self._statistics(index)}
+                for index in range(self.interfaces)
+            }
+            if "name" in args:
+                return devices.get(args["name"])
+            return devices
+        if obj == "iwinfo" and method == "devices":
+            return {"devices": [f"phy{i}-ap0" for i in range(self.radios)]}
+        if obj == "iwinfo" and method == "info":
+            return {"ssid": "FakeWrt", "channel": 36, "mode": "Master", "noise": -95}
+        if obj == "iwinfo" and method == "assoclist":
+            return {"results": [
+                {
+                    "mac": self._client_mac(i).upper(),
+                    "signal": -40 - i % 40,
+                    "rx": {"rate": 866700}, "tx": {"rate": 650000},
+                }
+                for i in range(self.stations) if self._client_mac(i) not in self.away
+            ]}
+        if obj == "luci-rpc" and method == "getDHCPLeases":
+            return {"dhcp_leases": [
+                {
+                    "macaddr": self._client_mac(i), "ipaddr": f"192.168.1.{10 + i % 240}",
+                    "hostname": f"client-{i}", "expires": 43200,
+                }
+                for i in range(self.clients)
+            ]}
+        if obj == "luci-rpc" and method == "getHostHints":
+            return {
+                self._client_mac(i).upper(): {"name": f"client-{i}", "ipaddrs": [f"192.168.1.{10 + i % 240}"]}
+                for i in range(self.clients)
+            }
+        return None
+
+    @staticmethod
+    def _client_mac(index: int) -> str:
+        return f"02:00:00:01:{index // 256:02x}:{index % 256:02x}"
+
+    def _file(self, path: str) -> dict | None:
+        if path == "/proc/stat":
+            ticks = int(time.time() * 100)
+            lines = [f"cpu  {ticks} 0 {ticks // 2} {ticks * 3} 10 0 {ticks // 10} 0 0 0"]
+            lines += [
+                f"cpu{i} {ticks // 2} 0 {ticks // 4} {ticks * 3 // 2} 5 0 {ticks // 20} 0 0 0"
+                for i in range(2)
+            ]
+            return {"data": "\n".join(lines + ["intr 1", "ctxt 1"]) + "\n"}
+        if path.endswith("nf_conntrack_count"):
+            return {"data": f"{40 * self.clients}\n"}
+        if path.endswith("thermal_zone0/temp"):
+            return {"data": "52000\n"}
+        if path == "/proc/net/nf_conntrack":
+            return {"data": self._conntrack_table()}
+        if path == "/proc/net/arp":
+            lines = ["IP address       HW type     Flags       HW address            Mask     Device"]
+            lines += [
+                f"192.168.1.{10 + i % 240}     0x1         0x2         {self._client_mac(i)}     *        br-lan"
+                for i in range(self.stations, self.clients) if self._client_mac(i) not in self.away
+            ]
+            lines.append("192.168.1.250    0x1         0x0         00:00:00:00:00:00     *        br-lan")
+            return {"data": "\n".join(lines) + "\n"}
+        return None
+
+    def _conntrack_table(self) -> str:
+        """每个终端 40 条连接: 第 i 个终端的连接中有 i % 4 条 UDP，其余为 TCP"""
+        lines = []
+        for i in range(self.clients):
+            source = f"192.168.1.{10 + i % 240}"
+            for n in range(40):
+                if n < i % 4:
+                    lines.append(
+                        f"ipv4     2 udp      17 30 src={source} dst=8.8.8.8 sport={1024 + n} dport=53 "
+                        f"src=8.8.8.8 dst={source} sport=53 dport={1024 + n} mark=0 zone=0 use=2"
+                    )
+                else:
+                    lines.append(
+                        f"ipv4     2 tcp      6 7440 ESTABLISHED src={source} dst=1.1.1.1 sport={2048 + n} "
+                        f"dport=443 src=1.1.1.1 dst={source} sport=443 dport={2048 + n} [ASSURED] mark=0 zone=0 use=2"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+async def start_fleet(count: int, **options: Any) -> tuple[list[FakeOpenWrt], list[str]]:
+    """启动 count 台模拟路由器 (各自监听一个端口)，返回 (路由器, 基础 URL)"""
+    routers = [FakeOpenWrt(seed=index, **options) for index in range(count)]
+    urls = [await router.start() for router in routers]
+    return routers, urls
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    routers, urls = await start_fleet(
+        args.routers,
+        interfaces=args.interfaces,
+        clients=args.clients,
+        latency=args.latency,
+        session_timeout=args.session_timeout,
+        error_rate=args.error_rate,
+    )
+    print(json.dumps({"urls": urls}), flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for router in routers:
+            await router.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routers", type=int, default=1)
+    parser.add_argument("--interfaces", type=int, default=3)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--session-timeout", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Tests for capture and replay of raw ubus batches."""
+from __future__ import annotations
+
+import glob
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.openwrt.capture import async_replay, load_capture
+from custom_components.openwrt.const import CAPTURE_DIRECTORY, DOMAIN
+
+from .fake_openwrt import PASSWORD, FakeOpenWrt
+
+
+async def test_capture_and_replay(hass: HomeAssistant, socket_enabled, tmp_path) -> None:
+    """捕获的批次经协调器回放: 计算速率、通知监听者"""
+    hass.config.config_dir = str(tmp_path)
+    fake = FakeOpenWrt()
+    url = await fake.start()
+    try:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={"host": url, "username": "root", "password": PASSWORD},
+            options={"update_interval_seconds": 3600, "capture_responses": True},
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        for _ in range(2):
+            await coordinator.async_refresh()
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+    finally:
+        await fake.stop()
+
+    (path,) = glob.glob(hass.config.path(CAPTURE_DIRECTORY, "*.jsonl.gz"))
+    records = await hass.async_add_executor_job(lambda: list(load_capture(path)))
+    assert len(records) == 3
+
+    result = await async_replay(hass, path, repeat=2)
+    assert result["batches"] == 6
+    assert result["notifications"] == 6
+    assert result["changed_keys"] > 0
+    assert result["rates"] == 2 * fake.interfaces
@@ -0,0 +1,51 @@
+"""Tests for the config flow."""
+from __future__ import annotations
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.openwrt.const import CONF_UPTIME_TIMESTAMP, DOMAIN
+
+from .fake_openwrt import PASSWORD, FakeOpenWrt
+
+
+async def test_new_entry_publishes_uptime_timestamps(hass: HomeAssistant, socket_enabled) -> None:
+    """新建的条目打开在线时间时间戳 (已有条目的选项中没有该项，默认关闭)"""
+    fake = FakeOpenWrt()
+    url = await fake.start()
+    try:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"host": url, "username": "root", "password": PASSWORD}
+        )
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert result["options"] == {CONF_UPTIME_TIMESTAMP: True}
+        await hass.async_block_till_done()
+        entry = result["result"]
+        assert hass.data[DOMAIN][entry.entry_id].uptime_as_timestamp
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        await fake.stop()
+
+
+async def test_existing_entry_keeps_uptime_seconds(hass: HomeAssistant, socket_enabled) -> None:
+    fake = FakeOpenWrt()
+    url = await fake.start()
+    try:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={"host": url, "username": "root", "password": PASSWORD},
+            options={"update_interval_seconds": 3600},
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert not hass.data[DOMAIN][entry.entry_id].uptime_as_timestamp
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    finally:
+        await fake.stop()
@@ -0,0 +1,74 @@
+"""Tests for the streaming conntrack summary."""
+from __future__ import annotations
+
+from custom_components.openwrt.conntrack import (
+    TopTalkers,
+    iter_lines,
+    summarize_conntrack,
+)
+from custom_components.openwrt.ubus import conntrack_calls
+
+from .fake_openwrt import FakeOpenWrt
+
+
+def test_top_talkers_bounded() -> None:
+    """主机再多也只跟踪 capacity 个；高频主机一定保留，计数为上界"""
+    talkers = TopTalkers(capacity=8)
+    for i in range(10_000):
+        talkers.add(f"10.0.{i // 256}.{i % 256}")
+        if i % 4 == 0:
+            talkers.add("192.168.1.2")
+    assert len(talkers._counts) == len(talkers._heap) == 8
+    top = talkers.top(3)
+    assert next(iter(top)) == "192.168.1.2"
+    error = talkers.error(["192.168.1.2"])
+    assert top["192.168.1.2"] - error <= 2500 <= top["192.168.1.2"]
+
+
+def test_top_talkers_exact_below_capacity() -> None:
+    talkers = TopTalkers(capacity=8)
+    for host, count in (("a", 5), ("b", 3), ("c", 1)):
+        for _ in range(count):
+            talkers.add(host)
+    assert talkers.top(2) == {"a": 5, "b": 3}
+    assert talkers.error(["a", "b", "c"]) == 0
+
+
+def test_summarize_conntrack() -> None:
+    table = (
+        "ipv4     2 tcp      6 7440 ESTABLISHED src=192.168.1.2 dst=1.1.1.1 sport=1 dport=443 "
+        "src=1.1.1.1 dst=192.168.1.2 sport=443 dport=1 [ASSURED] mark=0 zone=0 use=2\n"
+        "ipv4     2 tcp      6 100 TIME_WAIT src=192.168.1.2 dst=1.1.1.1 sport=2 dport=443 "
+        "src=1.1.1.1 dst=192.168.1.2 sport=443 dport=2 mark=0 zone=0 use=2\n"
+        "ipv4     2 udp      17 30 src=192.168.1.3 dst=8.8.8.8 sport=3 dport=53 "
+        "src=8.8.8.8 dst=192.168.1.3 sport=53 dport=3 mark=0 zone=0 use=2\n"
+        "ipv6     10 icmpv6   58 29 src=fe80::1 dst=ff02::1 type=128 code=0 id=1 "
+        "src=ff02::1 dst=fe80::1 type=129 code=0 id=1 mark=0 zone=0 use=2\n"
+        "ipv4     2 gre      47 179 src=192.168.1.4 dst=2.2.2.2 srckey=0x0 dstkey=0x0 "
+        "src=2.2.2.2 dst=192.168.1.4 srckey=0x0 dstkey=0x0 mark=0 zone=0 use=2\n"
+        "\n"
+    )
+    summary = summarize_conntrack(iter_lines(table))
+    assert summary["entries"] == 5
+    assert summary["protocols"] == {"tcp": 2, "udp": 1, "icmp": 1, "other": 1}
+    assert summary["tcp_states"] == {"ESTABLISHED": 1, "TIME_WAIT": 1}
+    assert next(iter(summary["top"].items())) == ("192.168.1.2", 2)
+    assert summary["top_error"] == 0
+
+
+def test_conntrack_decoder_reads_table_file() -> None:
+    """经 ubus file read 读取连接跟踪表 (只需读权限)，同一结果只汇总一次"""
+    (call,) = conntrack_calls()
+    assert (call.object, call.method) == ("file", "read")
+    assert call.acl_checks()[1] == {"scope": "file", "object": "/proc/net/nf_conntrack", "function": "read"}
+
+    fake = FakeOpenWrt(clients=4)
+    result = [0, fake._result("file", "read", {"path": "/proc/net/nf_conntrack"})]
+    res: dict = {}
+    call.decoder(result, res)
+    assert res["openwrt_conntrack_tcp"] == 154
+    assert res["openwrt_conntrack_udp"] == 6
+    assert res["openwrt_conntrack_top_talkers"]["entries"] == 160
+    summary = call.decoder._summary
+    call.decoder(result, {})
+    assert call.decoder._summary is summary
@@ -0,0 +1,181 @@
+"""Tests for the coordinator: sampling, breaker and listener notification."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.openwrt.const import (
+    BREAKER_BASE_BACKOFF,
+    BREAKER_JITTER,
+    BREAKER_THRESHOLD,
+    DOMAIN,
+)
+
+from .fake_openwrt import PASSWORD, FakeOpenWrt
+
+
+@pytest.fixture
+async def router(socket_enabled):
+    fake = FakeOpenWrt()
+    url = await fake.start()
+    yield fake, url
+    await fake.stop()
+
+
+async def _setup(hass: HomeAssistant, url: str, **options) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": url, "username": "root", "password": PASSWORD},
+        options={"update_interval_seconds": 3600, **options},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_sampler_paused_while_unreachable(hass: HomeAssistant, router) -> None:
+    """熔断中或等待重启时采样不发请求"""
+    fake, url = router
+    entry = await _setup(hass, url, sample_interval_seconds=0.02)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    polled = fake.calls["system.info"]
+    await asyncio.sleep(0.2)
+    assert fake.calls["system.info"] > polled
+
+    coordinator._failures = BREAKER_THRESHOLD
+    await asyncio.sleep(0.05)
+    sampled = fake.calls["system.info"]
+    await asyncio.sleep(0.2)
+    assert fake.calls["system.info"] == sampled
+
+    coordinator._failures = 0
+    coordinator._reboot_until = time.monotonic() + 60
+    await asyncio.sleep(0.05)
+    sampled = fake.calls["system.info"]
+    await asyncio.sleep(0.2)
+    assert fake.calls["system.info"] == sampled
+
+    coordinator._reboot_until = 0.0
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_listeners_notified_for_changed_keys(hass: HomeAssistant, router) -> None:
+    """只通知 context 中有 key 变化的监听者；没有 context 的监听者和可用性变化时全部通知"""
+    _, url = router
+    entry = await _setup(hass, url)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    calls = []
+    for name, context in (
+        ("cpu", frozenset({"openwrt_cpu"})), ("uptime", frozenset({"openwrt_uptime"})), ("all", None)
+    ):
+        entry.async_on_unload(
+            coordinator.async_add_listener(lambda name=name: calls.append(name), context)
+        )
+
+    coordinator.async_set_updated_data({**coordinator.data, "openwrt_cpu": 99})
+    assert sorted(calls) == ["all", "cpu"]
+    assert coordinator.changed_keys == {"openwrt_cpu"}
+
+    calls.clear()
+    coordinator.async_set_updated_data(dict(coordinator.data))
+    assert calls == ["all"]
+    assert coordinator.changed_keys == set()
+
+    calls.clear()
+    coordinator.async_set_update_error(Exception("unreachable"))
+    assert sorted(calls) == ["all", "cpu", "uptime"]
+    assert coordinator.changed_keys is None
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_template_members_diff(hass: HomeAssistant, router) -> None:
+    """模板列表成员变化时通知新增/消失的成员；列表缺失不视为成员全部消失"""
+    _, url = router
+    entry = await _setup(hass, url)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.template_members["_available_interfaces"] == {"wan", "lan1", "lan2"}
+    diffs = []
+    entry.async_on_unload(coordinator.async_add_template_listener(
+        lambda list_key, added, removed: diffs.append((list_key, added, removed))
+    ))
+
+    interfaces = ["wan", "lan2", "lan3"]
+    coordinator.async_set_updated_data({**coordinator.data, "_available_interfaces": interfaces})
+    assert diffs == [("_available_interfaces", {"lan3"}, {"lan1"})]
+
+    diffs.clear()
+    data = dict(coordinator.data)
+    del data["_available_interfaces"]
+    coordinator.async_set_updated_data(data)
+    coordinator.async_set_updated_data({**data, "_available_interfaces": interfaces})
+    assert diffs == []
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_breaker_transitions(hass: HomeAssistant, router) -> None:
+    """连续失败后熔断 (不发请求)；半开时先 TCP 探测，探测失败退避加倍，成功后恢复"""
+    fake, url = router
+    entry = await _setup(hass, url)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    port = int(url.rsplit(":", 1)[1])
+    await fake.stop()
+
+    for _ in range(BREAKER_THRESHOLD):
+        await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator._failures == BREAKER_THRESHOLD
+    min_backoff = BREAKER_BASE_BACKOFF * (1 - BREAKER_JITTER) - 1
+    assert coordinator._open_until - time.monotonic() > min_backoff
+
+    await fake.start(port=port)
+    requests = fake.requests
+    await coordinator.async_refresh()
+    assert fake.requests == requests
+    assert coordinator._failures == BREAKER_THRESHOLD
+
+    await fake.stop()
+    coordinator._open_until = 0.0
+    await coordinator.async_refresh()
+    assert coordinator._failures == BREAKER_THRESHOLD + 1
+    assert coordinator._open_until - time.monotonic() > 2 * min_backoff
+
+    await fake.start(port=port)
+    coordinator._open_until = 0.0
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator._failures == 0
+    assert coordinator._open_until == 0.0
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_push_interface_down(hass: HomeAssistant, router) -> None:
+    """推送模式: 接口断开的通知立即清空该接口的地址，并触发一次刷新接口信息的轮询"""
+    fake, url = router
+    entry = await _setup(hass, url, push_events=True)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    for _ in range(50):
+        if fake.subscribers:
+            break
+        await asyncio.sleep(0.01)
+    assert fake.subscribers == 1
+    assert coordinator.data["openwrt_wan_ip"] == "10.0.0.1"
+    dumps = fake.calls["network.interface.dump"]
+
+    fake.down.add("wan")
+    fake.notify("ifdown", {"interface": "wan", "action": "ifdown"})
+    for _ in range(50):
+        if coordinator.data.get("openwrt_wan_ip") is None:
+            break
+        await asyncio.sleep(0.01)
+    assert coordinator.data.get("openwrt_wan_ip") is None
+    await hass.async_block_till_done()
+    assert fake.calls["network.interface.dump"] == dumps + 1
+    assert coordinator.data.get("openwrt_wan_ip") is None
+    assert coordinator.data["openwrt_lan1_ip"] == "10.0.1.1"
+    assert await hass.config_entries.async_unload(entry.entry_id)
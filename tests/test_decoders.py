@@ -0,0 +1,82 @@
+"""Tests for the ubus response decoders (system info, /proc/stat, iwinfo)."""
+from __future__ import annotations
+
+from custom_components.openwrt.cpu import CpuUsageTracker
+from custom_components.openwrt.ubus import (
+    MIB,
+    decode_iwinfo_assoclist,
+    decode_iwinfo_devices,
+    decode_iwinfo_info,
+    decode_proc_stat,
+    decode_system_info,
+)
+
+
+def test_system_info() -> None:
+    res: dict = {}
+    decode_system_info([0, {
+        "uptime": 3600,
+        "load": [65536, 32768, 6554],
+        "memory": {"total": 128 * MIB, "free": 32 * MIB, "available": 64 * MIB, "cached": 16 * MIB},
+        "swap": {"total": 0, "free": 0},
+        "root": {"total": 1000, "used": 250},
+    }], res)
+    assert res["openwrt_uptime"] == 3600
+    assert res["openwrt_memory"] == 75
+    assert res["openwrt_memory_available"] == 64
+    assert res["openwrt_memory_cached"] == 16
+    assert "openwrt_memory_buffered" not in res
+    assert (res["openwrt_load_1"], res["openwrt_load_5"], res["openwrt_load_15"]) == (1, 0.5, 0.1)
+    assert "openwrt_swap_usage" not in res
+    assert res["openwrt_root_usage"] == 25
+    assert "openwrt_tmp_usage" not in res
+
+
+def test_proc_stat_per_core() -> None:
+    """各核使用率、iowait、softirq 由相邻两次读取的差值计算"""
+    def read(cpu0: str, cpu1: str) -> dict:
+        res: dict = {}
+        text = f"cpu  0 0 0 0 0 0 0 0\ncpu0 {cpu0}\ncpu1 {cpu1}\nintr 1 2 3\n"
+        decode_proc_stat([0, {"data": text}], res)
+        return res["_cpu_times"]
+
+    tracker = CpuUsageTracker()
+    tracker.update(read("100 0 100 800 0 0 0 0", "100 0 100 800 0 0 0 0"))
+    usage = tracker.update(read("150 0 150 850 10 0 40 0", "100 0 100 900 0 0 0 0"))
+    assert usage["cpu0"] == {"usage": 70.0, "iowait": 5.0, "softirq": 20.0}
+    assert usage["cpu1"] == {"usage": 0.0, "iowait": 0.0, "softirq": 0.0}
+    assert usage["cpu"] is None
+
+
+def test_iwinfo_aggregates() -> None:
+    """终端列表汇总为数量、信号和速率，同名 SSID 的终端数跨射频合计"""
+    res: dict = {}
+    decode_iwinfo_devices([0, {"devices": ["phy0-ap0", "phy1-ap0"]}], res)
+    for device in ("phy0-ap0", "phy1-ap0"):
+        decode_iwinfo_info(device, [0, {"ssid": "Home WiFi", "channel": 36, "noise": -95}], res)
+    decode_iwinfo_assoclist("phy0-ap0", [0, {"results": [
+        {"mac": "AA:BB:CC:00:00:01", "signal": -50, "rx": {"rate": 866700}, "tx": {"rate": 650000}},
+        {"mac": "AA:BB:CC:00:00:02", "signal": -70, "rx": {}, "tx": {"rate": 6000}},
+    ]}], res)
+    decode_iwinfo_assoclist("phy1-ap0", [0, {"results": [{"mac": "AA:BB:CC:00:00:03"}]}], res)
+
+    assert res["_wireless_radios"] == ["phy0_ap0", "phy1_ap0"]
+    assert res["_wireless_ssids"] == ["home_wifi"]
+    assert res["_stations"] == ["aa:bb:cc:00:00:01", "aa:bb:cc:00:00:02", "aa:bb:cc:00:00:03"]
+    assert res["openwrt_wifi_phy0_ap0_clients"] == 2
+    assert res["openwrt_wifi_phy0_ap0_signal"] == -60
+    assert res["openwrt_wifi_phy1_ap0_signal"] is None
+    assert res["openwrt_ssid_home_wifi_clients"] == 3
+    stats = res["openwrt_wifi_phy0_ap0_stats"]
+    assert (stats["signal_min"], stats["signal_max"]) == (-70, -50)
+    assert stats["rx_rate_avg"] == stats["rx_rate_min"] == 866.7
+    assert (stats["tx_rate_avg"], stats["tx_rate_min"]) == (328.0, 6.0)
+
+
+def test_iwinfo_assoclist_without_info() -> None:
+    """info 调用失败的射频不汇总终端列表"""
+    res: dict = {}
+    decode_iwinfo_devices([0, {"devices": ["phy0-ap0"]}], res)
+    decode_iwinfo_assoclist("phy0-ap0", [0, {"results": [{"mac": "AA:BB:CC:00:00:01"}]}], res)
+    assert "openwrt_wifi_phy0_ap0_clients" not in res
+    assert "_stations" not in res
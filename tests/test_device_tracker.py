@@ -0,0 +1,115 @@
+"""Tests for the client tracker platform."""
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.openwrt.const import CLIENT_RETENTION, DOMAIN
+
+from .fake_openwrt import PASSWORD, FakeOpenWrt
+
+WIFI_MAC = "02:00:00:01:00:00"
+WIRED_MAC = "02:00:00:01:00:03"
+
+
+@pytest.fixture
+async def router(socket_enabled):
+    fake = FakeOpenWrt(radios=1, stations=2, clients=4)
+    url = await fake.start()
+    yield fake, url
+    await fake.stop()
+
+
+async def _setup(hass: HomeAssistant, url: str, **options) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": url, "username": "root", "password": PASSWORD},
+        options={"update_interval_seconds": 3600, "track_clients": True, **options},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def _trackers(hass: HomeAssistant, entry: MockConfigEntry) -> dict[str, str]:
+    """MAC -> entity_id"""
+    return {
+        registry_entry.unique_id.rsplit("_", 1)[1]: registry_entry.entity_id
+        for registry_entry in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        if registry_entry.domain == "device_tracker"
+    }
+
+
+async def test_trackers_for_wireless_clients(hass: HomeAssistant, router) -> None:
+    """未列出 MAC 时只为无线终端创建追踪器 (默认禁用)；离开无线网络后即为 not_home (不等租约过期)"""
+    fake, url = router
+    entry = await _setup(hass, url)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert not _trackers(hass, entry)
+    # 第一次轮询得到射频列表，之后的轮询才包含无线终端列表
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    trackers = _trackers(hass, entry)
+    assert sorted(trackers) == [WIFI_MAC, "02:00:00:01:00:01"]
+    registry = er.async_get(hass)
+    assert registry.async_get(trackers[WIFI_MAC]).disabled_by is er.RegistryEntryDisabler.INTEGRATION
+    registry.async_update_entity(trackers[WIFI_MAC], disabled_by=None)
+    await hass.config_entries.async_reload(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(trackers[WIFI_MAC]).state == "home"
+
+    fake.away.add(WIFI_MAC)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    state = hass.states.get(trackers[WIFI_MAC])
+    assert state.state == "not_home"
+    assert state.attributes["ip"] == "192.168.1.10"
+    assert len(_trackers(hass, entry)) == 2
+
+
+async def test_selected_clients(hass: HomeAssistant, router) -> None:
+    """列出 MAC 时只跟踪这些终端；有线终端按 ARP 邻居表判断在线"""
+    fake, url = router
+    entry = await _setup(hass, url, tracked_clients=WIRED_MAC.upper())
+    trackers = _trackers(hass, entry)
+    assert list(trackers) == [WIRED_MAC]
+    assert hass.states.get(trackers[WIRED_MAC]).state == "home"
+
+    fake.away.add(WIRED_MAC)
+    await hass.data[DOMAIN][entry.entry_id].async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(trackers[WIRED_MAC]).state == "not_home"
+
+
+async def test_expired_clients_removed(hass: HomeAssistant, hass_storage, router) -> None:
+    """离线超过保留期的终端在设置时从实体注册表中删除"""
+    fake, url = router
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"host": url, "username": "root", "password": PASSWORD},
+        options={"update_interval_seconds": 3600, "track_clients": True},
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    stale = registry.async_get_or_create(
+        "device_tracker", DOMAIN, f"{url}_02:00:00:99:00:00", config_entry=entry
+    )
+    recent = registry.async_get_or_create(
+        "device_tracker", DOMAIN, f"{url}_02:00:00:99:00:01", config_entry=entry
+    )
+    hass_storage[f"{DOMAIN}.clients.{entry.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.clients.{entry.entry_id}",
+        "data": {"02:00:00:99:00:00": 0, "02:00:00:99:00:01": 1e10 - CLIENT_RETENTION},
+    }
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert registry.async_get(stale.entity_id) is None
+    assert hass.states.get(recent.entity_id).state == "not_home"
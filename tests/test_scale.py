@@ -0,0 +1,153 @@
+"""Load tests against the stand-in router: API behaviour and fleet scale.
+
+车队规模测试默认只跑少量路由器；通过环境变量放大:
+    OPENWRT_SCALE_ROUTERS=1,50,500 OPENWRT_SCALE_SECONDS=30 pytest tests/test_scale.py -s
+每个规模打印一行报告 (polls/s、轮询耗时、事件循环延迟、内存)。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import resource
+
+import aiohttp
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.openwrt.api import CALL_SUSPEND_AFTER, OpenWrtActionError, OpenWrtApi
+from custom_components.openwrt.const import DATA_FLEET, DOMAIN
+from custom_components.openwrt.ubus import InterfaceFilter, call_group
+
+from .fake_openwrt import PASSWORD, FakeOpenWrt, start_fleet
+
+SCALE_ROUTERS = [int(n) for n in os.environ.get("OPENWRT_SCALE_ROUTERS", "1,20").split(",")]
+SCALE_SECONDS = float(os.environ.get("OPENWRT_SCALE_SECONDS", "3"))
+
+
+@pytest.fixture
+async def client_session():
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+        yield session
+
+
+@pytest.fixture
+async def router(socket_enabled):
+    routers = []
+
+    async def _start(**options) -> tuple[FakeOpenWrt, str]:
+        fake = FakeOpenWrt(seed=len(routers), **options)
+        routers.append(fake)
+        return fake, await fake.start()
+
+    yield _start
+    for fake in routers:
+        await fake.stop()
+
+
+async def test_large_interface_dump(router, client_session) -> None:
+    """200 个接口: 解码全部接口，并只为这些接口的设备请求流量统计"""
+    fake, url = await router(interfaces=200)
+    api = OpenWrtApi(url, "root", PASSWORD, client_session)
+    data = await api.get_data()
+    assert len(data["_available_interfaces"]) == 200
+    data = await api.get_data()
+    assert data["openwrt_lan199_rx_bytes"] > 0
+    assert fake.calls["network.device.status"] == 200
+    assert fake.logins == 1
+
+
+async def test_session_expiry(router, client_session) -> None:
+    """会话过期后在同一次轮询内重新登录"""
+    fake, url = await router()
+    api = OpenWrtApi(url, "root", PASSWORD, client_session)
+    await api.get_data()
+    fake.expire_sessions()
+    data = await api.get_data()
+    assert data["openwrt_uptime"] > 0
+    assert fake.logins == 2
+
+
+async def test_error_injection(router, client_session) -> None:
+    """临时错误只影响出错的调用，不停用调用，也不让轮询失败"""
+    fake, url = await router(error_rate=0.3)
+    api = OpenWrtApi(url, "root", PASSWORD, client_session)
+    for _ in range(10):
+        await api.get_data()
+    assert api.metrics.rpc_errors
+    assert not [key for key, ok in api.capability_state()["capabilities"].items()
+                if not ok and not key.startswith(("cpu_usage", "temp_info"))]
+
+
+async def test_missing_interface_retried(router, client_session) -> None:
+    """允许列表中暂时不存在的接口连续失败后暂停，按退避重试，不写入持久化的能力表"""
+    fake, url = await router(interfaces=3)
+    api = OpenWrtApi(url, "root", PASSWORD, client_session)
+    api.set_interface_filter(InterfaceFilter.from_options("wan, lan4", None))
+    for _ in range(CALL_SUSPEND_AFTER):
+        await api.get_data()
+    assert fake.calls["network.interface.lan4.status"] == CALL_SUSPEND_AFTER
+    await api.get_data()
+    assert fake.calls["network.interface.lan4.status"] == CALL_SUSPEND_AFTER
+    assert all(call_group(key) == key for key in api.capability_state()["capabilities"])
+
+    fake.interfaces = 5
+    api._suspended_until["interface_status.lan4"] = 0
+    data = await api.get_data()
+    assert "lan4" in data["_available_interfaces"]
+    assert "interface_status.lan4" not in api._unsupported_counts
+
+
+async def test_legacy_action_relogin(router, client_session) -> None:
+    """刷新 CSRF token 后动作仍被拒绝时重新登录一次，而不是直接失败"""
+    fake, url = await router()
+    api = OpenWrtApi(url, "root", PASSWORD, client_session)
+    await api.get_data()
+    fake.reject_actions = 2
+    await api.execute_legacy_url_action("admin/system/reboot/call")
+    assert fake.logins == 2
+
+    fake.reject_actions = 3
+    with pytest.raises(OpenWrtActionError):
+        await api.execute_legacy_url_action("admin/system/reboot/call")
+    assert fake.logins == 3
+
+
+@pytest.mark.parametrize("routers", SCALE_ROUTERS)
+async def test_fleet_scale(hass: HomeAssistant, socket_enabled, routers: int) -> None:
+    """routers 台路由器经车队调度器以 1 秒间隔轮询 SCALE_SECONDS 秒"""
+    fakes, urls = await start_fleet(routers, interfaces=8, latency=0.005)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    entries = []
+    try:
+        for url in urls:
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={"host": url, "username": "root", "password": PASSWORD},
+                options={"update_interval_seconds": 1},
+            )
+            entry.add_to_hass(hass)
+            entries.append(entry)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        await asyncio.sleep(SCALE_SECONDS)
+        snapshot = hass.data[DATA_FLEET].snapshot()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        polls = sum(member["polls"] for member in snapshot["members"].values())
+        print(
+            f"\nrouters={routers} polls={polls} polls/s={polls / SCALE_SECONDS:.1f} "
+            f"poll_ms={snapshot['poll_duration_ms']} loop_lag_ms={snapshot['loop_lag_ms']} "
+            f"maxrss_growth_mb={(rss_after - rss_before) / 1024:.1f}"
+        )
+        assert len(snapshot["members"]) == routers
+        assert all(member["polls"] > 0 for member in snapshot["members"].values())
+        for entry in entries:
+            assert hass.data[DOMAIN][entry.entry_id].last_update_success
+    finally:
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        for fake in fakes:
+            await fake.stop()
@@ -0,0 +1,37 @@
+"""Tests for interface counter rates."""
+from __future__ import annotations
+
+from custom_components.openwrt.traffic import COUNTER_32, CounterRateTracker
+
+
+def test_first_sample() -> None:
+    tracker = CounterRateTracker()
+    assert tracker.update("lan_rx", 1000, 0.0) is None
+    assert tracker.update("lan_rx", 4000, 30.0) == 100
+
+
+def test_wrap_32_bit() -> None:
+    """32 位计数器回绕: 补上回绕量"""
+    tracker = CounterRateTracker()
+    tracker.update("wan_rx", COUNTER_32 - 1000, 0.0)
+    assert tracker.update("wan_rx", 2000, 10.0) == 300
+
+
+def test_reset() -> None:
+    """计数器变小且按回绕计算的速率不合理时视为重置，下一次重新计算"""
+    tracker = CounterRateTracker()
+    tracker.update("wan_rx", 1_000_000, 0.0)
+    assert tracker.update("wan_rx", 500, 10.0) is None
+    assert tracker.update("wan_rx", 1500, 20.0) == 100
+
+
+def test_reset_64_bit() -> None:
+    """出现过超过 2**32 的值的计数器不会回绕，变小一定是重置"""
+    tracker = CounterRateTracker()
+    tracker.update("wan_rx", COUNTER_32 + 1000, 0.0)
+    tracker.update("wan_rx", 1000, 10.0)
+    tracker.update("wan_rx", COUNTER_32 - 1000, 20.0)
+    assert tracker.update("wan_rx", 2000, 30.0) is None
+    tracker.prune(set())
+    tracker.update("wan_rx", COUNTER_32 - 1000, 40.0)
+    assert tracker.update("wan_rx", 2000, 50.0) == 300